@@ -3,25 +3,44 @@
 Authentication API Endpoints
 Handles registration and login using JWT and MongoDB
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
 from fastapi.security import OAuth2PasswordRequestForm
 from datetime import timedelta
+from typing import Optional
 from settings import settings
 from core.security import (
     create_access_token,
-    get_password_hash,
-    verify_password,
+    get_password_hash_async,
+    verify_password_async,
     get_current_user,
+    get_current_active_superuser,
     Token
 )
+from core.auth_cache import AuthUser
+from core.password_hasher import PasswordHasherBusyError
 from models.user_mongo import (
     UserDocument, 
     UserCreate, 
-    UserResponse
+    UserResponse,
+    UserImportReport
+)
+from services.user_import_service import (
+    CSV,
+    NDJSON,
+    UserImportService,
+    get_user_import_service
 )
 
 router = APIRouter()
 
+def _hashing_busy() -> HTTPException:
+    """Login/registration burst beyond what the hashing pool can queue"""
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many logins at once, please retry in a moment",
+        headers={"Retry-After": "1"},
+    )
+
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
 async def register(user_in: UserCreate):
     """
@@ -46,12 +65,17 @@ async def register(user_in: UserCreate):
             detail="This username is already taken"
         )
 
+    try:
+        hashed_password = await get_password_hash_async(user_in.password)
+    except PasswordHasherBusyError:
+        raise _hashing_busy()
+
     # Create new user document
     user = UserDocument(
         email=user_in.email,
         username=user_in.username,
         full_name=user_in.full_name,
-        hashed_password=get_password_hash(user_in.password),
+        hashed_password=hashed_password,
         is_active=True
     )
     await user.insert()
@@ -80,7 +104,14 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends()):
          (UserDocument.email == form_data.username))
     )
     
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    try:
+        password_ok = bool(user) and await verify_password_async(
+            form_data.password, user.hashed_password
+        )
+    except PasswordHasherBusyError:
+        raise _hashing_busy()
+    
+    if not password_ok:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
@@ -101,6 +132,37 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends()):
     
     return {"access_token": access_token, "token_type": "bearer"}
 
+@router.post("/import", response_model=UserImportReport)
+async def import_users(
+    request: Request,
+    format: Optional[str] = Query(None, pattern="^(csv|ndjson)$"),
+    _: AuthUser = Depends(get_current_active_superuser),
+    service: UserImportService = Depends(get_user_import_service)
+):
+    """
+    Bulk-create student accounts from a class list (superuser only)
+    
+    The request body is streamed, one record per line:
+    - CSV (text/csv): header `email,username,password[,full_name]`
+    - NDJSON (application/x-ndjson): `{"email": ..., "username": ..., "password": ...}`
+    
+    The format comes from `?format=` or the Content-Type. Returns one result
+    per row: created (with its id) or the reason it was rejected.
+    """
+    if format is None:
+        content_type = request.headers.get("content-type", "")
+        if "csv" in content_type:
+            format = CSV
+        elif "ndjson" in content_type or "jsonl" in content_type:
+            format = NDJSON
+        else:
+            raise HTTPException(
+                status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                detail="Send text/csv or application/x-ndjson (or pass ?format=csv|ndjson)"
+            )
+    
+    return await service.import_users(request.stream(), format)
+
 @router.get("/me", response_model=UserResponse)
 async def get_me(current_user: UserDocument = Depends(get_current_user)):
     """
@@ -5,16 +5,20 @@ Chat API Endpoints with RAG (Retrieval-Augmented Generation) support
 Endpoints:
 - POST /chat/message - Basic chat (legacy)
 - POST /chat/rag - RAG-enabled chat with flashcard context
+- POST /chat/rag/stream - Same, streamed as Server-Sent Events
 - POST /chat/pronunciation - Pronunciation analysis
 """
 from fastapi import APIRouter, Depends, HTTPException, Body
-from typing import List, Any, Dict, Optional
+from fastapi.responses import StreamingResponse
+from typing import List, Any, AsyncIterator, Dict, Optional, Tuple
 from pydantic import BaseModel
+import time
 import uuid
 from datetime import datetime
 import logging
 
-from services.ai_service import AIService, get_ai_service
+from core.sse import SSE_HEADERS, SSE_MEDIA_TYPE, sse_event
+from services.ai_service import AIService, get_ai_service, rag_stream_timings, RAG_ERROR_MESSAGE
 from repositories.flashcard_repository import FlashcardRepository, get_flashcard_repository
 from models.chat_model import ChatMessageSchema
 from models.chat_log import ChatLog
@@ -37,6 +41,7 @@ class RAGChatResponse(BaseModel):
     response: str
     sources: List[Dict[str, Any]]  # Retrieved flashcard words with scores
     session_id: str
+    cached: bool = False  # Served from the semantic answer cache
 
 
 # ========== Legacy Chat Endpoint ==========
@@ -52,6 +57,70 @@ async def chat_message(
 
 
 # ========== RAG Chat Endpoint ==========
+RAG_SEARCH_UNAVAILABLE_MESSAGE = "Xin lỗi, mình không thể tìm kiếm lúc này. Bạn thử lại nhé! 🙏"
+
+
+async def _retrieve_context(
+    question: str,
+    ai_service: AIService,
+    flashcard_repo: FlashcardRepository
+) -> Tuple[List[float], Optional[List[Dict[str, Any]]]]:
+    """
+    Steps 1-2: embed the question and vector-search the flashcards (top 3)
+    
+    Returns:
+        (query embedding, retrieved flashcards), flashcards None if the
+        query embedding failed
+    """
+    query_embedding = await ai_service.generate_query_embedding(question)
+    
+    if not query_embedding:
+        logger.warning("[RAG] Failed to generate query embedding")
+        return query_embedding, None
+    
+    context_flashcards = await flashcard_repo.vector_search(
+        query_vector=query_embedding,
+        limit=3
+    )
+    
+    logger.info(f"[RAG] Found {len(context_flashcards)} relevant flashcards")
+    return query_embedding, context_flashcards
+
+
+async def _log_chat(
+    session_id: str,
+    user_id: Optional[str],
+    question: str,
+    response: str,
+    context_flashcards: List[Dict[str, Any]]
+) -> None:
+    """Store the question and the AI answer (never fails the request)"""
+    try:
+        # Log user message
+        user_log = ChatLog(
+            session_id=session_id,
+            user_id=user_id,
+            message=question,
+            sender="user",
+            timestamp=datetime.utcnow()
+        )
+        await user_log.insert()
+        
+        # Log AI response
+        ai_log = ChatLog(
+            session_id=session_id,
+            user_id=user_id,
+            message=response,
+            sender="ai",
+            context_flashcard_ids=[fc.get("qr_id") for fc in context_flashcards],
+            timestamp=datetime.utcnow()
+        )
+        await ai_log.insert()
+    except Exception as e:
+        # Don't fail request if logging fails
+        logger.warning(f"[RAG] Failed to log chat: {e}")
+
+
 @router.post("/chat/rag", response_model=RAGChatResponse)
 async def rag_chat(
     request: RAGChatRequest,
@@ -76,65 +145,135 @@ async def rag_chat(
     
     logger.info(f"[RAG] Processing question: {request.question[:50]}...")
     
-    # Step 1: Generate query embedding
-    query_embedding = await ai_service.generate_query_embedding(request.question)
+    # Step 1 & 2: Query embedding + vector search
+    query_embedding, context_flashcards = await _retrieve_context(
+        request.question, ai_service, flashcard_repo
+    )
     
-    if not query_embedding:
-        logger.warning("[RAG] Failed to generate query embedding")
+    if context_flashcards is None:
         # Fallback: Return basic response without RAG
         return RAGChatResponse(
-            response="Xin lỗi, mình không thể tìm kiếm lúc này. Bạn thử lại nhé! 🙏",
+            response=RAG_SEARCH_UNAVAILABLE_MESSAGE,
             sources=[],
             session_id=session_id
         )
     
-    # Step 2: Vector search for relevant flashcards
-    context_flashcards = await flashcard_repo.vector_search(
-        query_vector=query_embedding,
-        limit=3
-    )
-    
-    logger.info(f"[RAG] Found {len(context_flashcards)} relevant flashcards")
-    
-    # Step 3 & 4: Generate AI response with context
+    # Step 3 & 4: Generate AI response with context (or reuse a cached answer)
     result = await ai_service.chat_with_rag(
         question=request.question,
-        context_flashcards=context_flashcards
+        context_flashcards=context_flashcards,
+        query_embedding=query_embedding
     )
     
-    # Step 5: Log conversation (async, don't wait)
-    try:
-        # Log user message
-        user_log = ChatLog(
-            session_id=session_id,
-            user_id=request.user_id,
-            message=request.question,
-            sender="user",
-            timestamp=datetime.utcnow()
-        )
-        await user_log.insert()
-        
-        # Log AI response
-        ai_log = ChatLog(
-            session_id=session_id,
-            user_id=request.user_id,
-            message=result["response"],
-            sender="ai",
-            context_flashcard_ids=[fc.get("qr_id") for fc in context_flashcards],
-            timestamp=datetime.utcnow()
-        )
-        await ai_log.insert()
-    except Exception as e:
-        # Don't fail request if logging fails
-        logger.warning(f"[RAG] Failed to log chat: {e}")
+    # Step 5: Log conversation
+    await _log_chat(
+        session_id, request.user_id, request.question, result["response"], context_flashcards
+    )
     
     return RAGChatResponse(
         response=result["response"],
         sources=result["sources"],
-        session_id=session_id
+        session_id=session_id,
+        cached=result.get("cached", False)
     )
 
 
+@router.post("/chat/rag/stream")
+async def rag_chat_stream(
+    request: RAGChatRequest,
+    ai_service: AIService = Depends(get_ai_service),
+    flashcard_repo: FlashcardRepository = Depends(get_flashcard_repository)
+):
+    """
+    Streaming RAG chat (Server-Sent Events).
+    
+    Events, in order:
+    - `sources`: {"sources": [...], "session_id": "...", "cached": bool} as soon
+      as retrieval is done
+    - `token`: {"text": "..."} for every chunk generated by the model (a
+      cached answer arrives as a single token event)
+    - `done`: {"session_id": "..."} after the last token, or
+      `error`: {"message": "..."} if generation failed
+    
+    If the client disconnects, the generation is cancelled and nothing is
+    logged; a completed conversation is logged after the stream ends.
+    """
+    started = time.perf_counter()
+    session_id = request.session_id or str(uuid.uuid4())
+    
+    logger.info(f"[RAG] Streaming answer for: {request.question[:50]}...")
+    
+    def elapsed_ms() -> float:
+        return (time.perf_counter() - started) * 1000
+    
+    async def events() -> AsyncIterator[bytes]:
+        query_embedding, context_flashcards = await _retrieve_context(
+            request.question, ai_service, flashcard_repo
+        )
+        rag_stream_timings.record("retrieval", elapsed_ms())
+        
+        if context_flashcards is None:
+            yield sse_event("sources", {"sources": [], "session_id": session_id})
+            yield sse_event("token", {"text": RAG_SEARCH_UNAVAILABLE_MESSAGE})
+            yield sse_event("done", {"session_id": session_id})
+            return
+        
+        cached = ai_service.cached_rag_answer(query_embedding, context_flashcards)
+        yield sse_event("sources", {
+            "sources": ai_service.rag_sources(context_flashcards),
+            "session_id": session_id,
+            "cached": cached is not None,
+        })
+        
+        if cached:
+            # Whole answer in one event: no model call at all
+            rag_stream_timings.record("first_token", elapsed_ms())
+            yield sse_event("token", {"text": cached.response})
+            yield sse_event("done", {"session_id": session_id})
+            rag_stream_timings.record("complete", elapsed_ms())
+            await _log_chat(
+                session_id, request.user_id, request.question, cached.response, context_flashcards
+            )
+            return
+        
+        parts: List[str] = []
+        tokens = ai_service.stream_rag(request.question, context_flashcards)
+        finished = False
+        try:
+            async for text in tokens:
+                if not parts:
+                    rag_stream_timings.record("first_token", elapsed_ms())
+                parts.append(text)
+                yield sse_event("token", {"text": text})
+            finished = True
+        except Exception as e:
+            finished = True
+            rag_stream_timings.record("error", elapsed_ms())
+            logger.error(f"[RAG] Streaming failed: {e}")
+            yield sse_event("error", {"message": RAG_ERROR_MESSAGE})
+            return
+        finally:
+            if not finished:
+                # Client went away (task cancelled or generator closed mid-stream)
+                rag_stream_timings.record("disconnected", elapsed_ms())
+                logger.info(f"[RAG] Client disconnected after {len(parts)} chunks")
+            # Closes the upstream model stream if it is still open
+            await tokens.aclose()
+        
+        yield sse_event("done", {"session_id": session_id})
+        rag_stream_timings.record("complete", elapsed_ms())
+        
+        # Logged (and cached) only once the whole answer was delivered
+        response = "".join(parts)
+        await _log_chat(session_id, request.user_id, request.question, response, context_flashcards)
+        if ai_service.llm:
+            await ai_service.remember_rag_answer(
+                request.question, query_embedding, context_flashcards, response
+            )
+    
+    return StreamingResponse(events(), media_type=SSE_MEDIA_TYPE, headers=SSE_HEADERS)
+
+
 # ========== Pronunciation Endpoint ==========
 @router.post("/chat/pronunciation")
 async def analyze_pronunciation(
@@ -1,18 +1,25 @@
-from fastapi import APIRouter, Depends, HTTPException
-from typing import List, Any
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from typing import List, Any, Optional
 from services.course_service import CourseService, get_course_service
 from models.course_model import CourseSchema
-from database.supabase_client import get_supabase
+from core.pagination import InvalidCursorError, set_next_cursor_header
 
 router = APIRouter()
 
 @router.get("/courses", response_model=List[CourseSchema])
 async def get_courses(
+    response: Response,
     skip: int = 0, 
-    limit: int = 20,
+    limit: int = Query(20, ge=1, le=100),
+    after: Optional[str] = None,
     service: CourseService = Depends(get_course_service)
 ):
-    return await service.get_courses(skip, limit)
+    try:
+        page = await service.get_courses(skip, limit, after)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    set_next_cursor_header(response, page)
+    return page.items
 
 @router.get("/courses/{course_id}", response_model=CourseSchema)
 async def get_course(
@@ -3,12 +3,18 @@
 Flashcard API Router - Thin controller layer
 Includes endpoints for flashcard CRUD with AI embedding support
 """
-from fastapi import Depends, HTTPException, status, Body
+from fastapi import Depends, HTTPException, status, Body, Query, Request, Response
 from core.base_router import create_router
+from core.pagination import InvalidCursorError, set_next_cursor_header
+from core.fast_response import fast_response
 from services import FlashcardService, get_flashcard_service, ARService, get_ar_service
+from services.ar_service import ar_experience_etags
+from services.embedding_client import EmbeddingUnavailableError
+from services.job_runner import JobAlreadyRunningError
 from models import FlashcardSchema, ARExperienceResponseSchema
 from models.flashcard import FlashcardCreate, FlashcardResponse
-from typing import List
+from models.job import JobAcceptedSchema, JobStatusSchema
+from typing import List, Optional
 import logging
 
 logger = logging.getLogger(__name__)
@@ -49,43 +55,82 @@ async def create_flashcard(
         )
 
 
-@router.post("/batch-embed")
+@router.post(
+    "/batch-embed",
+    response_model=JobAcceptedSchema,
+    status_code=status.HTTP_202_ACCEPTED
+)
 async def batch_generate_embeddings(
-    limit: int = Body(10, embed=True),
+    request: Request,
+    limit: Optional[int] = Body(None, embed=True),
+    reconcile: bool = Body(False, embed=True),
     service: FlashcardService = Depends(get_flashcard_service)
 ):
     """
-    Generate embeddings for flashcards that don't have them.
+    Start a background job generating embeddings for flashcards that don't have them.
     
-    Use this to update existing flashcards with embeddings.
+    Returns a job id immediately; poll GET /flashcard/batch-embed/{job_id}
+    for progress, throughput and failures. Only one job runs at a time.
     
     Args:
-        limit: Max number of flashcards to process (default: 10)
+        limit: Max number of flashcards to process (default: all)
+        reconcile: Re-embed only cards whose text or embedding model changed
+            (scans the whole catalog) instead of cards without embeddings
     """
-    logger.info(f"[API] POST /flashcard/batch-embed - Processing up to {limit} flashcards")
+    logger.info(f"[API] POST /flashcard/batch-embed - limit={limit}, reconcile={reconcile}")
+    
+    if limit is not None and limit < 1:
+        raise router.handle_bad_request("Limit must be positive")
     
-    if limit > 50:
+    try:
+        job = await service.start_batch_embed_job(limit, reconcile)
+    except JobAlreadyRunningError as e:
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Limit cannot exceed 50 per batch"
+            status_code=status.HTTP_409_CONFLICT,
+            detail={"message": str(e), "job_id": e.job["_id"]}
+        )
+    except EmbeddingUnavailableError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Embedding service unavailable: {e}"
         )
-    
-    updated_count = await service.generate_embeddings_for_missing(limit)
     
     return {
-        "message": f"Updated {updated_count} flashcards with embeddings",
-        "updated_count": updated_count
+        "job_id": job["_id"],
+        "status": job["status"],
+        "status_url": str(request.url_for("get_batch_embed_job", job_id=job["_id"])),
     }
 
 
+@router.get("/batch-embed/{job_id}", response_model=JobStatusSchema)
+async def get_batch_embed_job(
+    job_id: str,
+    service: FlashcardService = Depends(get_flashcard_service)
+):
+    """
+    Progress of a batch-embed job (processed/total, cards per second, ETA, failed qr_ids)
+    
+    Any worker can answer: job state lives in the jobs collection.
+    """
+    job = await service.get_batch_embed_job(job_id)
+    if not job:
+        raise router.handle_not_found("Batch-embed job", job_id)
+    return job
+
+
 @router.get("/{qr_id}", response_model=ARExperienceResponseSchema)
 async def get_ar_experience(
     qr_id: str,
+    request: Request,
+    response: Response,
     ar_service: ARService = Depends(get_ar_service)
 ):
     """
     Get complete AR experience data by QR ID
     
+    Supports conditional GET: send the previous ETag in If-None-Match to get
+    an empty 304 when nothing changed.
+    
     Returns:
         - Flashcard data
         - AR target (NFT marker + 3D model)
@@ -93,6 +138,11 @@ async def get_ar_experience(
     """
     logger.info(f"[API] GET /flashcard/{qr_id}")
     
+    generation = ar_experience_etags.generation(qr_id)
+    not_modified = ar_experience_etags.check(request, qr_id)
+    if not_modified:
+        return not_modified
+    
     result = await ar_service.get_ar_experience(qr_id)
     
     if not result:
@@ -101,35 +151,41 @@ async def get_ar_experience(
             detail=f"Flashcard or AR data not found for QR ID: {qr_id}"
         )
     
-    return result
+    return ar_experience_etags.respond(
+        request, response, qr_id, result, schema=ARExperienceResponseSchema, generation=generation
+    )
 
 
 @router.get("/category/{category}", response_model=List[FlashcardSchema])
 async def get_flashcards_by_category(
     category: str,
+    response: Response,
     skip: int = 0,
-    limit: int = 50,
+    limit: int = Query(50, ge=1, le=100),
+    after: Optional[str] = None,
     service: FlashcardService = Depends(get_flashcard_service)
 ):
     """
     Get flashcards by category with pagination
     
+    Prefer cursor pagination: pass the X-Next-Cursor header of the previous
+    page as `after`. Every page then costs the same regardless of depth.
+    
     Args:
         category: Category name (e.g., 'animals', 'fruits')
-        skip: Number to skip (default: 0)
-        limit: Max results (default: 50, max: 100)
+        skip: Number to skip (default: 0, legacy - ignored when `after` is set)
+        limit: Max results (default: 50, 1-100)
+        after: Cursor token from the previous page
     """
-    logger.info(f"[API] GET /flashcard/category/{category}?skip={skip}&limit={limit}")
+    logger.info(f"[API] GET /flashcard/category/{category}?skip={skip}&limit={limit}&after={after}")
     
-    if limit > 100:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Limit cannot exceed 100"
-        )
-    
-    results = await service.get_by_category(category, skip, limit)
+    try:
+        page = await service.get_by_category(category, skip, limit, after)
+    except InvalidCursorError as e:
+        raise router.handle_bad_request(str(e))
     
-    return results
+    set_next_cursor_header(response, page)
+    return fast_response(List[FlashcardSchema], page.items, response)
 
 
 @router.get("/search/{query}", response_model=List[FlashcardSchema])
@@ -2,9 +2,10 @@
 """
 Game API Router - Thin controller layer
 """
-from fastapi import Depends, HTTPException, status, Query
+from fastapi import Depends, HTTPException, status, Query, Request, Response
 from core.base_router import create_router
 from services import GameService, get_game_service
+from services.game_service import game_etags
 from models import GameSessionSchema
 from typing import Optional
 import logging
@@ -21,6 +22,8 @@ router = create_router(
 @router.get("/{qr_id}", response_model=GameSessionSchema)
 async def get_game_by_flashcard(
     qr_id: str,
+    request: Request,
+    response: Response,
     game_type: Optional[str] = Query(None, description="Game type filter"),
     difficulty: Optional[str] = Query(None, description="Difficulty filter"),
     service: GameService = Depends(get_game_service)
@@ -28,6 +31,8 @@ async def get_game_by_flashcard(
     """
     Get game session for a specific flashcard
     
+    Supports conditional GET via ETag / If-None-Match.
+    
     Args:
         qr_id: Flashcard QR ID (e.g., 'ele123')
         game_type: Optional game type ('drag_match', 'catch_word', etc.)
@@ -38,6 +43,12 @@ async def get_game_by_flashcard(
     """
     logger.info(f"[API] GET /game/{qr_id}?game_type={game_type}&difficulty={difficulty}")
     
+    variant = f"{game_type or ''}|{difficulty or ''}"
+    generation = game_etags.generation(qr_id)
+    not_modified = game_etags.check(request, qr_id, variant)
+    if not_modified:
+        return not_modified
+    
     result = await service.get_game_by_flashcard(qr_id, game_type, difficulty)
     
     if not result:
@@ -46,4 +57,6 @@ async def get_game_by_flashcard(
             detail=f"No game found for flashcard QR ID: {qr_id} with specified filters"
         )
     
-    return result
+    return game_etags.respond(
+        request, response, qr_id, result, variant, schema=GameSessionSchema, generation=generation
+    )
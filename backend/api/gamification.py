@@ -1,15 +1,33 @@
-from fastapi import APIRouter, Depends, HTTPException
-from typing import List, Any, Dict
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from typing import List, Any, Dict, Optional
+from core.pagination import InvalidCursorError, set_next_cursor_header
 from services.gamification_service import GamificationService, get_gamification_service
-from models.gamification_model import UserPointsSchema
+from models.gamification_model import UserPointsSchema, LeaderboardEntrySchema, UserRankSchema
 
 router = APIRouter()
 
-@router.get("/gamification/leaderboard", response_model=List[Dict[str, Any]])
+@router.get("/gamification/leaderboard", response_model=List[LeaderboardEntrySchema])
 async def get_leaderboard(
+    response: Response,
+    limit: int = Query(10, ge=1, le=100),
+    after: Optional[str] = None,
     service: GamificationService = Depends(get_gamification_service)
 ):
-    return await service.get_leaderboard()
+    try:
+        page = await service.get_leaderboard(limit, after)
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    set_next_cursor_header(response, page)
+    return page.items
+
+@router.get("/gamification/leaderboard/user/{user_id}", response_model=UserRankSchema)
+async def get_user_rank(
+    user_id: str,
+    window: int = Query(3, ge=0, le=25),
+    service: GamificationService = Depends(get_gamification_service)
+):
+    """A user's rank plus `window` players above and below"""
+    return await service.get_user_rank(user_id, window)
 
 @router.get("/gamification/user/{user_id}", response_model=UserPointsSchema)
 async def get_user_stats(
@@ -2,9 +2,10 @@
 """
 Quiz API Router - Thin controller layer
 """
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, status, Request, Response
 from core.base_router import create_router
 from services import QuizService, get_quiz_service
+from services.quiz_service import quiz_etags
 from models import QuizSessionSchema
 import logging
 
@@ -20,11 +21,15 @@ router = create_router(
 @router.get("/{qr_id}", response_model=QuizSessionSchema)
 async def get_quiz_by_flashcard(
     qr_id: str,
+    request: Request,
+    response: Response,
     service: QuizService = Depends(get_quiz_service)
 ):
     """
     Get quiz questions for a specific flashcard
     
+    Supports conditional GET via ETag / If-None-Match.
+    
     Args:
         qr_id: Flashcard QR ID (e.g., 'ele123')
         
@@ -33,6 +38,11 @@ async def get_quiz_by_flashcard(
     """
     logger.info(f"[API] GET /quiz/{qr_id}")
     
+    generation = quiz_etags.generation(qr_id)
+    not_modified = quiz_etags.check(request, qr_id)
+    if not_modified:
+        return not_modified
+    
     result = await service.get_quiz_by_flashcard(qr_id)
     
     if not result:
@@ -41,4 +51,6 @@ async def get_quiz_by_flashcard(
             detail=f"No quiz found for flashcard QR ID: {qr_id}"
         )
     
-    return result
+    return quiz_etags.respond(
+        request, response, qr_id, result, schema=QuizSessionSchema, generation=generation
+    )
@@ -0,0 +1,132 @@
+# backend/core/auth_cache.py
+"""
+Auth Cache - per-worker caches behind get_current_user
+
+Every authenticated request used to verify the JWT (HMAC) and read the whole
+user document. Two small caches now serve the common case from memory:
+
+- Tokens: LRU of tokens whose signature was already verified, mapped to
+  their subject. Keyed by the whole token (header, payload and signature),
+  so a cached signature can never vouch for a different payload. An entry
+  never outlives the token's own `exp`.
+- Users: short-TTL cache of only the fields auth checks need (is_active,
+  is_superuser), keyed by user id. Concurrent misses share one read.
+
+A user update or deactivation drops the cached user: on this worker via
+invalidate_user(), on every worker through the change watcher ("users"
+events). The TTL bounds staleness when change events are unavailable.
+"""
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+import logging
+
+from bson import ObjectId
+from bson.errors import InvalidId
+
+from settings import settings
+from database.connection import db_manager
+from utils.cache import TTLCache
+from utils.invalidation import InvalidationEvent, invalidation_bus
+from utils.metrics import metrics_registry
+
+logger = logging.getLogger(__name__)
+
+USER_AUTH_PROJECTION = {"is_active": 1, "is_superuser": 1}
+
+
+@dataclass(frozen=True)
+class AuthUser:
+    """What authorization needs to know about the current user"""
+    id: str
+    is_active: bool
+    is_superuser: bool
+
+
+class AuthCache:
+    """
+    Verified-token LRU + short-TTL user cache
+
+    Usage:
+        user_id = auth_cache.verified_subject(token)
+        if user_id is None:
+            ...verify the JWT...
+            auth_cache.remember_token(token, user_id, payload["exp"])
+        user = await auth_cache.get_user(user_id)
+    """
+
+    def __init__(
+        self,
+        user_ttl_seconds: float = 30.0,
+        max_users: int = 10000,
+        max_tokens: int = 10000,
+        max_token_ttl_seconds: float = 1800.0
+    ):
+        self.users = TTLCache(name="auth_users", max_size=max_users, ttl_seconds=user_ttl_seconds)
+        self.tokens = TTLCache(name="auth_tokens", max_size=max_tokens, ttl_seconds=max_token_ttl_seconds)
+
+    # ========== Tokens ==========
+
+    def verified_subject(self, token: str) -> Optional[str]:
+        """Subject of an already verified, unexpired token, or None"""
+        return self.tokens.get(token)
+
+    def remember_token(self, token: str, subject: str, expires_at: Optional[int]) -> None:
+        """Cache a token whose signature was just verified (until its exp)"""
+        ttl = self.tokens.ttl_seconds
+        if expires_at is not None:
+            ttl = min(ttl, expires_at - time.time())
+        if ttl > 0:
+            self.tokens.set(token, subject, ttl_seconds=ttl)
+
+    # ========== Users ==========
+
+    async def get_user(self, user_id: str) -> Optional[AuthUser]:
+        """Auth fields of a user (cached), None if the user does not exist"""
+        return await self.users.get_or_load(user_id, lambda: self._load_user(user_id))
+
+    async def _load_user(self, user_id: str) -> Optional[AuthUser]:
+        try:
+            object_id = ObjectId(user_id)
+        except (InvalidId, TypeError):
+            return None
+        doc = await db_manager.get_collection("users").find_one(
+            {"_id": object_id}, USER_AUTH_PROJECTION
+        )
+        if doc is None:
+            return None
+        return AuthUser(
+            id=user_id,
+            is_active=doc.get("is_active", True),
+            is_superuser=doc.get("is_superuser", False)
+        )
+
+    def invalidate_user(self, user_id: Any) -> None:
+        """Call after updating or deactivating a user"""
+        self.users.invalidate(str(user_id))
+
+    def on_user_change(self, event: InvalidationEvent) -> None:
+        """Invalidation bus handler for the users collection"""
+        if event.operation == "reset":
+            self.users.clear()
+            return
+        user_id = event.keys.get("_id")
+        if user_id is not None:
+            self.invalidate_user(user_id)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "users": self.users.snapshot(),
+            "tokens": self.tokens.snapshot(),
+        }
+
+
+# ========== Singleton Instance ==========
+auth_cache = AuthCache(
+    user_ttl_seconds=settings.AUTH_USER_CACHE_TTL_SECONDS,
+    max_users=settings.AUTH_USER_CACHE_MAX_SIZE,
+    max_tokens=settings.AUTH_TOKEN_CACHE_MAX_SIZE,
+    max_token_ttl_seconds=settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+)
+metrics_registry.register("auth_cache", auth_cache.snapshot)
+invalidation_bus.subscribe(["users"], auth_cache.on_user_change)
@@ -6,8 +6,12 @@ All repositories should inherit from this class
 from abc import ABC
 from typing import Any, Dict, List, Optional
 from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo import IndexModel
 from bson import ObjectId
 from database.connection import db_manager
+from database.codecs import with_string_ids
+from core.pagination import Page, encode_cursor, keyset_filter
+from core.index_manager import reconcile_indexes
 import logging
 
 logger = logging.getLogger(__name__)
@@ -17,8 +21,18 @@ class BaseRepository(ABC):
     """
     Generic Repository Pattern for MongoDB operations
     Provides common CRUD operations that all repositories can use
+    
+    Subclasses declare the indexes their queries rely on in `indexes`;
+    sync_indexes() reconciles them with the collection.
+    
+    Read-only catalog repositories set `string_ids = True`: reads then go
+    through `self.reader`, which decodes ObjectIds to str in the BSON decoder
+    instead of rewriting `_id` on every result.
     """
     
+    indexes: List[IndexModel] = []
+    string_ids: bool = False
+    
     def __init__(self, collection_name: str):
         """
         Initialize repository with collection name
@@ -28,6 +42,9 @@ class BaseRepository(ABC):
         """
         self.collection_name = collection_name
         self.collection: AsyncIOMotorCollection = db_manager.get_collection(collection_name)
+        self.reader: AsyncIOMotorCollection = (
+            with_string_ids(self.collection) if self.string_ids else self.collection
+        )
         logger.debug(f"📦 [Repository] Initialized: {collection_name}")
     
     # ========== CREATE ==========
@@ -48,33 +65,38 @@ class BaseRepository(ABC):
     
     # ========== READ ==========
     
-    async def find_by_id(self, id: str) -> Optional[Dict[str, Any]]:
-        """Find document by _id"""
+    async def find_by_id(
+        self,
+        id: str,
+        projection: Optional[Dict[str, Any]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Find document by _id (projection=None returns the whole document)"""
         try:
-            result = await self.collection.find_one({"_id": ObjectId(id)})
-            if result:
-                result["_id"] = str(result["_id"])
-            return result
+            result = await self.reader.find_one({"_id": ObjectId(id)}, projection)
+            return self._stringify_id(result)
         except Exception as e:
             logger.error(f"❌ [FIND_BY_ID] {self.collection_name}: {e}")
             return None
     
-    async def find_one(self, filter: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        """Find single document by filter"""
-        result = await self.collection.find_one(filter)
-        if result and "_id" in result:
-            result["_id"] = str(result["_id"])
-        return result
+    async def find_one(
+        self,
+        filter: Dict[str, Any],
+        projection: Optional[Dict[str, Any]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Find single document by filter (projection=None returns the whole document)"""
+        result = await self.reader.find_one(filter, projection)
+        return self._stringify_id(result)
     
     async def find_many(
         self, 
         filter: Dict[str, Any] = None,
         skip: int = 0,
         limit: int = 100,
-        sort: List[tuple] = None
+        sort: List[tuple] = None,
+        projection: Optional[Dict[str, Any]] = None
     ) -> List[Dict[str, Any]]:
-        """Find multiple documents with pagination"""
-        query = self.collection.find(filter or {})
+        """Find multiple documents with pagination (projection=None returns whole documents)"""
+        query = self.reader.find(filter or {}, projection)
         
         if sort:
             query = query.sort(sort)
@@ -83,16 +105,72 @@ class BaseRepository(ABC):
         
         results = await query.to_list(length=limit)
         
-        # Convert ObjectId to string
-        for doc in results:
-            if "_id" in doc:
-                doc["_id"] = str(doc["_id"])
+        return self._stringify_ids(results)
+    
+    async def find_page(
+        self,
+        filter: Dict[str, Any] = None,
+        sort_key: str = "_id",
+        direction: int = 1,
+        limit: int = 50,
+        after: Optional[str] = None,
+        skip: int = 0,
+        projection: Optional[Dict[str, Any]] = None
+    ) -> Page:
+        """
+        Find one page of documents using keyset pagination on (sort_key, _id)
+        
+        Args:
+            filter: Query filter
+            sort_key: Field to sort by (ties broken by _id)
+            direction: 1 (ascending) or -1 (descending)
+            limit: Page size
+            after: Cursor token from the previous page (opaque to clients)
+            skip: Legacy offset, only honoured when no cursor is given
+            projection: Fields to return (sort_key and _id are always kept)
+            
+        Returns:
+            Page(items, next_cursor) - next_cursor is None on the last page
+            
+        Raises:
+            InvalidCursorError: If the cursor token cannot be decoded
+            ValueError: If limit is smaller than 1
+        """
+        if limit < 1:
+            raise ValueError(f"Page limit must be at least 1, got {limit}")
+        query = dict(filter or {})
+        if after:
+            position = keyset_filter(sort_key, direction, after)
+            query = {"$and": [query, position]} if query else position
         
-        return results
+        if projection and any(projection.values()):
+            projection = {**projection, sort_key: 1}
+        
+        sort = [(sort_key, direction)]
+        if sort_key != "_id":
+            sort.append(("_id", direction))
+        cursor = self.reader.find(query, projection).sort(sort)
+        if skip and not after:
+            cursor = cursor.skip(skip)
+        # Fetch one extra document to know whether another page exists
+        results = await cursor.limit(limit + 1).to_list(length=limit + 1)
+        
+        next_cursor = None
+        if len(results) > limit:
+            results = results[:limit]
+            last = results[-1]
+            last_id = self._query_id(last["_id"])
+            sort_value = last_id if sort_key == "_id" else last.get(sort_key)
+            next_cursor = encode_cursor(sort_value, last_id)
+        
+        return Page(items=self._stringify_ids(results), next_cursor=next_cursor)
     
-    async def find_all(self) -> List[Dict[str, Any]]:
+    async def find_all(
+        self,
+        projection: Optional[Dict[str, Any]] = None
+    ) -> List[Dict[str, Any]]:
         """Find all documents (use with caution)"""
-        return await self.find_many()
+        return await self.find_many(projection=projection)
     
     async def count(self, filter: Dict[str, Any] = None) -> int:
         """Count documents matching filter"""
@@ -150,6 +228,43 @@ class BaseRepository(ABC):
         logger.info(f"🗑️ [DELETE_MANY] {self.collection_name}: deleted={result.deleted_count}")
         return result.deleted_count
     
+    # ========== ID CONVERSION ==========
+    
+    def _stringify_id(self, doc: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Convert _id to str (already done by the decoder when string_ids is set)"""
+        if doc and not self.string_ids and "_id" in doc:
+            doc["_id"] = str(doc["_id"])
+        return doc
+    
+    def _stringify_ids(self, docs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Convert _id to str on every document of a result list"""
+        if not self.string_ids:
+            for doc in docs:
+                if "_id" in doc:
+                    doc["_id"] = str(doc["_id"])
+        return docs
+    
+    def _query_id(self, value: Any) -> Any:
+        """Turn an _id read through `reader` back into the value stored in MongoDB"""
+        if self.string_ids and isinstance(value, str) and ObjectId.is_valid(value):
+            return ObjectId(value)
+        return value
+    
+    # ========== INDEXES ==========
+    
+    async def sync_indexes(
+        self,
+        drop_extra: bool = False,
+        dry_run: bool = False
+    ) -> Dict[str, Any]:
+        """Create missing declared indexes and report extra/conflicting ones"""
+        return await reconcile_indexes(
+            self.collection,
+            self.indexes,
+            drop_extra=drop_extra,
+            dry_run=dry_run
+        )
+    
     # ========== UTILITY ==========
     
     async def exists(self, filter: Dict[str, Any]) -> bool:
@@ -159,12 +274,7 @@ class BaseRepository(ABC):
     
     async def aggregate(self, pipeline: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """Execute aggregation pipeline"""
-        cursor = self.collection.aggregate(pipeline)
+        cursor = self.reader.aggregate(pipeline)
         results = await cursor.to_list(length=None)
         
-        # Convert ObjectId to string
-        for doc in results:
-            if "_id" in doc:
-                doc["_id"] = str(doc["_id"])
-        
-        return results
+        return self._stringify_ids(results)
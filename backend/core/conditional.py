@@ -0,0 +1,179 @@
+# backend/core/conditional.py
+"""
+Conditional GET Support (ETag / If-None-Match)
+
+An ETagRegistry keeps, per worker, the ETag last served for each resource.
+When a client revalidates with a matching If-None-Match, the route answers
+304 straight from memory without touching MongoDB. Entries are dropped
+through the invalidation bus whenever the source documents change, and expire
+after a TTL as a safety net for missed events.
+"""
+import hashlib
+import json
+from typing import Any, Dict, Hashable, Optional
+
+from fastapi import Request, Response, status
+from fastapi.encoders import jsonable_encoder
+
+from settings import settings
+from utils.cache import TTLCache
+from core.fast_response import json_bytes_response, render_json
+
+# Clients must revalidate every time, but may reuse their copy on 304
+CACHE_CONTROL = "no-cache"
+
+
+def compute_etag(payload: Any) -> str:
+    """Stable weak ETag: hash of the canonical JSON form of the payload"""
+    canonical = json.dumps(
+        jsonable_encoder(payload),
+        sort_keys=True,
+        separators=(",", ":"),
+        ensure_ascii=False
+    )
+    return etag_for_bytes(canonical.encode("utf-8"))
+
+
+def etag_for_bytes(body: bytes) -> str:
+    """Weak ETag of an already rendered body"""
+    digest = hashlib.blake2b(body, digest_size=16).hexdigest()
+    return f'W/"{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+def not_modified_response(etag: str) -> Response:
+    """Empty 304 carrying the validator"""
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={"ETag": etag, "Cache-Control": CACHE_CONTROL}
+    )
+
+
+class ETagRegistry:
+    """
+    In-memory version stamps for one resource type
+
+    Keys are resource ids (e.g. qr_id); a resource can have several variants
+    (e.g. query filters) which are all invalidated together.
+
+    Usage in a route:
+        generation = registry.generation(qr_id)   # before the read
+        cached = registry.check(request, qr_id)
+        if cached:
+            return cached              # 304, no database read
+        result = await service.get(...)
+        return registry.respond(request, response, qr_id, result, generation=generation)
+
+    An invalidation that lands while the payload is being read bumps the
+    key's generation, so respond() does not remember the ETag of data that
+    may already be stale (same rule as TTLCache.get_or_load).
+    """
+
+    def __init__(self, name: str, max_size: int = 4096, ttl_seconds: float = 300.0):
+        self.name = name
+        self._versions = TTLCache(name=f"{name}_etags", max_size=max_size, ttl_seconds=ttl_seconds)
+        # Counter value at each key's last invalidation, and at the last full clear
+        self._counter = 0
+        self._invalidated_at: Dict[Hashable, int] = {}
+        self._cleared_at = 0
+        self._max_tracked = max_size * 4
+        self.not_modified = 0
+        self.stale_skipped = 0
+
+    def generation(self, key: Hashable) -> int:
+        """Changes whenever `key` (or everything) is invalidated; capture before a read"""
+        return max(self._cleared_at, self._invalidated_at.get(key, 0))
+
+    def check(self, request: Request, key: Hashable, variant: str = "") -> Optional[Response]:
+        """Return a 304 response if the client already has the current version"""
+        if_none_match = request.headers.get("if-none-match")
+        if not if_none_match:
+            return None
+        variants: Optional[Dict[str, str]] = self._versions.get(key)
+        etag = variants.get(variant) if variants else None
+        if etag and etag_matches(if_none_match, etag):
+            self.not_modified += 1
+            return not_modified_response(etag)
+        return None
+
+    def respond(
+        self,
+        request: Request,
+        response: Response,
+        key: Hashable,
+        payload: Any,
+        variant: str = "",
+        schema: Any = None,
+        generation: Optional[int] = None
+    ) -> Any:
+        """
+        Stamp a freshly read payload: remember its ETag and set the headers
+
+        With the generation captured before the read, the ETag is not
+        remembered if the key was invalidated meanwhile (it is still sent).
+
+        With a schema (and FAST_RESPONSES_ENABLED), the payload is rendered
+        once through core.fast_response and the ETag is hashed from those
+        bytes, which are returned as the response.
+
+        Returns the payload (or its rendered response), or a 304 if its hash
+        matches If-None-Match.
+        """
+        body = None
+        if schema is not None and settings.FAST_RESPONSES_ENABLED:
+            body = render_json(schema, payload)
+            etag = etag_for_bytes(body)
+        else:
+            etag = compute_etag(payload)
+        if generation is None or generation == self.generation(key):
+            variants = self._versions.get(key) or {}
+            variants[variant] = etag
+            self._versions.set(key, variants)
+        else:
+            self.stale_skipped += 1
+
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            self.not_modified += 1
+            return not_modified_response(etag)
+        response.headers["ETag"] = etag
+        response.headers["Cache-Control"] = CACHE_CONTROL
+        if body is not None:
+            return json_bytes_response(body, response)
+        return payload
+
+    def invalidate(self, key: Optional[Hashable] = None) -> None:
+        """Forget one resource (all variants), or everything when key is None"""
+        self._counter += 1
+        if key is None:
+            self._cleared_at = self._counter
+            self._invalidated_at.clear()
+            self._versions.clear()
+        else:
+            if len(self._invalidated_at) >= self._max_tracked:
+                # Bound the bookkeeping: reads in flight just skip one store
+                self._cleared_at = self._counter - 1
+                self._invalidated_at.clear()
+            self._invalidated_at[key] = self._counter
+            self._versions.invalidate(key)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "not_modified": self.not_modified,
+            "stale_skipped": self.stale_skipped,
+            **self._versions.snapshot(),
+        }
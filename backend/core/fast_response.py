@@ -0,0 +1,89 @@
+# backend/core/fast_response.py
+"""
+Fast Response Path for hot read-only GETs
+
+By default FastAPI validates a route's return value against `response_model`,
+dumps it to Python objects and encodes those with the stdlib JSON encoder.
+For repository dicts that are already shaped like the schema, this module
+does one pass instead: a cached TypeAdapter validates and serializes straight
+to JSON bytes (pydantic-core), which are sent as-is. FastAPI skips its own
+response_model handling when a Response is returned, and `response_model`
+stays on the decorator for the OpenAPI docs.
+
+Opt-in per route; FAST_RESPONSES_ENABLED=false restores the default path.
+"""
+import json
+from functools import lru_cache
+from typing import Any, Optional
+
+from fastapi import Response
+from pydantic import TypeAdapter
+
+from settings import settings
+
+try:
+    import orjson
+except ImportError:  # Optional: stdlib fallback below
+    orjson = None
+
+# Headers owned by the rendered body, never copied from the injected Response
+_BODY_HEADERS = {b"content-length", b"content-type"}
+
+
+class FastJSONResponse(Response):
+    """
+    JSON response that sends pre-rendered bytes untouched
+
+    Other content is encoded with orjson when installed (datetime, UUID and
+    non-str keys natively), else with a compact stdlib encoder.
+    """
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, (bytes, bytearray, memoryview)):
+            return bytes(content)
+        if orjson is not None:
+            return orjson.dumps(content, default=str, option=orjson.OPT_NON_STR_KEYS)
+        return json.dumps(content, default=str, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+@lru_cache(maxsize=None)
+def get_type_adapter(schema: Any) -> TypeAdapter:
+    """One TypeAdapter per response type (building one compiles a validator)"""
+    return TypeAdapter(schema)
+
+
+def render_json(schema: Any, data: Any) -> bytes:
+    """
+    Validate data against schema once and serialize it to JSON bytes
+
+    Output matches what FastAPI would send for `response_model=schema`:
+    fields by alias (e.g. `_id`), undeclared keys dropped.
+    """
+    adapter = get_type_adapter(schema)
+    return adapter.dump_json(adapter.validate_python(data), by_alias=True)
+
+
+def json_bytes_response(body: bytes, response: Optional[Response] = None, status_code: int = 200) -> FastJSONResponse:
+    """
+    Wrap rendered bytes, carrying over headers set on the route's injected Response
+    (FastAPI does not merge them when the route returns its own Response)
+    """
+    fast = FastJSONResponse(content=body, status_code=status_code)
+    if response is not None:
+        fast.headers.raw.extend(
+            (name, value) for name, value in response.headers.raw if name not in _BODY_HEADERS
+        )
+    return fast
+
+
+def fast_response(schema: Any, data: Any, response: Optional[Response] = None) -> Any:
+    """
+    Return data through the fast path when enabled, else unchanged
+
+    Usage in a route:
+        return fast_response(List[FlashcardSchema], page.items, response)
+    """
+    if not settings.FAST_RESPONSES_ENABLED:
+        return data
+    return json_bytes_response(render_json(schema, data), response)
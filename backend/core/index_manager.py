@@ -0,0 +1,113 @@
+# backend/core/index_manager.py
+"""
+Declarative Index Manager for raw-Motor collections
+
+Repositories declare their wanted indexes as pymongo IndexModel specs
+(BaseRepository.indexes). reconcile_indexes() compares them with what the
+collection actually has and creates whatever is missing. It is idempotent:
+running it again on a reconciled collection does nothing.
+"""
+from typing import Any, Dict, List, Tuple
+import logging
+
+from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo import IndexModel
+from pymongo.errors import OperationFailure
+
+logger = logging.getLogger(__name__)
+
+# Index options that change behaviour; a mismatch on any of them is a conflict
+_COMPARED_OPTIONS = ("unique", "sparse", "expireAfterSeconds", "partialFilterExpression")
+
+
+def _key_of(key_spec: Any) -> Tuple[Tuple[str, Any], ...]:
+    """Normalise an index key spec (SON / dict / list of pairs) to a tuple"""
+    items = key_spec.items() if hasattr(key_spec, "items") else key_spec
+    # Indexes created from the shell may store directions as doubles (1.0)
+    return tuple(
+        (field, int(direction) if isinstance(direction, float) else direction)
+        for field, direction in items
+    )
+
+
+def _options_of(spec: Dict[str, Any]) -> Dict[str, Any]:
+    return {opt: spec[opt] for opt in _COMPARED_OPTIONS if spec.get(opt) not in (None, False)}
+
+
+async def reconcile_indexes(
+    collection: AsyncIOMotorCollection,
+    wanted: List[IndexModel],
+    drop_extra: bool = False,
+    dry_run: bool = False
+) -> Dict[str, Any]:
+    """
+    Reconcile the indexes of one collection with its declared specs
+
+    Args:
+        collection: Motor collection
+        wanted: Declared IndexModel specs
+        drop_extra: Drop indexes that are not declared (never drops _id_)
+        dry_run: Only report, do not create or drop anything
+
+    Returns:
+        Report dict with created / missing / extra / conflicts / errors lists
+    """
+    report: Dict[str, Any] = {
+        "collection": collection.name,
+        "created": [],
+        "missing": [],
+        "extra": [],
+        "dropped": [],
+        "conflicts": [],
+        "errors": [],
+    }
+
+    existing = await collection.index_information()
+    existing_by_key = {_key_of(info["key"]): (name, info) for name, info in existing.items()}
+    wanted_keys = set()
+
+    to_create: List[IndexModel] = []
+    for model in wanted:
+        doc = model.document
+        key = _key_of(doc["key"])
+        wanted_keys.add(key)
+        if key not in existing_by_key:
+            report["missing"].append(doc["name"])
+            to_create.append(model)
+            continue
+        name, info = existing_by_key[key]
+        if _options_of(info) != _options_of(doc):
+            report["conflicts"].append({
+                "index": name,
+                "declared": _options_of(doc),
+                "actual": _options_of(info),
+            })
+
+    for key, (name, _info) in existing_by_key.items():
+        if name != "_id_" and key not in wanted_keys:
+            report["extra"].append(name)
+
+    if dry_run:
+        return report
+
+    for model in to_create:
+        name = model.document["name"]
+        try:
+            await collection.create_indexes([model])
+            report["created"].append(name)
+            logger.info(f"🗂️ [INDEX] {collection.name}: created {name}")
+        except OperationFailure as e:
+            report["errors"].append({"index": name, "error": str(e)})
+            logger.error(f"❌ [INDEX] {collection.name}: failed to create {name}: {e}")
+    report["missing"] = [n for n in report["missing"] if n not in report["created"]]
+
+    if drop_extra:
+        for name in report["extra"]:
+            try:
+                await collection.drop_index(name)
+                report["dropped"].append(name)
+                logger.info(f"🗑️ [INDEX] {collection.name}: dropped {name}")
+            except OperationFailure as e:
+                report["errors"].append({"index": name, "error": str(e)})
+
+    return report
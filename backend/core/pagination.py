@@ -0,0 +1,81 @@
+# backend/core/pagination.py
+"""
+Keyset (cursor) Pagination Helpers
+
+Pages are keyed on (sort key, _id) instead of skip/limit, so every page costs
+one index seek regardless of depth. The cursor handed to clients is an opaque
+url-safe token wrapping the last (sort value, _id) pair of the previous page.
+"""
+import base64
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from bson import ObjectId, json_util
+
+
+# Response header carrying the next-page cursor (list bodies stay unchanged)
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a client sends a cursor token that cannot be decoded"""
+
+
+class Page(NamedTuple):
+    """One page of results plus the cursor for the next page (None if last)"""
+    items: List[Dict[str, Any]]
+    next_cursor: Optional[str]
+
+
+def encode_cursor(sort_value: Any, doc_id: Any) -> str:
+    """Encode the (sort value, _id) position of a document as an opaque token"""
+    raw = json_util.dumps({"k": sort_value, "id": ObjectId(str(doc_id))})
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str) -> Tuple[Any, ObjectId]:
+    """Decode a token produced by encode_cursor into (sort value, ObjectId)"""
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        data = json_util.loads(base64.urlsafe_b64decode(padded.encode("ascii")).decode("utf-8"))
+        return data["k"], ObjectId(data["id"])
+    except Exception as e:
+        raise InvalidCursorError(f"Invalid pagination cursor: {token}") from e
+
+
+def keyset_filter(sort_key: str, direction: int, after: str) -> Dict[str, Any]:
+    """
+    Build the filter selecting documents strictly after the cursor position
+
+    Args:
+        sort_key: Field the listing is sorted by
+        direction: 1 (ascending) or -1 (descending)
+        after: Cursor token from the previous page
+
+    Null and missing sort values sort before every other value, and $gt / $lt
+    never match them, so the null block gets its own branches.
+    """
+    value, last_id = decode_cursor(after)
+    op = "$gt" if direction == 1 else "$lt"
+    if sort_key == "_id":
+        # The position is the _id alone (and a str cursor value would never
+        # match ObjectId keys)
+        return {"_id": {op: last_id}}
+    if value is None:
+        if direction == 1:
+            # Rest of the null block, then every non-null value
+            return {"$or": [{sort_key: {"$ne": None}}, {sort_key: None, "_id": {op: last_id}}]}
+        # Descending: the null block comes last
+        return {sort_key: None, "_id": {op: last_id}}
+    branches = [
+        {sort_key: {op: value}},
+        {sort_key: value, "_id": {op: last_id}},
+    ]
+    if direction == -1:
+        branches.append({sort_key: None})
+    return {"$or": branches}
+
+
+def set_next_cursor_header(response: Any, page: Page) -> None:
+    """Expose the next-page cursor on a FastAPI Response, if there is one"""
+    if page.next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = page.next_cursor
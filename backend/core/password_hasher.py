@@ -0,0 +1,180 @@
+# backend/core/password_hasher.py
+"""
+Password Hasher - bcrypt off the event loop
+
+bcrypt is deliberately slow (~100-300 ms per hash/verify at the default cost).
+Called inline from an async handler it freezes the whole worker, so a login
+burst at the start of a class stalls every other request, AR scans included.
+Hashing runs on a small dedicated pool instead:
+
+- Threads (default): the bcrypt C extension releases the GIL, so N threads
+  hash N passwords in parallel while the event loop keeps serving.
+- Processes (PASSWORD_HASH_POOL="process"): for runtimes where the backend
+  holds the GIL; costs a process per pool slot. Bulk user imports always use
+  their own process pool (bulk_password_hasher), so an import never delays
+  logins.
+- Bounded: at most PASSWORD_HASH_MAX_PENDING calls queued or running; beyond
+  that callers fail fast (503) instead of queueing for seconds.
+
+The pool is created on first use, so nothing is started before gunicorn forks.
+"""
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+import logging
+
+from passlib.context import CryptContext
+
+from settings import settings
+from utils.metrics import Histogram, LatencyStats, metrics_registry
+
+logger = logging.getLogger(__name__)
+
+# Password hashing configuration
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+
+def _verify_blocking(plain_password: str, hashed_password: str) -> bool:
+    """Runs in a pool thread/process"""
+    return pwd_context.verify(plain_password, hashed_password)
+
+
+def _hash_blocking(password: str) -> str:
+    """Runs in a pool thread/process"""
+    return pwd_context.hash(password)
+
+
+class PasswordHasherBusyError(RuntimeError):
+    """Raised when the hashing pool already has max_pending calls"""
+
+
+class PasswordHasher:
+    """
+    Async facade over pwd_context with a bounded pool
+
+    Usage:
+        if not await password_hasher.verify(form.password, user.hashed_password):
+            ...
+        hashed = await password_hasher.hash(user_in.password)
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 2,
+        max_pending: int = 64,
+        use_processes: bool = False
+    ):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.use_processes = use_processes
+        self._executor: Optional[Executor] = None
+        self.timings = LatencyStats()
+        self.queue_depth = Histogram([0, 1, 2, 4, 8, 16, 32, 64])
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.calls = 0
+        self.rejected = 0
+        self.errors = 0
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            if self.use_processes:
+                # spawn: forking a worker that runs Motor's background threads is unsafe
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="bcrypt"
+                )
+        return self._executor
+
+    @property
+    def queued(self) -> int:
+        """Calls waiting for a free pool slot"""
+        return max(0, self.in_flight - self.max_workers)
+
+    async def _run(self, name: str, fn: Callable[..., Any], *args: Any) -> Any:
+        if self.in_flight >= self.max_pending:
+            self.rejected += 1
+            raise PasswordHasherBusyError(f"{self.in_flight} password hashes pending")
+
+        loop = asyncio.get_running_loop()
+        # Depth seen by this call: how many are ahead of it waiting for a slot
+        self.queue_depth.record(self.queued)
+        self.calls += 1
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        started = time.perf_counter()
+        try:
+            return await loop.run_in_executor(self.executor, fn, *args)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            self.errors += 1
+            raise
+        finally:
+            self.in_flight -= 1
+            self.timings.record(name, (time.perf_counter() - started) * 1000)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """
+        Check a password against its bcrypt hash without blocking the event loop
+
+        Raises:
+            PasswordHasherBusyError: Too many hashes already pending
+        """
+        return await self._run("verify", _verify_blocking, plain_password, hashed_password)
+
+    async def hash(self, password: str) -> str:
+        """
+        Hash a password without blocking the event loop
+
+        Raises:
+            PasswordHasherBusyError: Too many hashes already pending
+        """
+        return await self._run("hash", _hash_blocking, password)
+
+    def shutdown(self) -> None:
+        """Drop queued hashes and release the pool (lifespan shutdown)"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "pool": "process" if self.use_processes else "thread",
+            "max_workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "peak_in_flight": self.peak_in_flight,
+            "queue_depth": self.queue_depth.snapshot(),
+            "calls": self.calls,
+            "rejected": self.rejected,
+            "errors": self.errors,
+            "latency": self.timings.snapshot(),
+        }
+
+
+# ========== Singleton Instance ==========
+password_hasher = PasswordHasher(
+    max_workers=settings.PASSWORD_HASH_MAX_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+    use_processes=settings.PASSWORD_HASH_POOL == "process"
+)
+metrics_registry.register("password_hashing", password_hasher.snapshot)
+
+# Bulk user imports: one process per core by default, a whole batch in flight
+bulk_password_hasher = PasswordHasher(
+    max_workers=settings.USER_IMPORT_HASH_PROCESSES or os.cpu_count() or 1,
+    max_pending=settings.USER_IMPORT_BATCH_SIZE,
+    use_processes=True
+)
+metrics_registry.register("password_hashing_bulk", bulk_password_hasher.snapshot)
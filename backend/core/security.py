@@ -4,7 +4,6 @@ Unified Security Module for MongoDB JWT Authentication
 Replacing Supabase-specific implementation
 """
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from pydantic import BaseModel
@@ -13,12 +12,11 @@ from datetime import datetime, timedelta
 import logging
 from settings import settings
 from models.user_mongo import UserDocument
+from core.password_hasher import pwd_context, password_hasher
+from core.auth_cache import AuthUser, auth_cache
 
 logger = logging.getLogger(__name__)
 
-# Password hashing configuration
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
-
 # OAuth2 scheme for token extraction
 oauth2_scheme = OAuth2PasswordBearer(
     tokenUrl=f"{settings.API_V1_PREFIX}/auth/login"
@@ -42,6 +40,14 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
+# Request handlers use the async versions: bcrypt runs on the hashing pool
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await password_hasher.verify(plain_password, hashed_password)
+
+async def get_password_hash_async(password: str) -> str:
+    return await password_hasher.hash(password)
+
 # ========== JWT Token Management ==========
 
 def create_access_token(
@@ -59,12 +65,12 @@ def create_access_token(
 
 # ========== Current User Dependency ==========
 
-async def get_current_user(
-    token: str = Depends(oauth2_scheme)
-) -> UserDocument:
-    """
-    FastAPI dependency to get current authenticated user Document from MongoDB
-    """
+def _token_subject(token: str) -> str:
+    """User id of a valid token; the signature is verified once per token per worker"""
+    user_id = auth_cache.verified_subject(token)
+    if user_id is not None:
+        return user_id
+
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -74,14 +80,24 @@ async def get_current_user(
         payload = jwt.decode(
             token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
         )
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
-        token_data = TokenPayload(sub=user_id)
-    except JWTError:
+        token_data = TokenPayload(**payload)
+    except (JWTError, ValueError):
         raise credentials_exception
+    if token_data.sub is None:
+        raise credentials_exception
+
+    auth_cache.remember_token(token, token_data.sub, token_data.exp)
+    return token_data.sub
+
+async def get_current_auth_user(
+    token: str = Depends(oauth2_scheme)
+) -> AuthUser:
+    """
+    FastAPI dependency for routes that only need to know who is calling
 
-    user = await UserDocument.get(token_data.sub)
+    Served from the per-worker auth cache: no MongoDB read on a hit.
+    """
+    user = await auth_cache.get_user(_token_subject(token))
     if user is None:
         raise HTTPException(status_code=404, detail="User not found")
     
@@ -90,9 +106,25 @@ async def get_current_user(
         
     return user
 
-async def get_current_active_superuser(
-    current_user: UserDocument = Depends(get_current_user),
+async def get_current_user(
+    auth_user: AuthUser = Depends(get_current_auth_user)
 ) -> UserDocument:
+    """
+    FastAPI dependency to get current authenticated user Document from MongoDB
+
+    Reads the user on every call: only for routes that need the Document
+    itself (its profile, e.g. /auth/me, or to modify and save it). Auth
+    checks should depend on get_current_auth_user, served from the auth cache.
+    """
+    user = await UserDocument.get(auth_user.id)
+    if user is None:
+        auth_cache.invalidate_user(auth_user.id)
+        raise HTTPException(status_code=404, detail="User not found")
+    return user
+
+async def get_current_active_superuser(
+    current_user: AuthUser = Depends(get_current_auth_user),
+) -> AuthUser:
     if not current_user.is_superuser:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN, 
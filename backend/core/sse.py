@@ -0,0 +1,26 @@
+# backend/core/sse.py
+"""
+Server-Sent Events helpers
+
+    event: token
+    data: {"text": "Xin"}
+
+Each event is one `event:` line, one JSON `data:` line and a blank line.
+"""
+import json
+from typing import Any, Dict
+
+# Disable proxy buffering (nginx) and caching so events reach the client immediately
+SSE_HEADERS: Dict[str, str] = {
+    "Cache-Control": "no-cache",
+    "Connection": "keep-alive",
+    "X-Accel-Buffering": "no",
+}
+
+SSE_MEDIA_TYPE = "text/event-stream"
+
+
+def sse_event(event: str, data: Any) -> bytes:
+    """Encode one SSE event with a JSON payload"""
+    payload = json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+    return f"event: {event}\ndata: {payload}\n\n".encode("utf-8")
@@ -1,5 +1,8 @@
-from database.db import mongo_connector
+# database/base_repo.py
+"""
+LEGACY IMPORT PATH - Redirects to core/base_repository.py
+Kept so existing repositories share the same CRUD/projection API.
+"""
+from core.base_repository import BaseRepository
 
-class BaseRepository:
-    def __init__(self, collection_name: str):
-        self.collection = mongo_connector.get_collection(collection_name)
\ No newline at end of file
+__all__ = ["BaseRepository"]
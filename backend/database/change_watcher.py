@@ -0,0 +1,276 @@
+# database/change_watcher.py
+"""
+Catalog Change Watcher - cross-worker cache invalidation
+
+Each worker runs one background task (started in main.lifespan) that watches
+the catalog collections through a single database-level change stream and
+publishes InvalidationEvents on utils.invalidation.invalidation_bus.
+
+- The resume token is persisted in the `cache_resume_tokens` collection, so a
+  restarted watcher continues where the stream left off.
+- If the token is no longer in the oplog, every cache is reset instead.
+- Events are projected server-side to the fields handlers use (key fields,
+  changed field names), so embeddings, password hashes etc. never leave the
+  database with them.
+- If change streams are unavailable (standalone mongod), the watcher falls
+  back to polling `updated_at` / `created_at` on the same collections.
+"""
+import asyncio
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+import logging
+
+from pymongo.errors import OperationFailure, PyMongoError
+
+from settings import settings
+from database.connection import db_manager
+from utils.invalidation import InvalidationBus, InvalidationEvent, invalidation_bus
+from utils.metrics import metrics_registry
+
+logger = logging.getLogger(__name__)
+
+# Collections whose changes invalidate in-process caches
+WATCHED_COLLECTIONS = [
+    "flashcards",
+    "ar_objects",
+    "ar_combinations",
+    "quiz_questions",
+    "mini_game_bank",
+    "ar_experience_bundles",
+    "users",  # Auth cache: updated / deactivated accounts
+]
+
+# Identifying fields copied from the changed document into the event
+KEY_FIELDS = ["qr_id", "flashcard_qr_id", "ar_tag", "required_tags", "combo_id"]
+
+# Server-side $project of each change event: keeps what _handle_change reads.
+# updatedFields is reduced to its field names (the values may be secrets).
+CHANGE_PROJECTION: Dict[str, Any] = {
+    "operationType": 1,
+    "ns": 1,
+    "documentKey": 1,
+    "updateDescription.updatedFields": {
+        "$cond": [
+            {"$eq": ["$operationType", "update"]},
+            {"$map": {"input": {"$objectToArray": "$updateDescription.updatedFields"}, "in": "$$this.k"}},
+            "$$REMOVE",
+        ]
+    },
+    "updateDescription.removedFields": 1,
+    **{f"fullDocument.{f}": 1 for f in KEY_FIELDS},
+}
+
+RESUME_TOKEN_COLLECTION = "cache_resume_tokens"
+
+# Server error codes
+_CHANGE_STREAMS_UNSUPPORTED = {40573}  # "$changeStream is only supported on replica sets"
+_HISTORY_LOST = {280, 286}  # ChangeStreamFatalError, ChangeStreamHistoryLost
+
+
+class CatalogChangeWatcher:
+    """
+    Background task turning catalog writes into cache invalidation events
+
+    Usage (lifespan):
+        await catalog_watcher.start()
+        ...
+        await catalog_watcher.stop()
+    """
+
+    def __init__(
+        self,
+        bus: InvalidationBus,
+        collections: List[str],
+        name: str = "catalog",
+        poll_interval: float = 10.0,
+        token_save_every: int = 20
+    ):
+        self.bus = bus
+        self.collections = collections
+        self.name = name
+        self.poll_interval = poll_interval
+        self.token_save_every = token_save_every
+        self._task: Optional[asyncio.Task] = None
+        self._resume_token: Optional[Dict[str, Any]] = None
+        self._unsaved_events = 0
+        self._stream_opened = False
+        self.mode = "stopped"
+        self.events = 0
+        self.restarts = 0
+        self.last_event_at: Optional[datetime] = None
+
+    # ========== Lifecycle ==========
+
+    async def start(self) -> None:
+        """Load the stored resume token and start the background task"""
+        if self._task and not self._task.done():
+            return
+        self._resume_token = await self._load_token()
+        self._task = asyncio.create_task(self._run(), name=f"{self.name}-change-watcher")
+        logger.info(f"👀 [Watcher] Started for {self.collections} (resume={'yes' if self._resume_token else 'no'})")
+
+    async def stop(self) -> None:
+        """Cancel the task and persist the latest resume token"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self._save_token()
+        self.mode = "stopped"
+        logger.info("👀 [Watcher] Stopped")
+
+    # ========== Change stream ==========
+
+    async def _run(self) -> None:
+        backoff = 1.0
+        while True:
+            self._stream_opened = False
+            try:
+                self.mode = "change_stream"
+                await self._watch()
+            except asyncio.CancelledError:
+                raise
+            except OperationFailure as e:
+                if e.code in _CHANGE_STREAMS_UNSUPPORTED:
+                    logger.warning(f"[Watcher] Change streams unavailable ({e}); polling instead")
+                    await self._poll_forever()
+                    return
+                if e.code in _HISTORY_LOST:
+                    logger.warning("[Watcher] Resume token expired; resetting all caches")
+                    self._resume_token = None
+                    self.bus.reset_all()
+                else:
+                    logger.error(f"[Watcher] Change stream failed: {e}")
+            except PyMongoError as e:
+                logger.error(f"[Watcher] Change stream interrupted: {e}")
+            self.restarts += 1
+            if self._stream_opened:
+                # The stream worked until now: retry quickly, not at the last backoff
+                backoff = 1.0
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 30.0)
+
+    async def _watch(self) -> None:
+        pipeline = [
+            {
+                "$match": {
+                    "ns.coll": {"$in": self.collections},
+                    "operationType": {"$in": ["insert", "update", "replace", "delete", "drop", "rename"]},
+                }
+            },
+            {"$project": CHANGE_PROJECTION},
+        ]
+        options: Dict[str, Any] = {"full_document": "updateLookup"}
+        if self._resume_token:
+            options["resume_after"] = self._resume_token
+
+        async with db_manager.database.watch(pipeline, **options) as stream:
+            self._stream_opened = True
+            async for change in stream:
+                self._handle_change(change)
+                self._resume_token = stream.resume_token
+                self._unsaved_events += 1
+                if self._unsaved_events >= self.token_save_every:
+                    await self._save_token()
+
+    def _handle_change(self, change: Dict[str, Any]) -> None:
+        collection = change["ns"]["coll"]
+        operation = change["operationType"]
+        self.events += 1
+        self.last_event_at = datetime.utcnow()
+
+        if operation in ("drop", "rename"):
+            self.bus.publish(InvalidationEvent(collection=collection, operation="reset", from_watcher=True))
+            return
+
+        document = change.get("fullDocument") or {}
+        keys = {"_id": change.get("documentKey", {}).get("_id")}
+        keys.update({f: document[f] for f in KEY_FIELDS if f in document})
+
+        updated_fields = None
+        description = change.get("updateDescription")
+        if description:
+            # updatedFields is a list of names here (see CHANGE_PROJECTION)
+            updated_fields = list(description.get("updatedFields") or []) + list(description.get("removedFields") or [])
+
+        self.bus.publish(InvalidationEvent(
+            collection=collection,
+            operation=operation,
+            keys=keys,
+            updated_fields=updated_fields,
+            from_watcher=True
+        ))
+
+    # ========== Polling fallback ==========
+
+    async def _poll_forever(self) -> None:
+        """Publish events for documents whose updated_at/created_at moved since the last poll"""
+        self.mode = "polling"
+        since = datetime.utcnow()
+        projection = {f: 1 for f in KEY_FIELDS}
+        while True:
+            await asyncio.sleep(self.poll_interval)
+            # Small overlap absorbs clock skew between app servers; events are idempotent
+            poll_started = datetime.utcnow() - timedelta(seconds=1)
+            for collection in self.collections:
+                try:
+                    cursor = db_manager.get_collection(collection).find(
+                        {"$or": [{"updated_at": {"$gt": since}}, {"created_at": {"$gt": since}}]},
+                        projection
+                    )
+                    async for doc in cursor:
+                        self.events += 1
+                        self.last_event_at = datetime.utcnow()
+                        self.bus.publish(InvalidationEvent(
+                            collection=collection,
+                            operation="update",
+                            keys={**doc},
+                            from_watcher=True
+                        ))
+                except PyMongoError as e:
+                    logger.error(f"[Watcher] Poll failed for {collection}: {e}")
+            since = poll_started
+
+    # ========== Resume token persistence ==========
+
+    async def _load_token(self) -> Optional[Dict[str, Any]]:
+        try:
+            doc = await db_manager.get_collection(RESUME_TOKEN_COLLECTION).find_one({"_id": self.name})
+            return doc.get("token") if doc else None
+        except PyMongoError as e:
+            logger.warning(f"[Watcher] Could not load resume token: {e}")
+            return None
+
+    async def _save_token(self) -> None:
+        if not self._resume_token or not self._unsaved_events:
+            return
+        try:
+            await db_manager.get_collection(RESUME_TOKEN_COLLECTION).update_one(
+                {"_id": self.name},
+                {"$set": {"token": self._resume_token, "updated_at": datetime.utcnow()}},
+                upsert=True
+            )
+            self._unsaved_events = 0
+        except PyMongoError as e:
+            logger.warning(f"[Watcher] Could not save resume token: {e}")
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "events": self.events,
+            "restarts": self.restarts,
+            "last_event_at": self.last_event_at.isoformat() if self.last_event_at else None,
+            "bus": self.bus.snapshot(),
+        }
+
+
+# ========== Singleton Instance ==========
+catalog_watcher = CatalogChangeWatcher(
+    invalidation_bus,
+    WATCHED_COLLECTIONS,
+    poll_interval=settings.CACHE_INVALIDATION_POLL_SECONDS
+)
+metrics_registry.register("catalog_watcher", catalog_watcher.snapshot)
@@ -0,0 +1,38 @@
+# database/codecs.py
+"""
+BSON Codecs for read-only catalog access
+
+Catalog documents are forwarded to clients as JSON, where every ObjectId ends
+up as a string. Decoding them as strings inside the BSON decoder (C extension)
+saves the Python pass that rewrote `_id` on every result.
+
+Only reads go through these options; writes and filters still encode
+ObjectIds normally, so a decoded string id must be wrapped in ObjectId()
+before it is used in a query.
+"""
+from bson import ObjectId
+from bson.codec_options import CodecOptions, TypeDecoder, TypeRegistry
+from motor.motor_asyncio import AsyncIOMotorCollection
+
+
+class ObjectIdAsString(TypeDecoder):
+    """Decode every BSON ObjectId (not only _id) to its 24-char hex string"""
+    bson_type = ObjectId
+
+    def transform_bson(self, value: ObjectId) -> str:
+        return str(value)
+
+
+STRING_ID_REGISTRY = TypeRegistry([ObjectIdAsString()])
+
+
+def string_id_codec_options(base: CodecOptions) -> CodecOptions:
+    """The client's codec options (tz_aware, document_class, ...) plus ObjectId -> str"""
+    return base.with_options(type_registry=STRING_ID_REGISTRY)
+
+
+def with_string_ids(collection: AsyncIOMotorCollection) -> AsyncIOMotorCollection:
+    """Same collection, decoding ObjectIds as strings"""
+    return collection.with_options(
+        codec_options=string_id_codec_options(collection.codec_options)
+    )
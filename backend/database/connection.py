@@ -1,63 +1,130 @@
 # backend/database/connection.py
 """
 Database Connection Manager - Exclusive MongoDB (Beanie ODM)
+
+One pooled Motor client per worker process, shared by Beanie and the raw
+repositories. The client is created lazily on first use, never at import time,
+so gunicorn forks before any socket is opened. If the manager is used after a
+fork, the inherited client is discarded and a fresh one is created.
 """
+import asyncio
+import os
 import motor.motor_asyncio
 import certifi
 import logging
 from settings import settings
-from typing import Optional
+from typing import Any, Dict, Optional
 
 # Import Beanie initialization and Documents
-from database.mongodb import init_mongodb, close_mongodb, test_connection
+from database.mongodb import init_mongodb, close_mongodb
+from database.pool_monitor import pool_metrics
+from utils.metrics import metrics_registry
 from models.flashcard import Flashcard
 from models.user_mongo import UserDocument, LearningProgressDocument, QuizAttemptDocument
+from models.chat_log import ChatLog
 # Note: Add other models as they are converted to Beanie
 
 logger = logging.getLogger(__name__)
 
+
+def build_client_options() -> Dict[str, Any]:
+    """Motor client options built from settings (pool sizing and timeouts)"""
+    options: Dict[str, Any] = {
+        "maxPoolSize": settings.MONGO_MAX_POOL_SIZE,
+        "minPoolSize": settings.MONGO_MIN_POOL_SIZE,
+        "maxIdleTimeMS": settings.MONGO_MAX_IDLE_TIME_MS,
+        "waitQueueTimeoutMS": settings.MONGO_WAIT_QUEUE_TIMEOUT_MS,
+        "serverSelectionTimeoutMS": settings.MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        "event_listeners": [pool_metrics],
+    }
+    if settings.MONGO_TLS:
+        options["tls"] = True
+        options["tlsCAFile"] = certifi.where()
+    return options
+
+
 class DatabaseManager:
     """
     Singleton MongoDB Connection Manager
-    Handles async Motor client for FastAPI
+    Handles the per-process async Motor client for FastAPI
     """
-    
+
     _instance = None
-    _client: motor.motor_asyncio.AsyncIOMotorClient = None
-    _db: motor.motor_asyncio.AsyncIOMotorDatabase = None
-    
+    _client: Optional[motor.motor_asyncio.AsyncIOMotorClient] = None
+    _db: Optional[motor.motor_asyncio.AsyncIOMotorDatabase] = None
+    _pid: Optional[int] = None
+
     def __new__(cls):
         if cls._instance is None:
             cls._instance = super().__new__(cls)
         return cls._instance
-    
-    def __init__(self):
-        """Initialize connection only once"""
-        if self._client is None:
-            self._connect()
-    
+
     def _connect(self):
-        """Establish MongoDB connection"""
+        """Create the MongoDB client for the current process"""
         try:
+            pool_metrics.reset()
             self._client = motor.motor_asyncio.AsyncIOMotorClient(
                 settings.MONGO_URL,
-                tls=True,
-                tlsCAFile=certifi.where(),
-                serverSelectionTimeoutMS=5000
+                **build_client_options()
             )
             self._db = self._client[settings.MONGO_DB]
-            logger.info(f"✅ [MongoDB] Connected to database: {settings.MONGO_DB}")
+            self._pid = os.getpid()
+            logger.info(
+                f"✅ [MongoDB] Client created for database: {settings.MONGO_DB} "
+                f"(pid={self._pid}, pool={settings.MONGO_MIN_POOL_SIZE}-{settings.MONGO_MAX_POOL_SIZE})"
+            )
         except Exception as e:
             logger.error(f"❌ [MongoDB] Connection failed: {e}")
             raise
-    
+
+    def _ensure_client(self):
+        """Create the client lazily, and again after a fork"""
+        if self._client is not None and self._pid != os.getpid():
+            # Inherited from the parent process: sockets are not fork-safe.
+            logger.warning(f"[MongoDB] Discarding client inherited from pid={self._pid}")
+            self._client = None
+            self._db = None
+        if self._client is None:
+            self._connect()
+
+    @property
+    def client(self) -> motor.motor_asyncio.AsyncIOMotorClient:
+        """Get the shared client instance"""
+        self._ensure_client()
+        return self._client
+
     @property
     def database(self) -> motor.motor_asyncio.AsyncIOMotorDatabase:
         """Get database instance"""
-        if self._db is None:
-            self._connect()
+        self._ensure_client()
         return self._db
-    
+
+    def get_collection(self, collection_name: str) -> motor.motor_asyncio.AsyncIOMotorCollection:
+        """Get a raw collection from the shared database"""
+        return self.database[collection_name]
+
+    async def warm_up(self, connections: Optional[int] = None) -> int:
+        """
+        Open pooled connections ahead of the first request
+
+        Runs concurrent pings so each one checks out its own connection.
+
+        Args:
+            connections: Number of connections to open (default: MONGO_MIN_POOL_SIZE)
+
+        Returns:
+            Number of successful pings
+        """
+        count = connections if connections is not None else settings.MONGO_MIN_POOL_SIZE
+        count = max(1, min(count, settings.MONGO_MAX_POOL_SIZE))
+        results = await asyncio.gather(
+            *(self.client.admin.command("ping") for _ in range(count)),
+            return_exceptions=True
+        )
+        ok = sum(1 for r in results if not isinstance(r, Exception))
+        logger.info(f"🔥 [MongoDB] Pool warm-up: {ok}/{count} connections ready")
+        return ok
+
     async def close(self):
         """Close MongoDB connection"""
         await close_mongodb()
@@ -65,14 +132,21 @@ class DatabaseManager:
             self._client.close()
             self._client = None
             self._db = None
+            self._pid = None
             logger.info("🔌 [MongoDB] Connection closed")
-    
+
     async def ping(self) -> bool:
-        """Test database connection"""
-        return await test_connection()
+        """Test database connection (on the shared client, Beanie not required)"""
+        try:
+            await self.client.admin.command("ping")
+            return True
+        except Exception as e:
+            logger.error(f"❌ [MongoDB] Ping failed: {e}")
+            return False
 
 # ========== Singleton Instance ==========
 db_manager = DatabaseManager()
+metrics_registry.register("mongo_pool", pool_metrics.snapshot)
 
 # ========== Dependency for FastAPI ==========
 def get_database() -> motor.motor_asyncio.AsyncIOMotorDatabase:
@@ -83,23 +157,25 @@ def get_database() -> motor.motor_asyncio.AsyncIOMotorDatabase:
 async def connect_to_database():
     """Call this on FastAPI startup"""
     logger.info("🚀 [MongoDB] Initializing Beanie ODM and connections...")
-    
+
     # Define models to register with Beanie
     document_models = [
         UserDocument,
         Flashcard,
         LearningProgressDocument,
         QuizAttemptDocument,
+        ChatLog,
         # Add other Beanie Documents here (ARObject, Quiz, etc.)
     ]
-    
+
     try:
         await init_mongodb(
-            mongo_url=settings.MONGO_URL,
+            client=db_manager.client,
             database_name=settings.MONGO_DB,
             document_models=document_models
         )
         logger.info("✅ [MongoDB] Beanie ODM initialized successfully")
+        await db_manager.warm_up()
     except Exception as e:
         logger.error(f"❌ [MongoDB] Initialization failed: {e}")
         raise
@@ -108,4 +184,3 @@ async def close_database_connection():
     """Call this on FastAPI shutdown"""
     logger.info("🔄 [MongoDB] Closing database connection...")
     await db_manager.close()
-
@@ -12,7 +12,7 @@ logger = logging.getLogger(__name__)
 # Redirect mongo_connector to the new db_manager
 class MongoConnectorWrapper:
     def get_collection(self, collection_name: str):
-        return db_manager.database[collection_name]
+        return db_manager.get_collection(collection_name)
     
     async def close_connection(self):
         await db_manager.close()
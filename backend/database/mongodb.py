@@ -10,7 +10,6 @@ Architecture: Hybrid Database (Beanie for MongoDB)
 import motor.motor_asyncio
 from beanie import init_beanie, Document
 from typing import List, Type, Optional
-import certifi
 import logging
 
 logger = logging.getLogger(__name__)
@@ -22,41 +21,34 @@ _database: Optional[motor.motor_asyncio.AsyncIOMotorDatabase] = None
 
 
 async def init_mongodb(
-    mongo_url: str,
+    client: motor.motor_asyncio.AsyncIOMotorClient,
     database_name: str,
     document_models: List[Type[Document]]
 ) -> None:
     """
     Initialize MongoDB with Beanie ODM
     
+    Beanie does not own a client: it binds to the per-process client from
+    database.connection.db_manager, so Beanie and the raw repositories share
+    a single connection pool.
+    
     Args:
-        mongo_url: MongoDB connection string (Atlas or local)
+        client: Shared Motor client (db_manager.client)
         database_name: Name of the database to use
         document_models: List of Beanie Document classes to register
         
     Usage during FastAPI lifespan:
-        from backend.models.flashcard_model import Flashcard
-        from backend.models.ar_model import ARObject
+        from database.connection import db_manager
         
         await init_mongodb(
-            mongo_url=settings.MONGO_URL,
+            client=db_manager.client,
             database_name=settings.MONGO_DB,
             document_models=[Flashcard, ARObject, ...]
         )
     """
     global _client, _database
     
-    if not mongo_url:
-        logger.warning("[MongoDB] No MONGO_URL provided, skipping initialization")
-        return
-    
-    # Create Motor client with TLS for Atlas
-    _client = motor.motor_asyncio.AsyncIOMotorClient(
-        mongo_url,
-        tls=True,
-        tlsCAFile=certifi.where(),
-    )
-    
+    _client = client
     _database = _client[database_name]
     
     # Initialize Beanie with document models
@@ -71,17 +63,14 @@ async def init_mongodb(
 
 async def close_mongodb() -> None:
     """
-    Close MongoDB connection
+    Release Beanie's reference to the shared client
     
-    Call this during FastAPI lifespan shutdown
+    The client itself is closed by db_manager.close() during lifespan shutdown
     """
     global _client, _database
     
-    if _client:
-        _client.close()
-        _client = None
-        _database = None
-        logger.info("[MongoDB] Connection closed")
+    _client = None
+    _database = None
 
 
 def get_database() -> motor.motor_asyncio.AsyncIOMotorDatabase:
@@ -90,7 +79,7 @@ def get_database() -> motor.motor_asyncio.AsyncIOMotorDatabase:
     
     For direct collection access when needed
     """
-    if not _database:
+    if _database is None:
         raise RuntimeError("[MongoDB] Database not initialized. Call init_mongodb() first.")
     return _database
 
@@ -140,14 +129,10 @@ class MongoDBConnector:
             self.db = _database
             self.client = _client
         else:
-            # Fallback: import from config and create connection
-            from .mongo_config import MONGO_URL, MONGO_DB
-            self.client = motor.motor_asyncio.AsyncIOMotorClient(
-                MONGO_URL,
-                tls=True,
-                tlsCAFile=certifi.where(),
-            )
-            self.db = self.client[MONGO_DB]
+            # Fallback: reuse the shared per-process client (never open a second pool)
+            from database.connection import db_manager
+            self.client = db_manager.client
+            self.db = db_manager.database
             logger.info("[MongoDB] Legacy connector initialized")
 
     def get_collection(self, collection_name: str):
@@ -155,9 +140,7 @@ class MongoDBConnector:
         return self.db[collection_name]
     
     async def close_connection(self):
-        """Close the connection"""
-        if self.client:
-            self.client.close()
-            self.client = None
-            self.db = None
+        """Drop references; the shared client is closed by db_manager"""
+        self.client = None
+        self.db = None
 
@@ -0,0 +1,109 @@
+# database/pool_monitor.py
+"""
+MongoDB Connection Pool Monitor
+
+Collects checkout-wait metrics from PyMongo CMAP events so worker count and
+MONGO_MAX_POOL_SIZE can be sized against the Atlas connection limit.
+Driver events fire on PyMongo's own threads, so state is guarded by a lock.
+"""
+import threading
+from typing import Any, Dict
+
+from pymongo import monitoring
+
+
+class PoolMetricsListener(monitoring.ConnectionPoolListener):
+    """
+    Connection pool listener tracking checkout waits, timeouts and pool size
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Reset all counters (called when a new client is created)"""
+        with self._lock:
+            self.connections_open = 0
+            self.connections_checked_out = 0
+            self.checkouts = 0
+            self.checkout_failures = 0
+            self.checkout_timeouts = 0
+            self.wait_total_ms = 0.0
+            self.wait_max_ms = 0.0
+            self.pool_clears = 0
+
+    # ========== Pool lifecycle ==========
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        with self._lock:
+            self.pool_clears += 1
+
+    def pool_closed(self, event):
+        pass
+
+    # ========== Connection lifecycle ==========
+
+    def connection_created(self, event):
+        with self._lock:
+            self.connections_open += 1
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.connections_open = max(0, self.connections_open - 1)
+
+    # ========== Checkout ==========
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        wait_ms = getattr(event, "duration", 0.0) * 1000
+        with self._lock:
+            self.checkout_failures += 1
+            if event.reason == monitoring.ConnectionCheckOutFailedReason.TIMEOUT:
+                self.checkout_timeouts += 1
+            self.wait_total_ms += wait_ms
+            self.wait_max_ms = max(self.wait_max_ms, wait_ms)
+
+    def connection_checked_out(self, event):
+        wait_ms = getattr(event, "duration", 0.0) * 1000
+        with self._lock:
+            self.checkouts += 1
+            self.connections_checked_out += 1
+            self.wait_total_ms += wait_ms
+            self.wait_max_ms = max(self.wait_max_ms, wait_ms)
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.connections_checked_out = max(0, self.connections_checked_out - 1)
+
+    # ========== Snapshot ==========
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return current pool metrics for this worker"""
+        with self._lock:
+            attempts = self.checkouts + self.checkout_failures
+            return {
+                "connections_open": self.connections_open,
+                "connections_checked_out": self.connections_checked_out,
+                "checkouts": self.checkouts,
+                "checkout_failures": self.checkout_failures,
+                "checkout_timeouts": self.checkout_timeouts,
+                "checkout_wait_avg_ms": round(self.wait_total_ms / attempts, 3) if attempts else 0.0,
+                "checkout_wait_max_ms": round(self.wait_max_ms, 3),
+                "pool_clears": self.pool_clears,
+            }
+
+
+# ========== Singleton Instance ==========
+pool_metrics = PoolMetricsListener()
@@ -22,7 +22,9 @@ if str(backend_dir) not in sys.path:
 from settings import settings
 from database.connection import connect_to_database, close_database_connection
 
-# Import API routers
+from utils.metrics import metrics_registry
+from core.pagination import NEXT_CURSOR_HEADER
+
 # Import API routers
 from api import (
     flashcard_router, 
@@ -30,7 +32,8 @@ from api import (
     game_router,
     course_router,
     chat_router,
-    gamification_router
+    gamification_router,
+    auth_router
 )
 from api.websocket import router as websocket_router
 
@@ -61,18 +64,80 @@ async def lifespan(app: FastAPI):
     logger.info(f"📝 Settings: DB={settings.MONGO_DB}, Debug={settings.DEBUG}")
     
     try:
+        # Per-worker client: created here (after gunicorn forks), pool warmed up
         await connect_to_database()
         logger.info("✅ Database connected successfully")
     except Exception as e:
         logger.error(f"❌ Database connection failed: {e}")
         raise
     
+    # One AI client + prebuilt prompt chains per worker, shared by all requests
+    from services.ai_service import init_ai_service
+    init_ai_service()
+    
+    if settings.MONGO_SYNC_INDEXES_ON_STARTUP:
+        # Idempotent: only creates indexes that are missing
+        from repositories.indexes import sync_all_indexes
+        await sync_all_indexes()
+        logger.info("✅ Repository indexes reconciled")
+    
+    if settings.EMBEDDING_CACHE_ENABLED:
+        # Vectors of a previous EMBEDDING_MODEL can never be hit again; then
+        # bring the collection back under its size cap
+        from services.embedding_cache import embedding_cache
+        try:
+            await embedding_cache.purge_other_models()
+            await embedding_cache.prune()
+        except Exception as e:
+            logger.warning(f"⚠️ Embedding cache purge failed: {e}")
+    
+    if settings.RAG_ANSWER_CACHE_ENABLED:
+        # Answers cached before the restart (or by other workers)
+        from services.answer_cache import answer_cache
+        try:
+            await answer_cache.load()
+        except Exception as e:
+            logger.warning(f"⚠️ RAG answer cache load failed: {e}")
+    
+    if settings.CACHE_INVALIDATION_ENABLED:
+        # Keeps this worker's caches in sync with writes made by other workers
+        from database.change_watcher import catalog_watcher
+        await catalog_watcher.start()
+    
+    if settings.AR_EXPERIENCE_MODE == "bundle" and settings.AR_BUNDLE_BUILDER_ENABLED:
+        # One worker (the lease holder) rebuilds bundles for the whole deployment
+        from services.ar_bundle_service import ar_bundle_builder
+        ar_bundle_builder.start()
+    
+    # Seeds the in-memory leaderboard in the background, then resyncs it periodically
+    from services.leaderboard import leaderboard
+    leaderboard.start()
+    
     logger.info("✅ Application started successfully")
     
     yield  # Application runs here
     
     # Shutdown
     logger.info("🔄 Shutting down Eduplatform AR API...")
+    if settings.CACHE_INVALIDATION_ENABLED:
+        from database.change_watcher import catalog_watcher
+        await catalog_watcher.stop()
+    # Buffered point awards are written before the client closes
+    from services.award_buffer import award_buffer
+    await award_buffer.stop()
+    from services.leaderboard import leaderboard
+    await leaderboard.stop()
+    # Running background jobs are recorded as interrupted while the client is still open
+    from services.job_runner import job_runner
+    await job_runner.stop()
+    # Let queued bundle rebuilds finish while the client is still open
+    from services.ar_bundle_service import ar_bundle_builder
+    await ar_bundle_builder.stop()
+    from services.embedding_client import embedding_client
+    embedding_client.shutdown()
+    from core.password_hasher import password_hasher, bulk_password_hasher
+    password_hasher.shutdown()
+    bulk_password_hasher.shutdown()
     await close_database_connection()
     logger.info("✅ Application shut down successfully")
 
@@ -96,6 +161,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER, "ETag"],
 )
 
 
@@ -181,6 +247,14 @@ async def health_check():
     }
 
 
+@app.get("/metrics", tags=["System"])
+async def metrics():
+    """
+    Per-worker runtime metrics (connection pool, caches, ...)
+    """
+    return metrics_registry.snapshot()
+
+
 @app.get("/", tags=["System"])
 async def root():
     """Root endpoint"""
@@ -30,3 +30,8 @@ class LeaderboardEntrySchema(BaseModel):
     avatar_url: Optional[str] = None
     points: int
     rank: int
+
+class UserRankSchema(BaseModel):
+    entry: Optional[LeaderboardEntrySchema] = None  # None: user has no points yet
+    neighbours: List[LeaderboardEntrySchema] = []  # Users around (and including) the user
+    total_players: int = 0
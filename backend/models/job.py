@@ -0,0 +1,61 @@
+# backend/models/job.py
+"""
+Background Job Models - API schemas for the jobs collection
+"""
+from pydantic import AliasChoices, BaseModel, Field
+from typing import Any, Dict, List, Optional
+from datetime import datetime
+
+
+class JobProgressSchema(BaseModel):
+    """Progress counters reported by a running job"""
+    total: int = 0
+    processed: int = 0
+    skipped: int = 0  # Already up to date (reconcile)
+    succeeded: int = 0
+    failed: int = 0
+    api_calls: int = 0
+    cards_per_second: float = 0.0
+    eta_seconds: Optional[int] = None
+
+
+class JobAcceptedSchema(BaseModel):
+    """Response of an endpoint that enqueues a job"""
+    job_id: str = Field(validation_alias=AliasChoices("_id", "job_id"))
+    status: str
+    status_url: str
+
+
+class JobStatusSchema(BaseModel):
+    """Status of a background job (readable from any worker)"""
+    job_id: str = Field(validation_alias=AliasChoices("_id", "job_id"))
+    type: str
+    status: str  # queued | running | completed | failed | interrupted
+    params: Dict[str, Any] = {}
+    progress: JobProgressSchema = JobProgressSchema()
+    failed_ids: List[str] = []
+    error: Optional[str] = None
+    worker: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "job_id": "5f1c0e7a9b0d4c3e8a2b6d1f0e9c8b7a",
+                "type": "batch_embed",
+                "status": "running",
+                "params": {"limit": None, "mode": "missing"},
+                "progress": {
+                    "total": 12000, "processed": 4200, "skipped": 0, "succeeded": 4195, "failed": 5,
+                    "api_calls": 215, "cards_per_second": 38.4, "eta_seconds": 203
+                },
+                "failed_ids": ["apple_001"],
+                "error": None,
+                "worker": "web-1:4211",
+                "created_at": "2024-01-01T12:00:00Z",
+                "started_at": "2024-01-01T12:00:00Z",
+                "finished_at": None
+            }
+        }
@@ -109,3 +109,22 @@ class UserResponse(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class UserImportRowResult(BaseModel):
+    """Outcome of one row of a bulk import"""
+    row: int  # Line number in the uploaded file
+    email: Optional[str] = None
+    username: Optional[str] = None
+    status: str  # created | error
+    id: Optional[str] = None
+    error: Optional[str] = None
+
+class UserImportReport(BaseModel):
+    """Per-row report of POST /auth/import"""
+    total: int
+    created: int
+    failed: int
+    truncated: bool = False  # Rows beyond USER_IMPORT_MAX_ROWS were not read
+    elapsed_ms: float
+    rows: List[UserImportRowResult]
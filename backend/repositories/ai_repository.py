@@ -1,4 +1,5 @@
 from typing import Optional, List
+from pymongo import IndexModel, ASCENDING
 from database.base_repo import BaseRepository
 from models.ai_model import AIConfigSchema
 import logging
@@ -6,6 +7,10 @@ import logging
 logger = logging.getLogger(__name__)
 
 class AIRepository(BaseRepository):
+    indexes = [
+        IndexModel([("is_active", ASCENDING)], name="is_active_1"),
+    ]
+
     def __init__(self):
         super().__init__("ai_configs")
 
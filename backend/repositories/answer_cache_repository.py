@@ -0,0 +1,78 @@
+# backend/repositories/answer_cache_repository.py
+"""
+Answer Cache Repository - Persistent tier of the semantic RAG answer cache
+
+Each document is one answered question: its normalized query embedding
+(packed float32), the qr_ids of the flashcards it was answered from, the
+answer and its hit count. Workers load the newest entries at startup.
+"""
+from typing import Optional, List, Dict, Any
+from datetime import datetime
+from pymongo import IndexModel, ASCENDING, DESCENDING
+from core.base_repository import BaseRepository
+from repositories.embedding_cache_repository import pack_vector
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class AnswerCacheRepository(BaseRepository):
+    """Repository for rag_answer_cache collection"""
+
+    indexes = [
+        IndexModel([("model", ASCENDING), ("created_at", DESCENDING)], name="model_1_created_at_-1"),
+        IndexModel([("source_ids", ASCENDING)], name="source_ids_1"),
+        # Each entry carries its own expiry
+        IndexModel([("expires_at", ASCENDING)], name="expires_at_ttl", expireAfterSeconds=0),
+    ]
+
+    def __init__(self):
+        super().__init__("rag_answer_cache")
+
+    async def load_entries(self, model: str, limit: int) -> List[Dict[str, Any]]:
+        """Newest unexpired entries for an embedding model"""
+        cursor = self.collection.find(
+            {"model": model, "expires_at": {"$gt": datetime.utcnow()}}
+        ).sort("created_at", DESCENDING).limit(limit)
+        return await cursor.to_list(length=limit)
+
+    async def save_entry(
+        self,
+        entry_id: str,
+        model: str,
+        question: str,
+        vector: List[float],
+        source_ids: List[str],
+        response: str,
+        sources: List[Dict[str, Any]],
+        expires_at: datetime
+    ) -> None:
+        await self.collection.insert_one({
+            "_id": entry_id,
+            "model": model,
+            "question": question,
+            "vector": pack_vector(vector),
+            "source_ids": source_ids,
+            "response": response,
+            "sources": sources,
+            "hits": 0,
+            "created_at": datetime.utcnow(),
+            "expires_at": expires_at,
+        })
+
+    async def increment_hits(self, entry_id: str, count: int = 1) -> None:
+        await self.collection.update_one(
+            {"_id": entry_id},
+            {"$inc": {"hits": count}, "$set": {"last_hit_at": datetime.utcnow()}}
+        )
+
+    async def delete_by_sources(self, qr_ids: Optional[List[str]] = None) -> int:
+        """Delete entries answered from any of these flashcards (None = all)"""
+        if qr_ids is None:
+            return await self.delete_many({})
+        return await self.delete_many({"source_ids": {"$in": qr_ids}})
+
+
+def get_answer_cache_repository() -> AnswerCacheRepository:
+    """Factory function for dependency injection"""
+    return AnswerCacheRepository()
@@ -0,0 +1,91 @@
+# backend/repositories/ar_bundle_repository.py
+"""
+AR Bundle Repository - Materialized AR experience bundles
+
+One document per flashcard, keyed by qr_id (_id), holding exactly the
+ARExperienceResponseSchema shape plus the source ids used to find the bundles
+affected by a change.
+"""
+from typing import Optional, List, Dict, Any
+from datetime import datetime
+from pymongo import IndexModel, ASCENDING
+from core.base_repository import BaseRepository
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Only the response shape is read on the scan path
+BUNDLE_PROJECTION: Dict[str, Any] = {
+    "_id": 0,
+    "flashcard": 1,
+    "target": 1,
+    "related_combos": 1,
+}
+
+
+class ARBundleRepository(BaseRepository):
+    """
+    Repository for ar_experience_bundles collection
+    Written by ARBundleService, read by ARService in "bundle" mode
+    """
+
+    indexes = [
+        IndexModel([("ar_tag", ASCENDING)], name="ar_tag_1"),
+        IndexModel([("flashcard_id", ASCENDING)], name="flashcard_id_1"),
+        IndexModel([("target_id", ASCENDING)], name="target_id_1"),
+        IndexModel([("combo_ids", ASCENDING)], name="combo_ids_1"),
+    ]
+
+    def __init__(self):
+        super().__init__("ar_experience_bundles")
+
+    async def get_bundle(self, qr_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Read the served bundle for a QR ID (single _id lookup)
+
+        Returns:
+            {"flashcard", "target", "related_combos"} or None
+        """
+        return await self.collection.find_one({"_id": qr_id}, BUNDLE_PROJECTION)
+
+    async def save_bundle(self, qr_id: str, bundle: Dict[str, Any]) -> bool:
+        """
+        Replace (or insert) the bundle for a QR ID
+
+        Args:
+            qr_id: Flashcard QR identifier
+            bundle: {"flashcard", "target", "related_combos"} from the live join
+        """
+        target = bundle.get("target") or {}
+        document = {
+            "_id": qr_id,
+            "ar_tag": bundle["flashcard"].get("ar_tag"),
+            "flashcard_id": bundle["flashcard"].get("_id"),
+            "target_id": target.get("_id"),
+            "combo_ids": [c.get("_id") for c in bundle.get("related_combos", [])],
+            "flashcard": bundle["flashcard"],
+            "target": bundle.get("target"),
+            "related_combos": bundle.get("related_combos", []),
+            "built_at": datetime.utcnow(),
+        }
+        result = await self.collection.replace_one({"_id": qr_id}, document, upsert=True)
+        return result.acknowledged
+
+    async def delete_bundle(self, qr_id: str) -> bool:
+        """Remove the bundle of a deleted flashcard"""
+        return await self.delete_one({"_id": qr_id})
+
+    async def find_qr_ids(self, filter: Dict[str, Any]) -> List[str]:
+        """QR IDs of the bundles matching a filter on the source-id fields"""
+        cursor = self.collection.find(filter, {"_id": 1})
+        return [doc["_id"] async for doc in cursor]
+
+    async def iter_qr_ids(self):
+        """Async iterator over the QR IDs of all stored bundles"""
+        async for doc in self.collection.find({}, {"_id": 1}):
+            yield doc["_id"]
+
+
+def get_ar_bundle_repository() -> ARBundleRepository:
+    """Factory function for dependency injection"""
+    return ARBundleRepository()
@@ -3,18 +3,39 @@
 AR Combination Repository - Data Access Layer for multi-marker combos
 """
 from typing import Optional, List, Dict, Any
+from pymongo import IndexModel, ASCENDING
 from core.base_repository import BaseRepository
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+# Fields served with an AR experience (ArCombinationSchema)
+COMBO_PROJECTION: Dict[str, Any] = {
+    "_id": 1,
+    "combo_id": 1,
+    "description": 1,
+    "required_tags": 1,
+    "model_3d_url": 1,
+    "image_2d_url": 1,
+    "center_transform": 1,
+}
+
+
 class ARCombinationRepository(BaseRepository):
     """
     Repository for ar_combinations collection
     Handles multi-flashcard AR combos
     """
     
+    indexes = [
+        IndexModel([("combo_id", ASCENDING)], name="combo_id_1", unique=True),
+        # Multikey: serves required_tags equality, $all and $in lookups
+        IndexModel([("required_tags", ASCENDING)], name="required_tags_1"),
+    ]
+    
+    string_ids = True  # Catalog reads: ObjectIds decode to str
+    
     def __init__(self):
         super().__init__("ar_combinations")
     
@@ -29,7 +50,7 @@ class ARCombinationRepository(BaseRepository):
             AR combination document or None
         """
         logger.debug(f"🔍 [SEARCH] AR Combo by combo_id: {combo_id}")
-        return await self.find_one({"combo_id": combo_id})
+        return await self.find_one({"combo_id": combo_id}, COMBO_PROJECTION)
     
     async def find_by_tag(self, ar_tag: str) -> List[Dict[str, Any]]:
         """
@@ -43,7 +64,8 @@ class ARCombinationRepository(BaseRepository):
         """
         logger.debug(f"🔍 [SEARCH] AR Combos containing tag: {ar_tag}")
         return await self.find_many(
-            filter={"required_tags": ar_tag}
+            filter={"required_tags": ar_tag},
+            projection=COMBO_PROJECTION
         )
     
     async def find_by_tags(self, ar_tags: List[str]) -> List[Dict[str, Any]]:
@@ -57,7 +79,8 @@ class ARCombinationRepository(BaseRepository):
             List of AR combination documents
         """
         return await self.find_many(
-            filter={"required_tags": {"$all": ar_tags}}
+            filter={"required_tags": {"$all": ar_tags}},
+            projection=COMBO_PROJECTION
         )
     
     async def find_by_any_tag(self, ar_tags: List[str]) -> List[Dict[str, Any]]:
@@ -71,7 +94,8 @@ class ARCombinationRepository(BaseRepository):
             List of AR combination documents
         """
         return await self.find_many(
-            filter={"required_tags": {"$in": ar_tags}}
+            filter={"required_tags": {"$in": ar_tags}},
+            projection=COMBO_PROJECTION
         )
 
 
@@ -3,49 +3,81 @@
 AR Object Repository - Data Access Layer for AR targets/markers
 """
 from typing import Optional, List, Dict, Any
+from pymongo import IndexModel, ASCENDING
 from core.base_repository import BaseRepository
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+# Fields served with an AR experience (ArObjectSchema)
+TARGET_PROJECTION: Dict[str, Any] = {
+    "_id": 1,
+    "ar_tag": 1,
+    "description": 1,
+    "animation_type": 1,
+    "glb_size": 1,
+    "nft_base_url": 1,
+    "model_3d_url": 1,
+    "image_2d_url": 1,
+    "position": 1,
+    "rotation": 1,
+    "scale": 1,
+    "created_at": 1,
+}
+
+
 class ARObjectRepository(BaseRepository):
     """
     Repository for ar_objects collection
     Handles AR markers, targets, and 3D models data
     """
     
+    indexes = [
+        IndexModel([("ar_tag", ASCENDING)], name="ar_tag_1", unique=True),
+    ]
+    
+    string_ids = True  # Catalog reads: ObjectIds decode to str
+    
     def __init__(self):
         super().__init__("ar_objects")
     
-    async def get_by_tag(self, ar_tag: str) -> Optional[Dict[str, Any]]:
+    async def get_by_tag(
+        self,
+        ar_tag: str,
+        projection: Optional[Dict[str, Any]] = TARGET_PROJECTION
+    ) -> Optional[Dict[str, Any]]:
         """
         Find AR object by tag
         
         Args:
             ar_tag: AR tracking tag (e.g., 'elephant', 'dog')
+            projection: Fields to return (default: TARGET_PROJECTION)
             
         Returns:
             AR object document or None
         """
         logger.debug(f"🔍 [SEARCH] AR Object by tag: {ar_tag}")
-        return await self.find_one({"ar_tag": ar_tag})
+        return await self.find_one({"ar_tag": ar_tag}, projection)
     
     async def get_by_marker_type(
         self,
-        marker_type: str
+        marker_type: str,
+        projection: Optional[Dict[str, Any]] = TARGET_PROJECTION
     ) -> List[Dict[str, Any]]:
         """
         Get AR objects by marker type (e.g., 'NFT', 'HIRO', 'KANJI')
         
         Args:
             marker_type: Type of AR marker
+            projection: Fields to return (default: TARGET_PROJECTION)
             
         Returns:
             List of AR object documents
         """
         return await self.find_many(
-            filter={"marker_type": marker_type}
+            filter={"marker_type": marker_type},
+            projection=projection
         )
 
 
@@ -1,4 +1,5 @@
 from typing import List, Optional, Dict, Any
+from pymongo import IndexModel, ASCENDING, DESCENDING
 from database.base_repo import BaseRepository
 import logging
 from datetime import datetime
@@ -7,6 +8,10 @@ from bson import ObjectId
 logger = logging.getLogger(__name__)
 
 class ChatRepository(BaseRepository):
+    indexes = [
+        IndexModel([("user_id", ASCENDING), ("updated_at", DESCENDING)], name="user_id_1_updated_at_-1"),
+    ]
+
     def __init__(self):
         super().__init__("chat_history")
 
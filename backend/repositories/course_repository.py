@@ -1,20 +1,39 @@
 from typing import List, Optional, Dict, Any
+from pymongo import IndexModel, ASCENDING, DESCENDING
 from database.base_repo import BaseRepository
+from core.pagination import Page
 from models.course_model import CourseSchema
 import logging
 
 logger = logging.getLogger(__name__)
 
 class CourseRepository(BaseRepository):
+    indexes = [
+        # Published listing keyset pagination on (created_at, _id)
+        IndexModel(
+            [("is_published", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+            name="is_published_1_created_at_-1__id_-1"
+        ),
+        IndexModel([("level", ASCENDING), ("is_published", ASCENDING)], name="level_1_is_published_1"),
+    ]
+
     def __init__(self):
         super().__init__("courses")
 
-    async def get_all_published(self, skip: int = 0, limit: int = 20) -> List[Dict[str, Any]]:
-        return await self.find_many(
+    async def get_all_published(
+        self,
+        skip: int = 0,
+        limit: int = 20,
+        after: Optional[str] = None
+    ) -> Page:
+        """Newest published courses first, keyset-paginated on (created_at, _id)"""
+        return await self.find_page(
             filter={"is_published": True},
-            skip=skip,
+            sort_key="created_at",
+            direction=-1,
             limit=limit,
-            sort=[("created_at", -1)]
+            after=after,
+            skip=skip
         )
 
     async def get_by_level(self, level: str) -> List[Dict[str, Any]]:
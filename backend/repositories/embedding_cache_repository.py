@@ -0,0 +1,124 @@
+# backend/repositories/embedding_cache_repository.py
+"""
+Embedding Cache Repository - Persistent tier of the embedding cache
+
+Documents are keyed by hash(model, task_type, normalized text) and store the
+vector as packed float32 bytes (3 KB for 768 dimensions). Entries expire after
+EMBEDDING_CACHE_TTL_DAYS; prune_oldest() additionally caps the document count.
+"""
+from array import array
+from typing import Dict, Iterable, Optional, List
+from datetime import datetime
+from bson import Binary
+from pymongo import IndexModel, ASCENDING, UpdateOne
+from core.base_repository import BaseRepository
+from settings import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def pack_vector(vector: List[float]) -> Binary:
+    return Binary(array("f", vector).tobytes())
+
+
+def unpack_vector(data: bytes) -> array:
+    vector = array("f")
+    vector.frombytes(data)
+    return vector
+
+
+class EmbeddingCacheRepository(BaseRepository):
+    """Repository for embedding_cache collection"""
+
+    indexes = [
+        IndexModel([("model", ASCENDING)], name="model_1"),
+        # Age bound: entries expire EMBEDDING_CACHE_TTL_DAYS after being stored.
+        # Also serves prune_oldest() (oldest first).
+        IndexModel(
+            [("created_at", ASCENDING)],
+            name="created_at_ttl",
+            expireAfterSeconds=settings.EMBEDDING_CACHE_TTL_DAYS * 86400
+        ),
+    ]
+
+    def __init__(self):
+        super().__init__("embedding_cache")
+
+    async def get_vector(self, key: str) -> Optional[array]:
+        """Stored vector for a cache key, or None"""
+        doc = await self.collection.find_one({"_id": key}, {"_id": 0, "vector": 1})
+        return unpack_vector(doc["vector"]) if doc else None
+
+    async def save_vector(self, key: str, model: str, task_type: str, vector: List[float]) -> None:
+        """Store a vector (idempotent: concurrent writers store the same value)"""
+        await self.collection.update_one(
+            {"_id": key},
+            {"$setOnInsert": {
+                "model": model,
+                "task_type": task_type,
+                "dims": len(vector),
+                "vector": pack_vector(vector),
+                "created_at": datetime.utcnow(),
+            }},
+            upsert=True
+        )
+
+    async def get_vectors(self, keys: Iterable[str]) -> Dict[str, array]:
+        """Stored vectors for many cache keys in one query (missing keys are absent)"""
+        keys = list(keys)
+        if not keys:
+            return {}
+        cursor = self.collection.find({"_id": {"$in": keys}}, {"vector": 1})
+        return {doc["_id"]: unpack_vector(doc["vector"]) async for doc in cursor}
+
+    async def save_vectors(self, model: str, task_type: str, vectors: Dict[str, List[float]]) -> None:
+        """Store many vectors in one unordered bulk_write (idempotent like save_vector)"""
+        if not vectors:
+            return
+        now = datetime.utcnow()
+        operations = [
+            UpdateOne(
+                {"_id": key},
+                {"$setOnInsert": {
+                    "model": model,
+                    "task_type": task_type,
+                    "dims": len(vector),
+                    "vector": pack_vector(vector),
+                    "created_at": now,
+                }},
+                upsert=True
+            )
+            for key, vector in vectors.items()
+        ]
+        await self.collection.bulk_write(operations, ordered=False)
+
+    async def prune_oldest(self, max_size: int) -> int:
+        """
+        Delete the oldest entries beyond max_size documents
+
+        Entries stored in the same instant as the oldest kept one survive, so
+        the collection may stay marginally above max_size.
+
+        Returns:
+            Number of entries deleted
+        """
+        excess = await self.collection.estimated_document_count() - max_size
+        if excess <= 0:
+            return 0
+        # First entry to keep: one seek on the created_at index
+        keep = await self.collection.find({}, {"created_at": 1}).sort(
+            "created_at", ASCENDING
+        ).skip(excess).limit(1).to_list(length=1)
+        if not keep:
+            return 0
+        return await self.delete_many({"created_at": {"$lt": keep[0]["created_at"]}})
+
+    async def delete_other_models(self, model: str) -> int:
+        """Drop entries computed with any other embedding model"""
+        return await self.delete_many({"model": {"$ne": model}})
+
+
+def get_embedding_cache_repository() -> EmbeddingCacheRepository:
+    """Factory function for dependency injection"""
+    return EmbeddingCacheRepository()
@@ -2,88 +2,231 @@
 """
 Flashcard Repository - Data Access Layer
 """
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
+from datetime import datetime
+from pymongo import IndexModel, ASCENDING, UpdateOne
+from pymongo.errors import BulkWriteError
 from database.base_repo import BaseRepository
+from core.pagination import Page
+from repositories.ar_object_repository import TARGET_PROJECTION
+from repositories.ar_combination_repository import COMBO_PROJECTION
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+# ========== Projections ==========
+# Fields served to AR / category / search clients (FlashcardSchema).
+# Excludes vector_embedding (768 floats, ~7 KB BSON per card) and metadata.
+CARD_PROJECTION: Dict[str, Any] = {
+    "_id": 1,
+    "qr_id": 1,
+    "word": 1,
+    "translation": 1,
+    "category": 1,
+    "image_url": 1,
+    "audio_url": 1,
+    "difficulty": 1,
+    "ar_tag": 1,
+}
+
+# Fields needed to (re)build the embedding text and tell whether it is stale
+EMBEDDING_SOURCE_PROJECTION: Dict[str, Any] = {
+    "_id": 1,
+    "qr_id": 1,
+    "word": 1,
+    "definition": 1,
+    "translation": 1,
+    "embedding_hash": 1,
+    "embedding_model": 1,
+}
+
+# Pass projection=None to read the whole document (including the vector)
+FULL_DOCUMENT = None
+
+# Updated fields that no served view depends on (embedding writes)
+UNSERVED_FIELDS = frozenset({"vector_embedding", "embedding_hash", "embedding_model", "updated_at"})
+
+
+def touches_served_fields(updated_fields: Optional[List[str]]) -> bool:
+    """False when an update only changed UNSERVED_FIELDS (None = unknown = True)"""
+    return updated_fields is None or not set(updated_fields) <= UNSERVED_FIELDS
+
+
 class FlashcardRepository(BaseRepository):
     """
     Repository for flashcards collection
     Handles all database operations related to flashcards
+    
+    Read methods default to CARD_PROJECTION; callers that really need
+    vector_embedding must ask for it (get_embedding or projection=FULL_DOCUMENT).
     """
     
+    # qr_id (unique), category and difficulty are also declared on the Beanie
+    # Flashcard document; both declarations must stay in sync.
+    indexes = [
+        IndexModel([("qr_id", ASCENDING)], name="qr_id_1", unique=True),
+        IndexModel([("ar_tag", ASCENDING)], name="ar_tag_1"),
+        # Category listing keyset pagination on (word, _id)
+        IndexModel(
+            [("category", ASCENDING), ("word", ASCENDING), ("_id", ASCENDING)],
+            name="category_1_word_1__id_1"
+        ),
+        IndexModel([("category", ASCENDING)], name="category_1"),
+        IndexModel([("difficulty", ASCENDING)], name="difficulty_1"),
+    ]
+    
+    # Catalog reads: ObjectIds (including those of joined documents) decode to str
+    string_ids = True
+    
     def __init__(self):
         super().__init__("flashcards")
     
-    async def get_by_qr_id(self, qr_id: str) -> Optional[Dict[str, Any]]:
+    async def get_by_qr_id(
+        self,
+        qr_id: str,
+        projection: Optional[Dict[str, Any]] = CARD_PROJECTION
+    ) -> Optional[Dict[str, Any]]:
         """
         Find flashcard by QR ID
         
         Args:
             qr_id: QR code identifier (e.g., 'ele123')
+            projection: Fields to return (default: CARD_PROJECTION)
             
         Returns:
             Flashcard document or None
         """
         logger.debug(f"🔍 [SEARCH] Flashcard by qr_id: {qr_id}")
-        result = await self.collection.find_one({"qr_id": qr_id})
-        if result and "_id" in result:
-            result["_id"] = str(result["_id"])
-        return result
+        return await self.find_one({"qr_id": qr_id}, projection)
     
-    async def get_by_ar_tag(self, ar_tag: str) -> Optional[Dict[str, Any]]:
+    async def get_ar_experience_bundle(self, qr_id: str) -> Optional[Dict[str, Any]]:
         """
-        Find flashcard by AR tag
+        Fetch flashcard, AR target and related combos in one round trip
+        
+        Aggregation on flashcards with $lookup into ar_objects (by ar_tag) and
+        ar_combinations (ar_tag in required_tags). Both lookups hit the
+        ar_tag_1 / required_tags_1 indexes. Requires MongoDB 5.0+
+        (localField/foreignField combined with a lookup pipeline).
         
         Args:
-            ar_tag: AR tracking tag
+            qr_id: QR code identifier
             
         Returns:
-            Flashcard document or None
+            {"flashcard", "target", "related_combos"} or None if no flashcard
         """
-        return await self.find_one({"ar_tag": ar_tag})
+        pipeline = [
+            {"$match": {"qr_id": qr_id}},
+            {"$limit": 1},
+            {"$project": CARD_PROJECTION},
+            {
+                "$lookup": {
+                    "from": "ar_objects",
+                    "localField": "ar_tag",
+                    "foreignField": "ar_tag",
+                    "pipeline": [{"$limit": 1}, {"$project": TARGET_PROJECTION}],
+                    "as": "_target",
+                }
+            },
+            {
+                "$lookup": {
+                    "from": "ar_combinations",
+                    "localField": "ar_tag",
+                    "foreignField": "required_tags",
+                    "pipeline": [{"$project": COMBO_PROJECTION}],
+                    "as": "_related_combos",
+                }
+            },
+        ]
+        results = await self.reader.aggregate(pipeline).to_list(length=1)
+        if not results:
+            return None
+        
+        flashcard = results[0]
+        targets = flashcard.pop("_target", [])
+        combos = flashcard.pop("_related_combos", [])
+        
+        # Without an ar_tag there is nothing to join (matches the per-query path)
+        has_tag = bool(flashcard.get("ar_tag"))
+        return {
+            "flashcard": flashcard,
+            "target": targets[0] if has_tag and targets else None,
+            "related_combos": combos if has_tag else [],
+        }
     
-    async def get_by_category(self, category: str) -> List[Dict[str, Any]]:
+    async def get_qr_ids_by_ar_tags(self, ar_tags: List[str]) -> List[str]:
+        """QR IDs of the flashcards using any of the given AR tags (ar_tag_1 index)"""
+        if not ar_tags:
+            return []
+        cursor = self.collection.find({"ar_tag": {"$in": ar_tags}}, {"_id": 0, "qr_id": 1})
+        return [doc["qr_id"] async for doc in cursor if doc.get("qr_id")]
+    
+    async def iter_qr_ids(self, batch_size: int = 500):
+        """Async iterator over every flashcard qr_id (full rebuilds and checks)"""
+        cursor = self.collection.find({}, {"_id": 0, "qr_id": 1}).batch_size(batch_size)
+        async for doc in cursor:
+            if doc.get("qr_id"):
+                yield doc["qr_id"]
+    
+    async def get_embedding(self, qr_id: str) -> Optional[List[float]]:
         """
-        Get flashcards by category
+        Explicitly read the vector embedding of a flashcard
         
         Args:
-            category: Category name
+            qr_id: QR code identifier
             
         Returns:
-            List of flashcard documents
+            Embedding vector or None if missing
         """
-        cursor = self.collection.find({"category": category})
-        results = await cursor.to_list(length=100)
-        for result in results:
-            if "_id" in result:
-                result["_id"] = str(result["_id"])
-        return results
+        result = await self.collection.find_one(
+            {"qr_id": qr_id},
+            {"_id": 0, "vector_embedding": 1}
+        )
+        return result.get("vector_embedding") if result else None
     
-    async def search_by_word(self, word: str) -> List[Dict[str, Any]]:
+    async def get_by_ar_tag(
+        self,
+        ar_tag: str,
+        projection: Optional[Dict[str, Any]] = CARD_PROJECTION
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Find flashcard by AR tag
+        
+        Args:
+            ar_tag: AR tracking tag
+            projection: Fields to return (default: CARD_PROJECTION)
+            
+        Returns:
+            Flashcard document or None
+        """
+        return await self.find_one({"ar_tag": ar_tag}, projection)
+    
+    async def search_by_word(
+        self,
+        word: str,
+        projection: Optional[Dict[str, Any]] = CARD_PROJECTION
+    ) -> List[Dict[str, Any]]:
         """
         Search flashcards by word (case-insensitive)
         
         Args:
             word: Word to search
+            projection: Fields to return (default: CARD_PROJECTION)
             
         Returns:
             List of flashcard documents
         """
-        cursor = self.collection.find({"word": {"$regex": word, "$options": "i"}})
-        results = await cursor.to_list(length=100)
-        for result in results:
-            if "_id" in result:
-                result["_id"] = str(result["_id"])
-        return results
+        return await self.find_many(
+            filter={"word": {"$regex": word, "$options": "i"}},
+            limit=100,
+            projection=projection
+        )
     
     async def get_by_qr_id_and_ar_tag(
         self, 
         qr_id: str, 
-        ar_tag: str
+        ar_tag: str,
+        projection: Optional[Dict[str, Any]] = CARD_PROJECTION
     ) -> Optional[Dict[str, Any]]:
         """
         Find flashcard by both QR ID and AR tag
@@ -91,41 +234,50 @@ class FlashcardRepository(BaseRepository):
         Args:
             qr_id: QR code identifier
             ar_tag: AR tracking tag
+            projection: Fields to return (default: CARD_PROJECTION)
             
         Returns:
             Flashcard document or None
         """
-        return await self.find_one({"qr_id": qr_id, "ar_tag": ar_tag})
+        return await self.find_one({"qr_id": qr_id, "ar_tag": ar_tag}, projection)
     
     async def get_by_category(
         self, 
         category: str,
         skip: int = 0,
-        limit: int = 50
-    ) -> List[Dict[str, Any]]:
+        limit: int = 50,
+        after: Optional[str] = None,
+        projection: Optional[Dict[str, Any]] = CARD_PROJECTION
+    ) -> Page:
         """
-        Get flashcards by category with pagination
+        Get flashcards by category, sorted alphabetically, with keyset pagination
         
         Args:
             category: Category name (e.g., 'animals', 'fruits')
-            skip: Number of documents to skip
+            skip: Legacy offset (ignored when a cursor is given)
             limit: Maximum number of documents to return
+            after: Cursor token from the previous page
+            projection: Fields to return (default: CARD_PROJECTION)
             
         Returns:
-            List of flashcard documents
+            Page of flashcard documents with the next-page cursor
         """
-        return await self.find_many(
+        return await self.find_page(
             filter={"category": category},
-            skip=skip,
+            sort_key="word",
+            direction=1,
             limit=limit,
-            sort=[("word", 1)]  # Sort alphabetically
+            after=after,
+            skip=skip,
+            projection=projection
         )
     
     async def get_by_difficulty(
         self,
         difficulty: str,
         skip: int = 0,
-        limit: int = 50
+        limit: int = 50,
+        projection: Optional[Dict[str, Any]] = CARD_PROJECTION
     ) -> List[Dict[str, Any]]:
         """
         Get flashcards by difficulty level
@@ -134,6 +286,7 @@ class FlashcardRepository(BaseRepository):
             difficulty: Difficulty level ('easy', 'medium', 'hard')
             skip: Number of documents to skip
             limit: Maximum number of documents to return
+            projection: Fields to return (default: CARD_PROJECTION)
             
         Returns:
             List of flashcard documents
@@ -141,7 +294,8 @@ class FlashcardRepository(BaseRepository):
         return await self.find_many(
             filter={"difficulty": difficulty},
             skip=skip,
-            limit=limit
+            limit=limit,
+            projection=projection
         )
     
     async def vector_search(
@@ -191,14 +345,9 @@ class FlashcardRepository(BaseRepository):
         ]
         
         try:
-            cursor = self.collection.aggregate(pipeline)
+            cursor = self.reader.aggregate(pipeline)
             results = await cursor.to_list(length=limit)
             
-            # Convert ObjectId to string
-            for result in results:
-                if "_id" in result:
-                    result["_id"] = str(result["_id"])
-            
             logger.info(f"[VectorSearch] Found {len(results)} results")
             return results
         except Exception as e:
@@ -217,21 +366,106 @@ class FlashcardRepository(BaseRepository):
         Returns:
             List of flashcard documents without embeddings
         """
-        cursor = self.collection.find(
+        cursor = self.reader.find(
             {"vector_embedding": {"$exists": False}},
-            {"_id": 1, "qr_id": 1, "word": 1, "definition": 1, "translation": 1}
+            EMBEDDING_SOURCE_PROJECTION
         ).limit(limit)
         
-        results = await cursor.to_list(length=limit)
-        for result in results:
-            if "_id" in result:
-                result["_id"] = str(result["_id"])
-        return results
+        return await cursor.to_list(length=limit)
+    
+    async def get_flashcards_without_embedding_page(
+        self,
+        limit: int = 200,
+        after: Optional[str] = None
+    ) -> Page:
+        """
+        One page of flashcards lacking an embedding, in _id order
+        
+        Keyset pagination keeps every page equally cheap across 100k+ cards;
+        the cursor is what backfills checkpoint.
+        
+        Args:
+            limit: Page size
+            after: Cursor token from the previous page
+        """
+        return await self.find_page(
+            filter={"vector_embedding": {"$exists": False}},
+            sort_key="_id",
+            limit=limit,
+            after=after,
+            projection=EMBEDDING_SOURCE_PROJECTION
+        )
+    
+    async def get_embedding_sources_page(
+        self,
+        limit: int = 200,
+        after: Optional[str] = None
+    ) -> Page:
+        """
+        One page of all flashcards with their embedding text fields, hash
+        and model (no vector), in _id order - the reconciler's scan
+        
+        Args:
+            limit: Page size
+            after: Cursor token from the previous page
+        """
+        return await self.find_page(
+            filter={},
+            sort_key="_id",
+            limit=limit,
+            after=after,
+            projection=EMBEDDING_SOURCE_PROJECTION
+        )
+    
+    async def count_without_embedding(self) -> int:
+        """Number of flashcards lacking an embedding"""
+        return await self.count({"vector_embedding": {"$exists": False}})
+    
+    async def bulk_update_embeddings(
+        self,
+        embeddings: Dict[str, Tuple[List[float], str]],
+        model: str
+    ) -> Tuple[int, List[str]]:
+        """
+        Write many embeddings in one unordered bulk_write
+        
+        Args:
+            embeddings: {qr_id: (vector, hash of the embedded text)}
+            model: Embedding model that produced the vectors
+            
+        Returns:
+            (modified count, qr_ids whose write failed)
+        """
+        if not embeddings:
+            return 0, []
+        now = datetime.utcnow()
+        qr_ids = list(embeddings)
+        operations = [
+            UpdateOne(
+                {"qr_id": qr_id},
+                {"$set": {
+                    "vector_embedding": embeddings[qr_id][0],
+                    "embedding_hash": embeddings[qr_id][1],
+                    "embedding_model": model,
+                    "updated_at": now,
+                }}
+            )
+            for qr_id in qr_ids
+        ]
+        try:
+            result = await self.collection.bulk_write(operations, ordered=False)
+            return result.modified_count, []
+        except BulkWriteError as e:
+            failed = [qr_ids[err["index"]] for err in e.details.get("writeErrors", [])]
+            logger.error(f"[Embedding] Bulk write: {len(failed)} of {len(qr_ids)} failed")
+            return e.details.get("nModified", 0), failed
     
     async def update_embedding(
         self,
         qr_id: str,
-        embedding: List[float]
+        embedding: List[float],
+        content_hash: str,
+        model: str
     ) -> bool:
         """
         Update vector embedding for a flashcard.
@@ -239,6 +473,8 @@ class FlashcardRepository(BaseRepository):
         Args:
             qr_id: Flashcard QR ID
             embedding: 768-dimensional embedding vector
+            content_hash: Hash of the embedded text (services.embedding_text)
+            model: Embedding model that produced the vector
             
         Returns:
             True if update successful
@@ -246,7 +482,12 @@ class FlashcardRepository(BaseRepository):
         try:
             result = await self.collection.update_one(
                 {"qr_id": qr_id},
-                {"$set": {"vector_embedding": embedding}}
+                {"$set": {
+                    "vector_embedding": embedding,
+                    "embedding_hash": content_hash,
+                    "embedding_model": model,
+                    "updated_at": datetime.utcnow(),
+                }}
             )
             return result.modified_count > 0
         except Exception as e:
@@ -3,6 +3,7 @@
 Game Repository - Data Access Layer for mini games
 """
 from typing import Optional, List, Dict, Any
+from pymongo import IndexModel, ASCENDING
 from database.base_repo import BaseRepository
 import logging
 
@@ -15,6 +16,18 @@ class GameRepository(BaseRepository):
     Handles mini game challenges and data
     """
     
+    indexes = [
+        # Prefixes serve qr_id, qr_id+game_type and qr_id+game_type+difficulty
+        IndexModel(
+            [("flashcard_qr_id", ASCENDING), ("game_type", ASCENDING), ("difficulty", ASCENDING)],
+            name="flashcard_qr_id_1_game_type_1_difficulty_1"
+        ),
+        IndexModel([("game_type", ASCENDING)], name="game_type_1"),
+        IndexModel([("difficulty", ASCENDING)], name="difficulty_1"),
+    ]
+    
+    string_ids = True  # Catalog reads: ObjectIds decode to str
+    
     def __init__(self):
         super().__init__("mini_game_bank")
     
@@ -38,14 +51,8 @@ class GameRepository(BaseRepository):
         query = {"flashcard_qr_id": qr_id}
         query.update(filters)
         
-        cursor = self.collection.find(query)
-        results = await cursor.to_list(length=100)
-        
-        for result in results:
-            if "_id" in result:
-                result["_id"] = str(result["_id"])
-        
-        return results
+        cursor = self.reader.find(query)
+        return await cursor.to_list(length=100)
     
     async def get_by_game_type(
         self,
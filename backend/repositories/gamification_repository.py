@@ -1,33 +1,134 @@
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, AsyncIterator
+from pymongo import IndexModel, ASCENDING, DESCENDING, UpdateOne
+from pymongo.errors import BulkWriteError
 from database.base_repo import BaseRepository
+from core.pagination import Page
 import logging
 from datetime import datetime
 from bson import ObjectId
 
 logger = logging.getLogger(__name__)
 
+_DUPLICATE_KEY = 11000
+# Ids of the last bulk flushes applied to a user_points document, so a flush
+# whose outcome is unknown (network error, timeout) can be re-sent safely
+APPLIED_FLUSHES_KEPT = 20
+# Bookkeeping field, never returned to callers
+_HIDDEN = {"applied_flushes": 0}
+
 class GamificationRepository(BaseRepository):
+    indexes = [
+        IndexModel([("user_id", ASCENDING)], name="user_id_1", unique=True),
+        # Leaderboard keyset pagination on (total_points, _id)
+        IndexModel([("total_points", DESCENDING), ("_id", DESCENDING)], name="total_points_-1__id_-1"),
+    ]
+
     def __init__(self):
         super().__init__("user_points")
 
-    async def get_by_user_id(self, user_id: str) -> Optional[Dict[str, Any]]:
-        return await self.find_one({"user_id": user_id})
+    async def get_by_user_id(self, user_id: str, with_flushes: bool = False) -> Optional[Dict[str, Any]]:
+        """Points document of a user (with_flushes: include applied_flushes)"""
+        return await self.find_one({"user_id": user_id}, None if with_flushes else _HIDDEN)
 
     async def update_points(self, user_id: str, points: int) -> Dict[str, Any]:
         """Increment points for a user"""
         return await self.collection.find_one_and_update(
             {"user_id": user_id},
             {"$inc": {"total_points": points}, "$set": {"last_activity_date": datetime.utcnow()}},
+            projection=_HIDDEN,
             upsert=True,
             return_document=True
         )
+
+    async def bulk_increment_points(
+        self,
+        deltas: Dict[str, int],
+        activity_at: Optional[datetime] = None,
+        flush_id: Optional[str] = None
+    ) -> List[str]:
+        """
+        Apply many point increments in one unordered bulk_write (upserting users)
+
+        Each update records flush_id and only matches documents that do not
+        have it yet, so re-sending the same flush never adds points twice.
+        A user that already has it fails the upsert with a duplicate key and
+        is reported as applied.
+
+        Args:
+            deltas: {user_id: points to add}
+            activity_at: last_activity_date to set (default now)
+            flush_id: Id of this batch; reuse it when re-sending after an
+                ambiguous error (default: a new one)
+
+        Returns:
+            user_ids whose write was not applied (safe to retry under a new id)
+
+        Raises:
+            PyMongoError: If the outcome is unknown (e.g. network error);
+                re-send the same deltas with the same flush_id
+        """
+        if not deltas:
+            return []
+        activity_at = activity_at or datetime.utcnow()
+        flush_id = flush_id or str(ObjectId())
+        user_ids = list(deltas)
+        operations = [
+            UpdateOne(
+                {"user_id": user_id, "applied_flushes": {"$ne": flush_id}},
+                {
+                    "$inc": {"total_points": deltas[user_id]},
+                    "$set": {"last_activity_date": activity_at},
+                    "$push": {"applied_flushes": {"$each": [flush_id], "$slice": -APPLIED_FLUSHES_KEPT}},
+                },
+                upsert=True
+            )
+            for user_id in user_ids
+        ]
+        try:
+            await self.collection.bulk_write(operations, ordered=False)
+            return []
+        except BulkWriteError as e:
+            errors = e.details.get("writeErrors", [])
+            failed = [user_ids[err["index"]] for err in errors]
+            duplicates = [user_ids[err["index"]] for err in errors if err.get("code") == _DUPLICATE_KEY]
+            if duplicates:
+                # Already applied by an earlier send of this flush, or two
+                # workers upserting the same new user at once (not applied)
+                applied = {
+                    doc["user_id"]
+                    async for doc in self.collection.find(
+                        {"user_id": {"$in": duplicates}, "applied_flushes": flush_id},
+                        {"user_id": 1}
+                    )
+                }
+                failed = [user_id for user_id in failed if user_id not in applied]
+            if failed:
+                logger.error(f"[Points] Bulk write: {len(failed)} of {len(user_ids)} failed")
+            return failed
+
+    async def get_by_user_ids(self, user_ids: List[str]) -> List[Dict[str, Any]]:
+        """Points documents of several users (one $in query)"""
+        cursor = self.collection.find(
+            {"user_id": {"$in": user_ids}},
+            {"user_id": 1, "total_points": 1}
+        )
+        return await cursor.to_list(length=len(user_ids))
     
-    async def get_leaderboard(self, limit: int = 10) -> List[Dict[str, Any]]:
-        return await self.find_many(
+    async def get_leaderboard(self, limit: int = 10, after: Optional[str] = None) -> Page:
+        """Highest points first, keyset-paginated on (total_points, _id)"""
+        return await self.find_page(
             filter={},
+            sort_key="total_points",
+            direction=-1,
             limit=limit,
-            sort=[("total_points", -1)]
+            after=after
         )
 
+    async def iter_points(self) -> AsyncIterator[Dict[str, Any]]:
+        """Every user's points (_id, user_id, total_points): seeds the in-memory leaderboard"""
+        cursor = self.collection.find({}, {"user_id": 1, "total_points": 1}).batch_size(5000)
+        async for doc in cursor:
+            yield doc
+
 def get_gamification_repository() -> GamificationRepository:
     return GamificationRepository()
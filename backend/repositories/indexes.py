@@ -0,0 +1,77 @@
+# backend/repositories/indexes.py
+"""
+Index reconciliation across all raw-Motor repositories
+
+Each repository declares its own indexes (BaseRepository.indexes); this module
+only knows which repositories exist. Used at startup and by
+scripts/sync_indexes.py.
+"""
+from typing import Any, Dict, List, Type
+import logging
+
+from core.base_repository import BaseRepository
+from .flashcard_repository import FlashcardRepository
+from .ar_object_repository import ARObjectRepository
+from .ar_combination_repository import ARCombinationRepository
+from .quiz_repository import QuizRepository
+from .game_repository import GameRepository
+from .gamification_repository import GamificationRepository
+from .chat_repository import ChatRepository
+from .course_repository import CourseRepository
+from .ai_repository import AIRepository
+from .ar_bundle_repository import ARBundleRepository
+from .embedding_cache_repository import EmbeddingCacheRepository
+from .job_repository import JobRepository
+from .answer_cache_repository import AnswerCacheRepository
+from .lease_repository import LeaseRepository
+
+logger = logging.getLogger(__name__)
+
+INDEXED_REPOSITORIES: List[Type[BaseRepository]] = [
+    FlashcardRepository,
+    ARObjectRepository,
+    ARCombinationRepository,
+    QuizRepository,
+    GameRepository,
+    GamificationRepository,
+    ChatRepository,
+    CourseRepository,
+    AIRepository,
+    ARBundleRepository,
+    EmbeddingCacheRepository,
+    JobRepository,
+    AnswerCacheRepository,
+    LeaseRepository,
+]
+
+
+async def sync_all_indexes(
+    drop_extra: bool = False,
+    dry_run: bool = False
+) -> List[Dict[str, Any]]:
+    """
+    Reconcile declared indexes for every repository
+
+    Args:
+        drop_extra: Drop undeclared indexes (default: only report them)
+        dry_run: Only report missing/extra indexes
+
+    Returns:
+        One report per collection (see core.index_manager.reconcile_indexes)
+    """
+    reports = []
+    for repo_cls in INDEXED_REPOSITORIES:
+        repo = repo_cls()
+        try:
+            report = await repo.sync_indexes(drop_extra=drop_extra, dry_run=dry_run)
+        except Exception as e:
+            logger.error(f"❌ [INDEX] {repo.collection_name}: reconcile failed: {e}")
+            report = {"collection": repo.collection_name, "errors": [{"error": str(e)}]}
+        reports.append(report)
+
+        if report.get("missing") or report.get("extra") or report.get("conflicts"):
+            logger.warning(
+                f"[INDEX] {report['collection']}: missing={report.get('missing', [])} "
+                f"extra={report.get('extra', [])} conflicts={report.get('conflicts', [])}"
+            )
+    return reports
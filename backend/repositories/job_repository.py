@@ -0,0 +1,164 @@
+# backend/repositories/job_repository.py
+"""
+Job Repository - State of background jobs
+
+Jobs run inside one worker (services.job_runner) but their state lives here,
+so any worker can answer a status request. The owning worker refreshes
+heartbeat_at periodically; a queued/running job with an old heartbeat belongs
+to a worker that is gone.
+
+An exclusive job carries exclusive_key (its type) until it finishes. A unique
+partial index on that field lets only one such job per type exist, so two
+workers submitting at once cannot both start one.
+"""
+import os
+import socket
+import uuid
+from typing import Optional, List, Dict, Any
+from datetime import datetime, timedelta
+from pymongo import IndexModel, ASCENDING, DESCENDING
+from core.base_repository import BaseRepository
+from settings import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Job statuses
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+INTERRUPTED = "interrupted"  # Worker stopped (or died) before the job finished
+
+ACTIVE_STATUSES = (QUEUED, RUNNING)
+
+
+def worker_id() -> str:
+    """host:pid of the current worker process"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class JobRepository(BaseRepository):
+    """Repository for jobs collection"""
+
+    indexes = [
+        IndexModel([("type", ASCENDING), ("status", ASCENDING)], name="type_1_status_1"),
+        IndexModel([("created_at", DESCENDING)], name="created_at_-1"),
+        # One live exclusive job per type (the key is removed when it finishes)
+        IndexModel(
+            [("exclusive_key", ASCENDING)],
+            name="exclusive_key_1",
+            unique=True,
+            partialFilterExpression={"exclusive_key": {"$exists": True}}
+        ),
+        # Finished jobs are kept JOBS_RETENTION_DAYS (no finished_at = never expires)
+        IndexModel(
+            [("finished_at", ASCENDING)],
+            name="finished_at_ttl",
+            expireAfterSeconds=settings.JOBS_RETENTION_DAYS * 86400
+        ),
+    ]
+
+    def __init__(self):
+        super().__init__("jobs")
+
+    async def create_job(
+        self,
+        job_type: str,
+        params: Dict[str, Any],
+        exclusive: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Insert a queued job owned by this worker
+
+        Raises:
+            DuplicateKeyError: exclusive and a live exclusive job of this type exists
+        """
+        now = datetime.utcnow()
+        job = {
+            "_id": uuid.uuid4().hex,
+            "type": job_type,
+            "status": QUEUED,
+            "params": params,
+            "progress": {},
+            "failed_ids": [],
+            "error": None,
+            "worker": worker_id(),
+            "created_at": now,
+            "started_at": None,
+            "finished_at": None,
+            "heartbeat_at": now,
+        }
+        if exclusive:
+            job["exclusive_key"] = job_type
+        await self.collection.insert_one(job)
+        return job
+
+    async def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return await self.collection.find_one({"_id": job_id})
+
+    async def find_exclusive(self, job_type: str) -> Optional[Dict[str, Any]]:
+        """The exclusive job of a type that has not finished, if any"""
+        return await self.collection.find_one({"exclusive_key": job_type})
+
+    async def release_stale(self, job_type: str, stale_after_seconds: float) -> int:
+        """
+        Mark exclusive jobs of dead workers as interrupted and free their type
+
+        Returns:
+            Number of jobs released
+        """
+        now = datetime.utcnow()
+        result = await self.collection.update_many(
+            {
+                "exclusive_key": job_type,
+                "heartbeat_at": {"$lt": now - timedelta(seconds=stale_after_seconds)},
+            },
+            {
+                "$set": {"status": INTERRUPTED, "error": "Worker stopped responding", "finished_at": now},
+                "$unset": {"exclusive_key": ""},
+            }
+        )
+        return result.modified_count
+
+    async def mark_running(self, job_id: str) -> None:
+        now = datetime.utcnow()
+        await self.collection.update_one(
+            {"_id": job_id},
+            {"$set": {"status": RUNNING, "started_at": now, "heartbeat_at": now}}
+        )
+
+    async def update_progress(
+        self,
+        job_id: str,
+        progress: Dict[str, Any],
+        failed_ids: Optional[List[str]] = None
+    ) -> None:
+        """Store progress and refresh the heartbeat"""
+        fields: Dict[str, Any] = {"progress": progress, "heartbeat_at": datetime.utcnow()}
+        if failed_ids is not None:
+            fields["failed_ids"] = failed_ids
+        await self.collection.update_one({"_id": job_id}, {"$set": fields})
+
+    async def touch(self, job_ids: List[str]) -> None:
+        """Refresh the heartbeat of jobs owned by this worker"""
+        if job_ids:
+            await self.collection.update_many(
+                {"_id": {"$in": job_ids}},
+                {"$set": {"heartbeat_at": datetime.utcnow()}}
+            )
+
+    async def finish(self, job_id: str, status: str, error: Optional[str] = None) -> None:
+        now = datetime.utcnow()
+        await self.collection.update_one(
+            {"_id": job_id},
+            {
+                "$set": {"status": status, "error": error, "finished_at": now, "heartbeat_at": now},
+                "$unset": {"exclusive_key": ""},
+            }
+        )
+
+
+def get_job_repository() -> JobRepository:
+    """Factory function for dependency injection"""
+    return JobRepository()
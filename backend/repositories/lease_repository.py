@@ -0,0 +1,58 @@
+# backend/repositories/lease_repository.py
+"""
+Lease Repository - Single-holder leases across worker processes
+
+A lease is one document per name holding the current holder (host:pid) and
+an expiry. The holder renews it well before it expires; when a worker dies
+its lease simply runs out and another worker takes it over. Used to elect the
+one worker that runs a background duty (e.g. the AR bundle builder).
+"""
+from datetime import datetime, timedelta
+from pymongo import IndexModel, ASCENDING
+from pymongo.errors import DuplicateKeyError
+from core.base_repository import BaseRepository
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class LeaseRepository(BaseRepository):
+    """Repository for leases collection"""
+
+    indexes = [
+        # Removes leases of workers that are gone (acquire does not rely on it)
+        IndexModel([("expires_at", ASCENDING)], name="expires_at_ttl", expireAfterSeconds=0),
+    ]
+
+    def __init__(self):
+        super().__init__("leases")
+
+    async def try_acquire(self, name: str, holder: str, ttl_seconds: float) -> bool:
+        """
+        Take or renew a lease (atomic)
+
+        Succeeds if the lease is free, expired or already held by `holder`.
+
+        Returns:
+            True if `holder` now holds the lease for ttl_seconds
+        """
+        now = datetime.utcnow()
+        try:
+            await self.collection.update_one(
+                {"_id": name, "$or": [{"holder": holder}, {"expires_at": {"$lte": now}}]},
+                {"$set": {"holder": holder, "expires_at": now + timedelta(seconds=ttl_seconds), "renewed_at": now}},
+                upsert=True
+            )
+            return True
+        except DuplicateKeyError:
+            # Held by another worker: the upsert tried to insert a second document
+            return False
+
+    async def release(self, name: str, holder: str) -> None:
+        """Give the lease up (only if `holder` still holds it)"""
+        await self.collection.delete_one({"_id": name, "holder": holder})
+
+
+def get_lease_repository() -> LeaseRepository:
+    """Factory function for dependency injection"""
+    return LeaseRepository()
@@ -3,6 +3,7 @@
 Quiz Repository - Data Access Layer for quiz questions
 """
 from typing import Optional, List, Dict, Any
+from pymongo import IndexModel, ASCENDING
 from database.base_repo import BaseRepository
 import logging
 
@@ -15,6 +16,13 @@ class QuizRepository(BaseRepository):
     Handles quiz data and questions
     """
     
+    indexes = [
+        IndexModel([("flashcard_qr_id", ASCENDING)], name="flashcard_qr_id_1"),
+        IndexModel([("difficulty", ASCENDING)], name="difficulty_1"),
+    ]
+    
+    string_ids = True  # Catalog reads: ObjectIds decode to str
+    
     def __init__(self):
         super().__init__("quiz_questions")
     
@@ -29,10 +37,7 @@ class QuizRepository(BaseRepository):
             Quiz session document with questions or None
         """
         logger.debug(f"🔍 [SEARCH] Quiz for flashcard: {qr_id}")
-        result = await self.collection.find_one({"flashcard_qr_id": qr_id})
-        if result and "_id" in result:
-            result["_id"] = str(result["_id"])
-        return result
+        return await self.reader.find_one({"flashcard_qr_id": qr_id})
     
     async def get_by_difficulty(
         self,
@@ -0,0 +1,107 @@
+# backend/repositories/user_repository.py
+"""
+User Repository - Raw Motor access to the users collection for bulk work
+
+Single-user reads and writes go through the Beanie UserDocument model. Bulk
+work uses this repository: one $in query per batch, unordered insert_many
+for imports and batched profile lookups for the leaderboard. The unique
+email / username indexes are declared on UserDocument and created by
+Beanie, so no indexes are declared here.
+"""
+from typing import Any, Dict, List, Set, Tuple
+from pymongo.errors import BulkWriteError
+from bson import ObjectId
+from core.base_repository import BaseRepository
+import logging
+
+logger = logging.getLogger(__name__)
+
+_DUPLICATE_KEY = 11000
+
+
+class UserRepository(BaseRepository):
+    """Repository for users collection"""
+
+    def __init__(self):
+        super().__init__("users")
+
+    async def find_existing(
+        self,
+        emails: List[str],
+        usernames: List[str]
+    ) -> Tuple[Set[str], Set[str]]:
+        """
+        Which of these emails / usernames are already taken (one query)
+
+        Returns:
+            (taken emails, taken usernames)
+        """
+        if not emails and not usernames:
+            return set(), set()
+        cursor = self.collection.find(
+            {"$or": [{"email": {"$in": emails}}, {"username": {"$in": usernames}}]},
+            {"_id": 0, "email": 1, "username": 1}
+        )
+        taken_emails: Set[str] = set()
+        taken_usernames: Set[str] = set()
+        async for doc in cursor:
+            taken_emails.add(doc.get("email"))
+            taken_usernames.add(doc.get("username"))
+        return taken_emails & set(emails), taken_usernames & set(usernames)
+
+    async def get_profiles(self, user_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Public profile (username, avatar_url) of several users in one query
+
+        Returns:
+            {user_id: {"username": ..., "avatar_url": ...}}; ids that are not
+            ObjectIds or have no account are missing
+        """
+        object_ids = [ObjectId(uid) for uid in user_ids if ObjectId.is_valid(uid)]
+        if not object_ids:
+            return {}
+        cursor = self.collection.find(
+            {"_id": {"$in": object_ids}},
+            {"username": 1, "avatar_url": 1}
+        )
+        return {
+            str(doc["_id"]): {"username": doc.get("username"), "avatar_url": doc.get("avatar_url")}
+            async for doc in cursor
+        }
+
+    async def insert_many_unordered(
+        self,
+        documents: List[Dict[str, Any]]
+    ) -> Tuple[List[str], Dict[int, str]]:
+        """
+        Insert users in one unordered insert_many
+
+        Ids are assigned up front, so every row can be reported even when
+        some inserts fail (e.g. a concurrent /auth/register took the email).
+
+        Returns:
+            (id per document, {index: error} for the documents not inserted)
+        """
+        if not documents:
+            return [], {}
+        for doc in documents:
+            doc.setdefault("_id", ObjectId())
+        ids = [str(doc["_id"]) for doc in documents]
+        try:
+            await self.collection.insert_many(documents, ordered=False)
+            return ids, {}
+        except BulkWriteError as e:
+            failed: Dict[int, str] = {}
+            for err in e.details.get("writeErrors", []):
+                if err.get("code") == _DUPLICATE_KEY:
+                    field = next(iter(err.get("keyPattern") or {"email or username": 1}))
+                    failed[err["index"]] = f"{field} already exists"
+                else:
+                    failed[err["index"]] = err.get("errmsg", "insert failed")
+            logger.error(f"[UserImport] insert_many: {len(failed)} of {len(documents)} failed")
+            return ids, failed
+
+
+def get_user_repository() -> UserRepository:
+    """Factory function for dependency injection"""
+    return UserRepository()
@@ -0,0 +1,86 @@
+"""
+Micro-benchmark: per-request AI setup overhead before and after the
+per-worker AIService singleton. No network calls are made: only object
+construction (genai.configure, Gemini client, repository, prompt chains) and
+dependency resolution are timed. "Before" rebuilds an AIService per call,
+whose constructor now also prebuilds the chains, so it slightly overstates
+the old cost.
+
+Usage:
+    cd backend
+    python -m scripts.bench_ai_overhead
+    python -m scripts.bench_ai_overhead --rounds 500
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Callable
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from langchain_core.prompts import ChatPromptTemplate
+
+from settings import settings
+
+# Construction never calls the API, but the client is only built with a key
+settings.GOOGLE_API_KEY = settings.GOOGLE_API_KEY or "bench-placeholder-key"
+
+from services.ai_service import AIService, get_ai_service, init_ai_service
+from services.flashcard_service import FlashcardService, get_flashcard_service
+from repositories.flashcard_repository import get_flashcard_repository
+
+
+def before_flashcard_dependency():
+    """GET /flashcard/category/...: repository + a fresh AIService per request"""
+    return FlashcardService(get_flashcard_repository(), AIService())
+
+
+def after_flashcard_dependency():
+    """Same route now: repository only, AI resolved lazily (never for reads)"""
+    return get_flashcard_service()
+
+
+def before_rag_setup():
+    """POST /chat/rag setup: fresh AIService + prompt template and chain per call"""
+    service = AIService()
+    prompt = ChatPromptTemplate.from_messages([
+        ("system", AIService.RAG_SYSTEM_PROMPT),
+        ("human", "{question}")
+    ])
+    return prompt | service.llm | service.output_parser
+
+
+def after_rag_setup():
+    """POST /chat/rag setup now: singleton lookup, prebuilt chain"""
+    return get_ai_service().rag_chain
+
+
+def measure(fn: Callable, rounds: int) -> float:
+    """Microseconds per call"""
+    fn()
+    started = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return (time.perf_counter() - started) / rounds * 1e6
+
+
+def main(rounds: int) -> None:
+    init_ai_service()
+    print(f"{rounds} rounds per case")
+    print(f"{'case':<28}{'before µs':>12}{'after µs':>12}{'saved/request':>16}")
+    for name, before, after in [
+        ("flashcard read dependency", before_flashcard_dependency, after_flashcard_dependency),
+        ("rag chat setup", before_rag_setup, after_rag_setup),
+    ]:
+        before_us = measure(before, rounds)
+        after_us = measure(after, rounds)
+        print(f"{name:<28}{before_us:>12.1f}{after_us:>12.1f}{before_us - after_us:>13.1f} µs")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark per-request AI setup overhead")
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+    main(args.rounds)
@@ -0,0 +1,115 @@
+"""
+Micro-benchmark: decoding 100-document catalog pages from BSON.
+Compares the previous dict-walk (decode, then rewrite _id with str()) with the
+ObjectId -> str TypeDecoder used by catalog repositories (database/codecs.py),
+and with lazy RawBSONDocument decoding. No database needed: pages are encoded
+locally, the way they arrive in a reply batch.
+
+Usage:
+    cd backend
+    python -m scripts.bench_bson_decode
+    python -m scripts.bench_bson_decode --docs 100 --rounds 2000
+"""
+import argparse
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, List
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import bson
+from bson import ObjectId
+from bson.codec_options import DEFAULT_CODEC_OPTIONS, CodecOptions
+from bson.raw_bson import RawBSONDocument
+
+from database.codecs import string_id_codec_options
+
+STRING_ID_OPTIONS = string_id_codec_options(DEFAULT_CODEC_OPTIONS)
+RAW_OPTIONS = CodecOptions(document_class=RawBSONDocument)
+
+# Fields of a CARD_PROJECTION flashcard as served by GET /flashcard/category/...
+CARD_FIELDS = ["_id", "qr_id", "word", "translation", "category", "image_url",
+               "audio_url", "difficulty", "ar_tag"]
+
+
+def build_page(docs: int) -> bytes:
+    """Concatenated BSON documents, shaped like a projected flashcard page"""
+    return b"".join(
+        bson.encode({
+            "_id": ObjectId(),
+            "qr_id": f"card_{i:04d}",
+            "word": f"word{i}",
+            "translation": {"en": f"word{i}", "vi": f"từ {i}"},
+            "category": "animals",
+            "image_url": f"/static/images/card_{i}.png",
+            "audio_url": f"/static/audio/card_{i}.mp3",
+            "difficulty": "easy",
+            "ar_tag": f"tag_{i}",
+            "created_at": datetime(2024, 1, 1),
+        })
+        for i in range(docs)
+    )
+
+
+def dict_walk(data: bytes) -> List[dict]:
+    """Previous repository path: decode to dicts, then str() every _id"""
+    docs = bson.decode_all(data)
+    for doc in docs:
+        if "_id" in doc:
+            doc["_id"] = str(doc["_id"])
+    return docs
+
+
+def string_id_codec(data: bytes) -> List[dict]:
+    """Catalog repository path: ObjectIds become str inside the decoder"""
+    return bson.decode_all(data, STRING_ID_OPTIONS)
+
+
+def raw_all_fields(data: bytes) -> List[dict]:
+    """Lazy RawBSONDocument, reading every served field (what a JSON response needs)"""
+    docs = bson.decode_all(data, RAW_OPTIONS)
+    return [{f: (str(d[f]) if f == "_id" else d[f]) for f in CARD_FIELDS} for d in docs]
+
+
+def raw_two_fields(data: bytes) -> List[dict]:
+    """Lazy RawBSONDocument, reading only qr_id and word"""
+    docs = bson.decode_all(data, RAW_OPTIONS)
+    return [{"qr_id": d["qr_id"], "word": d["word"]} for d in docs]
+
+
+def measure(fn: Callable[[bytes], List[dict]], data: bytes, rounds: int) -> float:
+    """Microseconds per page"""
+    for _ in range(min(rounds, 100)):
+        fn(data)
+    started = time.perf_counter()
+    for _ in range(rounds):
+        fn(data)
+    return (time.perf_counter() - started) / rounds * 1e6
+
+
+def main(docs: int, rounds: int) -> None:
+    data = build_page(docs)
+    assert dict_walk(data) == string_id_codec(data), "codec output differs from dict-walk"
+
+    print(f"{docs}-document page ({len(data):,} bytes), {rounds} rounds, C extension: {bson.has_c()}")
+    baseline = measure(dict_walk, data, rounds)
+    print(f"{'path':<26}{'µs/page':>10}{'vs dict-walk':>14}")
+    for name, fn in [
+        ("dict-walk (previous)", dict_walk),
+        ("ObjectId->str codec", string_id_codec),
+        ("raw BSON, all fields", raw_all_fields),
+        ("raw BSON, 2 fields", raw_two_fields),
+    ]:
+        us = baseline if fn is dict_walk else measure(fn, data, rounds)
+        print(f"{name:<26}{us:>10.1f}{baseline / us:>13.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark BSON page decoding")
+    parser.add_argument("--docs", type=int, default=100, help="Documents per page")
+    parser.add_argument("--rounds", type=int, default=2000)
+    args = parser.parse_args()
+    main(args.docs, args.rounds)
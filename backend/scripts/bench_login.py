@@ -0,0 +1,114 @@
+"""
+Benchmark: login throughput and event-loop stalls while bcrypt runs
+
+Simulates a login burst (a whole class logging in at once) against the
+password verification step only, no database or HTTP. Each case fires
+--logins concurrent verifications and reports:
+
+- logins/s: burst size / wall time of the burst
+- p50/p95 ms: latency of a single login, from the start of the burst
+- max loop lag ms: longest delay of a 10 ms ticker on the event loop, i.e.
+  how long every other request (AR scans, ...) was frozen
+
+"inline" is the old behaviour (pwd_context.verify inside the handler); the
+other cases go through PasswordHasher with the given pool size. Pick the
+pool size where logins/s stops improving, per worker: gunicorn workers on
+the same host share the CPU cores.
+
+Usage:
+    cd backend
+    python -m scripts.bench_login
+    python -m scripts.bench_login --logins 60 --pool-sizes 1 2 4 8 --processes
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, List
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.password_hasher import PasswordHasher, pwd_context
+
+PASSWORD = "correct horse battery staple"
+TICK_SECONDS = 0.01
+
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+async def run_burst(verify: Callable[[], Awaitable[bool]], logins: int) -> Dict[str, float]:
+    """Fire `logins` concurrent verifications while a ticker measures loop lag"""
+    max_lag = 0.0
+    done = asyncio.Event()
+
+    async def ticker() -> None:
+        nonlocal max_lag
+        while not done.is_set():
+            expected = time.perf_counter() + TICK_SECONDS
+            await asyncio.sleep(TICK_SECONDS)
+            max_lag = max(max_lag, time.perf_counter() - expected)
+
+    async def one_login() -> float:
+        assert await verify()
+        # Every request of the burst arrived at `started`
+        return (time.perf_counter() - started) * 1000
+
+    tick_task = asyncio.create_task(ticker())
+    await asyncio.sleep(0)  # Let the ticker start
+    started = time.perf_counter()
+    latencies = await asyncio.gather(*(one_login() for _ in range(logins)))
+    elapsed = time.perf_counter() - started
+    done.set()
+    await tick_task
+    return {
+        "logins_per_s": logins / elapsed,
+        "p50_ms": percentile(latencies, 0.50),
+        "p95_ms": percentile(latencies, 0.95),
+        "max_lag_ms": max_lag * 1000,
+    }
+
+
+async def main(logins: int, pool_sizes: List[int], use_processes: bool) -> None:
+    hashed = pwd_context.hash(PASSWORD)
+
+    async def inline_verify() -> bool:
+        # Old handler: blocks the event loop for the whole hash
+        return pwd_context.verify(PASSWORD, hashed)
+
+    cases: List[tuple] = [("inline", inline_verify, None)]
+    for size in pool_sizes:
+        hasher = PasswordHasher(max_workers=size, max_pending=logins, use_processes=use_processes)
+        cases.append((f"{'process' if use_processes else 'thread'} pool x{size}", None, hasher))
+
+    print(f"{logins} concurrent logins per case, {os.cpu_count()} CPU cores")
+    print(f"{'case':<20}{'logins/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'max loop lag ms':>18}")
+    for name, verify, hasher in cases:
+        if hasher is not None:
+            async def verify() -> bool:
+                return await hasher.verify(PASSWORD, hashed)
+            await verify()  # Start the pool outside the measurement
+        result = await run_burst(verify, logins)
+        print(
+            f"{name:<20}{result['logins_per_s']:>10.1f}{result['p50_ms']:>10.1f}"
+            f"{result['p95_ms']:>10.1f}{result['max_lag_ms']:>18.1f}"
+        )
+        if hasher is not None:
+            hasher.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark login throughput per hashing pool size")
+    parser.add_argument("--logins", type=int, default=30, help="Concurrent logins per burst (default 30)")
+    parser.add_argument(
+        "--pool-sizes", type=int, nargs="+", default=[1, 2, 4, 8],
+        help="Pool sizes to compare (default 1 2 4 8)"
+    )
+    parser.add_argument("--processes", action="store_true", help="Use a process pool instead of threads")
+    args = parser.parse_args()
+    asyncio.run(main(args.logins, args.pool_sizes, args.processes))
@@ -0,0 +1,192 @@
+"""
+Micro-benchmark: default response_model handling vs the fast response path.
+Calls an in-process FastAPI app directly over ASGI (no network, no database)
+with payloads shaped like the hot GETs, and prints requests/sec on one worker.
+
+Usage:
+    cd backend
+    python -m scripts.bench_responses                 # 3s per case
+    python -m scripts.bench_responses --seconds 10
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from fastapi import FastAPI, Response
+
+from core.fast_response import fast_response
+from models import FlashcardSchema, ARExperienceResponseSchema, QuizSessionSchema, GameSessionSchema
+
+
+# ========== Sample payloads (repository dict shapes) ==========
+
+def _flashcard(i: int) -> Dict[str, Any]:
+    return {
+        "_id": f"65f0c0ffee{i:014d}",
+        "qr_id": f"card_{i:04d}",
+        "word": f"word{i}",
+        "translation": {"en": f"word{i}", "vi": f"từ {i}"},
+        "category": "animals",
+        "image_url": f"/static/images/card_{i}.png",
+        "audio_url": f"/static/audio/card_{i}.mp3",
+        "difficulty": "easy",
+        "ar_tag": f"tag_{i}",
+    }
+
+
+AR_BUNDLE = {
+    "flashcard": _flashcard(1),
+    "target": {
+        "_id": "65f0c0ffee00000000000001",
+        "ar_tag": "tag_1",
+        "description": "3D model",
+        "animation_type": "rotate",
+        "glb_size": 0.5,
+        "nft_base_url": "/static/assets/target/tag_1",
+        "model_3d_url": "/static/assets/models/tag_1.glb",
+        "image_2d_url": "/static/images/tag_1.png",
+        "position": "0 0.5 0",
+        "rotation": "0 0 0",
+        "scale": "0.5 0.5 0.5",
+        "created_at": datetime(2024, 1, 1),
+    },
+    "related_combos": [
+        {
+            "_id": f"65f0c0ffee0000000000010{i}",
+            "combo_id": f"combo_{i}",
+            "description": "Combination",
+            "required_tags": ["tag_1", f"tag_{i + 2}"],
+            "model_3d_url": f"/static/assets/models/combo_{i}.glb",
+            "image_2d_url": None,
+            "center_transform": {"position": "0 0 0", "rotation": "0 0 0", "scale": "1 1 1"},
+        }
+        for i in range(3)
+    ],
+}
+
+QUIZ_SESSION = {
+    "flashcard_qr_id": "card_0001",
+    "questions": [
+        {
+            "id": f"q{i}",
+            "type": "multiple_choice",
+            "question_text": f"Question {i}?",
+            "image_url": None,
+            "options": ["a", "b", "c", "d"],
+            "correct_answer": "a",
+            "explanation": "Because.",
+        }
+        for i in range(10)
+    ],
+    "time_limit": 60,
+    "passing_score": 7,
+}
+
+GAME_SESSION = {
+    "flashcard_qr_id": "card_0001",
+    "challenges": [
+        {
+            "game_type": "drag_match",
+            "flashcard_qr_id": "card_0001",
+            "difficulty": "easy",
+            "question": f"Match {i}",
+            "correct_answer": "cat",
+            "choices": ["cat", "dog", "cow"],
+            "hint": "It meows",
+            "stars_reward": 1,
+            "game_config": {"shuffle": True},
+        }
+        for i in range(8)
+    ],
+}
+
+CATEGORY_PAGE = [_flashcard(i) for i in range(50)]
+
+CASES = [
+    ("ar_experience", ARExperienceResponseSchema, AR_BUNDLE),
+    ("quiz", QuizSessionSchema, QUIZ_SESSION),
+    ("game", GameSessionSchema, GAME_SESSION),
+    ("category(50)", List[FlashcardSchema], CATEGORY_PAGE),
+]
+
+
+# ========== App and ASGI driver ==========
+
+def build_app() -> FastAPI:
+    app = FastAPI()
+    for name, schema, payload in CASES:
+        def default_route(payload=payload):
+            async def route():
+                return payload
+            return route
+
+        def fast_route(schema=schema, payload=payload):
+            async def route(response: Response):
+                return fast_response(schema, payload, response)
+            return route
+
+        app.add_api_route(f"/default/{name}", default_route(), response_model=schema)
+        app.add_api_route(f"/fast/{name}", fast_route(), response_model=schema)
+    return app
+
+
+async def call(app: FastAPI, path: str) -> bytes:
+    """One GET through the full ASGI stack; returns the body"""
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1",
+        "method": "GET", "scheme": "http", "path": path, "raw_path": path.encode(),
+        "query_string": b"", "root_path": "", "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 1), "server": ("bench", 80),
+    }
+    body = bytearray()
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.body":
+            body.extend(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return bytes(body)
+
+
+async def measure(app: FastAPI, path: str, seconds: float) -> float:
+    """Requests/sec for sequential calls over `seconds`"""
+    for _ in range(200):  # Warm-up: adapters, route caches
+        await call(app, path)
+    count = 0
+    started = time.perf_counter()
+    deadline = started + seconds
+    while time.perf_counter() < deadline:
+        for _ in range(100):
+            await call(app, path)
+        count += 100
+    return count / (time.perf_counter() - started)
+
+
+async def main(seconds: float) -> None:
+    app = build_app()
+    print(f"{'payload':<16}{'default req/s':>15}{'fast req/s':>13}{'speedup':>10}")
+    for name, _, _ in CASES:
+        # Both paths must send the same document
+        same = json.loads(await call(app, f"/default/{name}")) == json.loads(await call(app, f"/fast/{name}"))
+        default_rps = await measure(app, f"/default/{name}", seconds)
+        fast_rps = await measure(app, f"/fast/{name}", seconds)
+        print(f"{name:<16}{default_rps:>15,.0f}{fast_rps:>13,.0f}{fast_rps / default_rps:>9.2f}x"
+              f"{'' if same else '  ⚠️ bodies differ'}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the fast response path")
+    parser.add_argument("--seconds", type=float, default=3.0, help="Duration per case")
+    args = parser.parse_args()
+    asyncio.run(main(args.seconds))
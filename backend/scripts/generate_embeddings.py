@@ -2,10 +2,23 @@
 Script to generate vector embeddings for all flashcards.
 Run this after seeding data and before using RAG chatbot.
 
+Cards are read page by page (keyset cursor), embedded in batched calls with
+bounded concurrency behind a token-bucket rate limit, and written with one
+unordered bulk_write per page. Progress is checkpointed after every page, so
+rerunning after a crash resumes where the previous run stopped.
+
+--reconcile scans the whole catalog and re-embeds only cards whose word,
+translation or definition changed, or whose vector came from another model
+(run it nightly instead of a full re-embed).
+
 Usage:
     cd backend
-    python -m scripts.generate_embeddings
+    python -m scripts.generate_embeddings                  # resume / start
+    python -m scripts.generate_embeddings --restart        # ignore the checkpoint
+    python -m scripts.generate_embeddings --reconcile      # re-embed stale cards only
+    python -m scripts.generate_embeddings --rps 5 --concurrency 2 --limit 1000
 """
+import argparse
 import asyncio
 import sys
 from pathlib import Path
@@ -13,110 +26,131 @@ from pathlib import Path
 # Add backend to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
+import google.generativeai as genai
+
 from settings import settings
 from database.connection import db_manager
 from repositories.flashcard_repository import FlashcardRepository
-from services.ai_service import AIService
+from services.embedding_client import EmbeddingClient
+from services.embedding_cache import embedding_cache
+from services.embedding_backfill import MISSING, STALE, BackfillStats, EmbeddingBackfill
 import logging
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 
-async def generate_embeddings_for_flashcards():
+def format_duration(seconds: float) -> str:
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h{minutes:02d}m{seconds:02d}s" if hours else f"{minutes}m{seconds:02d}s"
+
+
+async def report_progress(stats: BackfillStats) -> None:
+    eta = format_duration(stats.eta_seconds) if stats.eta_seconds is not None else "?"
+    logger.info(
+        f"📈 {stats.processed}/{stats.total} cards | ✅ {stats.succeeded} ❌ {stats.failed} "
+        f"⏭️ {stats.skipped} | {stats.rate:.1f} cards/s | ETA {eta}"
+    )
+
+
+async def generate_embeddings_for_flashcards(args: argparse.Namespace) -> int:
     """
-    Generate and store vector embeddings for flashcards without embeddings.
-    Uses Gemini embedding model (768 dimensions).
+    Generate and store vector embeddings for flashcards without (or with stale)
+    embeddings. Uses Gemini embedding model (768 dimensions).
+
+    Returns:
+        Process exit code (1 when some cards failed)
     """
     # Check API key
     if not settings.GOOGLE_API_KEY:
         logger.error("❌ GOOGLE_API_KEY not set in .env file!")
         logger.info("Add: GOOGLE_API_KEY=your-api-key to backend/.env")
-        return
-    
-    # Initialize services
-    ai_service = AIService()
-    flashcard_repo = FlashcardRepository()
-    
-    # Get flashcards without embeddings
-    flashcards = await flashcard_repo.get_flashcards_without_embedding(limit=500)
-    
-    if not flashcards:
-        logger.info("✅ All flashcards already have embeddings!")
-        return
-    
-    logger.info(f"📊 Found {len(flashcards)} flashcards without embeddings")
-    
-    success_count = 0
-    fail_count = 0
-    
-    for i, fc in enumerate(flashcards, 1):
-        qr_id = fc.get("qr_id", "unknown")
-        word = fc.get("word", "")
-        definition = fc.get("definition", "")
-        translation = fc.get("translation", {})
-        vi_trans = translation.get("vi", "") if isinstance(translation, dict) else ""
-        
-        # Create rich text for embedding
-        text_for_embedding = f"""
-        Word: {word}
-        Definition: {definition}
-        Vietnamese: {vi_trans}
-        """
-        
-        try:
-            # Generate embedding
-            embedding = await ai_service.generate_embedding(text_for_embedding)
-            
-            if embedding and len(embedding) == 768:
-                # Save to database
-                success = await flashcard_repo.update_embedding(qr_id, embedding)
-                
-                if success:
-                    success_count += 1
-                    logger.info(f"✅ [{i}/{len(flashcards)}] {word} ({qr_id})")
-                else:
-                    fail_count += 1
-                    logger.warning(f"⚠️ [{i}/{len(flashcards)}] Failed to save: {word}")
-            else:
-                fail_count += 1
-                logger.warning(f"⚠️ [{i}/{len(flashcards)}] Invalid embedding: {word}")
-                
-        except Exception as e:
-            fail_count += 1
-            logger.error(f"❌ [{i}/{len(flashcards)}] Error for {word}: {e}")
-        
-        # Rate limiting - avoid hitting API limits
-        if i % 10 == 0:
-            await asyncio.sleep(1)  # 1 second pause every 10 requests
-    
+        return 1
+    genai.configure(api_key=settings.GOOGLE_API_KEY)
+
+    # Dedicated client: pool sized for this run, not for a web worker
+    client = EmbeddingClient(
+        model=settings.EMBEDDING_MODEL,
+        max_workers=args.concurrency,
+        max_pending=args.concurrency * 2,
+        timeout_seconds=max(settings.EMBEDDING_TIMEOUT_SECONDS, 30.0)
+    )
+    mode = STALE if args.reconcile else MISSING
+    backfill = EmbeddingBackfill(
+        flashcard_repo=FlashcardRepository(),
+        client=client,
+        mode=mode,
+        page_size=args.batch_size,
+        chunk_size=args.chunk_size,
+        concurrency=args.concurrency,
+        requests_per_second=args.rps,
+        checkpoint_name=f"flashcard_embeddings:{mode}",
+        on_progress=report_progress,
+        cache=embedding_cache if settings.EMBEDDING_CACHE_ENABLED else None
+    )
+
+    try:
+        stats = await backfill.run(resume=not args.restart, limit=args.limit)
+    finally:
+        client.shutdown()
+
+    if stats.total == 0 or stats.processed == stats.skipped:
+        logger.info("✅ All flashcards already have up-to-date embeddings!")
+        return 0
+
+    elapsed = stats.processed / stats.rate if stats.rate else 0.0
     logger.info(f"""
     ========================================
     📊 Embedding Generation Complete!
     ========================================
-    ✅ Success: {success_count}
-    ❌ Failed: {fail_count}
-    📈 Total: {len(flashcards)}
+    ✅ Success: {stats.succeeded}
+    ❌ Failed: {stats.failed}
+    ⏭️ Up to date: {stats.skipped}
+    📈 Total: {stats.processed}
+    ⏱️ Time: {format_duration(elapsed)} ({stats.rate:.1f} cards/s, {stats.api_calls} API calls, {stats.cache_hits} cached)
     ========================================
     """)
+    if stats.failed_qr_ids:
+        logger.warning(f"Failed qr_ids (first {len(stats.failed_qr_ids)}): {', '.join(stats.failed_qr_ids)}")
+        logger.info("Rerun the script to retry them")
+    return 1 if stats.failed else 0
+
 
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Generate missing flashcard embeddings")
+    parser.add_argument("--batch-size", type=int, default=settings.EMBEDDING_BACKFILL_PAGE_SIZE,
+                        help="Cards per page, bulk write and checkpoint")
+    parser.add_argument("--chunk-size", type=int, default=settings.EMBEDDING_BACKFILL_CHUNK_SIZE,
+                        help="Texts per embedding API call (max 100)")
+    parser.add_argument("--concurrency", type=int, default=settings.EMBEDDING_BACKFILL_CONCURRENCY,
+                        help="Embedding API calls in flight")
+    parser.add_argument("--rps", type=float, default=settings.EMBEDDING_BACKFILL_RPS,
+                        help="Embedding API calls per second")
+    parser.add_argument("--limit", type=int, default=None, help="Stop after this many cards")
+    parser.add_argument("--restart", action="store_true", help="Ignore the saved checkpoint")
+    parser.add_argument("--reconcile", action="store_true",
+                        help="Scan all cards and re-embed only those whose text or model changed")
+    return parser.parse_args()
 
-async def main():
+
+async def main() -> int:
     """Main entry point"""
+    args = parse_args()
     logger.info("🚀 Starting embedding generation...")
     logger.info(f"📦 Database: {settings.MONGO_DB}")
-    
+
     try:
         # Test database connection
         if await db_manager.ping():
             logger.info("✅ MongoDB connected")
         else:
             logger.error("❌ MongoDB connection failed!")
-            return
-        
+            return 1
+
         # Generate embeddings
-        await generate_embeddings_for_flashcards()
-        
+        return await generate_embeddings_for_flashcards(args)
+
     finally:
         # Cleanup
         await db_manager.close()
@@ -124,4 +158,4 @@ async def main():
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,85 @@
+"""
+Script to rebuild the materialized ar_experience_bundles collection.
+Bundles are normally kept fresh incrementally (AR_EXPERIENCE_MODE="bundle");
+use this after bulk imports, restores or a lost change-stream resume token.
+
+Usage:
+    cd backend
+    python -m scripts.rebuild_ar_bundles                 # rebuild everything
+    python -m scripts.rebuild_ar_bundles --qr-id CAT01   # rebuild one bundle
+    python -m scripts.rebuild_ar_bundles --check         # diff bundles against the live join
+    python -m scripts.rebuild_ar_bundles --check --fix   # ...and rebuild the differences
+"""
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from settings import settings
+from database.connection import db_manager
+from services.ar_bundle_service import ARBundleBuilder
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# qr_ids printed per problem category
+SAMPLE_SIZE = 20
+
+
+async def check(builder: ARBundleBuilder, fix: bool) -> int:
+    """Report missing/stale/orphaned bundles; returns a non-zero exit code on drift"""
+    report = await builder.check_consistency()
+    print(f"\nChecked {report['checked']} flashcards")
+    problems = []
+    for name in ("missing", "stale", "orphaned"):
+        qr_ids = report[name]
+        problems.extend(qr_ids)
+        print(f"  {name:<9} {len(qr_ids)}")
+        if qr_ids:
+            print(f"            {qr_ids[:SAMPLE_SIZE]}{' ...' if len(qr_ids) > SAMPLE_SIZE else ''}")
+    
+    if not problems:
+        print("\n✅ Bundles match the live join")
+        return 0
+    if not fix:
+        print(f"\n⚠️ {len(problems)} bundle(s) out of date (re-run with --fix)")
+        return 1
+    
+    failed = await builder.rebuild_many(problems)
+    print(f"\n🧱 Rebuilt {len(problems) - failed} bundle(s), {failed} failed")
+    return 1 if failed else 0
+
+
+async def main(args: argparse.Namespace) -> int:
+    """Main entry point"""
+    logger.info(f"📦 Database: {settings.MONGO_DB}")
+    builder = ARBundleBuilder(concurrency=args.concurrency)
+    
+    try:
+        if args.qr_id:
+            bundle = await builder.rebuild(args.qr_id)
+            print(f"{'🧱 Rebuilt' if bundle else '🗑️ No flashcard, removed'} {args.qr_id}")
+            return 0
+        if args.check:
+            return await check(builder, args.fix)
+        
+        result = await builder.rebuild_all(batch_size=args.batch_size)
+        print(f"\n🧱 Rebuilt: {result['rebuilt']}  Failed: {result['failed']}  "
+              f"Orphans deleted: {result['orphans_deleted']}")
+        return 1 if result["failed"] else 0
+    finally:
+        await db_manager.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rebuild or check materialized AR bundles")
+    parser.add_argument("--qr-id", help="Rebuild a single bundle")
+    parser.add_argument("--check", action="store_true", help="Diff bundles against the live join")
+    parser.add_argument("--fix", action="store_true", help="With --check: rebuild the differences")
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=8)
+    sys.exit(asyncio.run(main(parser.parse_args())))
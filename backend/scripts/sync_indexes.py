@@ -0,0 +1,55 @@
+"""
+Script to reconcile MongoDB indexes declared by the repositories.
+Creates missing indexes and reports extra or conflicting ones.
+
+Usage:
+    cd backend
+    python -m scripts.sync_indexes              # create missing, report extra
+    python -m scripts.sync_indexes --dry-run    # report only
+    python -m scripts.sync_indexes --drop-extra # also drop undeclared indexes
+"""
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+# Add backend to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from settings import settings
+from database.connection import db_manager
+from repositories.indexes import sync_all_indexes
+import logging
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+async def main(dry_run: bool, drop_extra: bool) -> int:
+    """Main entry point - returns a non-zero exit code if anything is missing"""
+    logger.info(f"📦 Database: {settings.MONGO_DB} (dry_run={dry_run}, drop_extra={drop_extra})")
+    
+    try:
+        reports = await sync_all_indexes(drop_extra=drop_extra, dry_run=dry_run)
+    finally:
+        await db_manager.close()
+    
+    problems = 0
+    for report in reports:
+        print(f"\n[{report['collection']}]")
+        for field in ("created", "missing", "extra", "dropped", "conflicts", "errors"):
+            values = report.get(field) or []
+            if values:
+                print(f"  {field:<10} {values}")
+        problems += len(report.get("missing") or []) + len(report.get("errors") or [])
+    
+    print(f"\n{'✅ Indexes in sync' if not problems else f'⚠️ {problems} problem(s)'}")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Reconcile repository indexes")
+    parser.add_argument("--dry-run", action="store_true", help="Report only")
+    parser.add_argument("--drop-extra", action="store_true", help="Drop undeclared indexes")
+    args = parser.parse_args()
+    sys.exit(asyncio.run(main(args.dry_run, args.drop_extra)))
@@ -1,19 +1,36 @@
 """
 AI Service - Business logic for AI-powered features using LangChain Core
 Uses langchain-core and langchain-google-genai (no full langchain dependency)
+
+One AIService per worker: created in main.lifespan (init_ai_service), reused
+by every request through get_ai_service(). The Gemini client, output parser
+and prompt chains are built once, in the constructor.
 """
-from typing import List, Dict, Any
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
 import google.generativeai as genai
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.prompts import ChatPromptTemplate, PromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 from settings import settings
+from services.embedding_client import EmbeddingClient, EmbeddingUnavailableError, embedding_client
+from services.embedding_batcher import EmbeddingBatcher, query_embedding_batcher
+from services.embedding_cache import EmbeddingCache, embedding_cache
+from services.answer_cache import CachedAnswer, SemanticAnswerCache, answer_cache
+from utils.metrics import LatencyStats, metrics_registry
 import logging
 
 logger = logging.getLogger(__name__)
 
 from repositories.ai_repository import get_ai_repository
 
+RAG_NOT_CONFIGURED_MESSAGE = "AI service chưa được cấu hình. 🔧"
+RAG_ERROR_MESSAGE = "Xin lỗi, có lỗi xảy ra. Bạn thử lại nhé! 🙏"
+
+# POST /chat/rag/stream: "retrieval", "first_token" (time to first token, from
+# request start), "complete", "disconnected" and "error" (time until it happened)
+rag_stream_timings = LatencyStats()
+metrics_registry.register("rag_stream", rag_stream_timings.snapshot)
+
 
 class AIService:
     """
@@ -38,9 +55,35 @@ Context về các flashcard:
 
 Hãy trả lời câu hỏi của bé dựa trên context trên."""
 
-    def __init__(self):
+    DEFAULT_CHAT_SYSTEM_PROMPT = "You are a helpful AI tutor for children learning languages."
+
+    # Templates are immutable: built once per process
+    RAG_PROMPT = ChatPromptTemplate.from_messages([
+        ("system", RAG_SYSTEM_PROMPT),
+        ("human", "{question}")
+    ])
+    # The system prompt comes from the active AI config, so it is a variable
+    CHAT_PROMPT = ChatPromptTemplate.from_messages([
+        ("system", "{system_prompt}"),
+        ("human", "Context: {context}\n\nKid: {question}")
+    ])
+    PRONUNCIATION_PROMPT = ChatPromptTemplate.from_messages([
+        ("system", "You are a pronunciation coach for children. Be encouraging and helpful."),
+        ("human", "Compare the target sentence '{target}' with the spoken sentence '{actual}'. Rate the pronunciation accuracy from 0-100 and provide simple feedback for a child.")
+    ])
+
+    def __init__(
+        self,
+        embedder: Optional[EmbeddingClient] = None,
+        query_batcher: Optional[EmbeddingBatcher] = None,
+        cache: Optional[EmbeddingCache] = None,
+        answers: Optional[SemanticAnswerCache] = None
+    ):
         self.repo = get_ai_repository()
-        self._embedding_model = "models/embedding-001"
+        self.embedder = embedder or embedding_client
+        self.query_batcher = query_batcher or query_embedding_batcher
+        self.cache = cache or embedding_cache
+        self.answers = answers or answer_cache
         
         if settings.GOOGLE_API_KEY:
             genai.configure(api_key=settings.GOOGLE_API_KEY)
@@ -49,11 +92,17 @@ Hãy trả lời câu hỏi của bé dựa trên context trên."""
                 google_api_key=settings.GOOGLE_API_KEY
             )
             self.output_parser = StrOutputParser()
+            self.rag_chain = self.RAG_PROMPT | self.llm | self.output_parser
+            self.chat_chain = self.CHAT_PROMPT | self.llm | self.output_parser
+            self.pronunciation_chain = self.PRONUNCIATION_PROMPT | self.llm | self.output_parser
             logger.info("[AI] Service initialized with Gemini 1.5 Flash")
         else:
             logger.warning("GOOGLE_API_KEY not set. AI features disabled.")
             self.llm = None
             self.output_parser = None
+            self.rag_chain = None
+            self.chat_chain = None
+            self.pronunciation_chain = None
 
     async def generate_embedding(self, text: str) -> List[float]:
         """
@@ -74,110 +123,181 @@ Hãy trả lời câu hỏi của bé dựa trên context trên."""
             return []
         
         try:
-            result = genai.embed_content(
-                model=self._embedding_model,
-                content=text,
-                task_type="retrieval_document"
+            embedding = await self._cached(
+                text, "retrieval_document",
+                lambda: self.embedder.embed(text, task_type="retrieval_document")
             )
-            embedding = result['embedding']
             logger.debug(f"[AI] Generated embedding with {len(embedding)} dimensions")
             return embedding
-        except Exception as e:
+        except EmbeddingUnavailableError as e:
             logger.error(f"[AI] Embedding generation failed: {e}")
             return []
 
     async def generate_query_embedding(self, query: str) -> List[float]:
         """
         Generate embedding for search query (uses retrieval_query task type).
+        Concurrent queries are micro-batched into one API call.
         """
         if not settings.GOOGLE_API_KEY or not query or not query.strip():
             return []
         
+        async def compute() -> List[float]:
+            if settings.EMBEDDING_BATCH_ENABLED:
+                return await self.query_batcher.embed(query)
+            return await self.embedder.embed(query, task_type="retrieval_query")
+        
         try:
-            result = genai.embed_content(
-                model=self._embedding_model,
-                content=query,
-                task_type="retrieval_query"
-            )
-            return result['embedding']
-        except Exception as e:
+            return await self._cached(query, "retrieval_query", compute)
+        except EmbeddingUnavailableError as e:
             logger.error(f"[AI] Query embedding generation failed: {e}")
             return []
 
+    async def _cached(
+        self,
+        text: str,
+        task_type: str,
+        compute: Callable[[], Awaitable[List[float]]]
+    ) -> List[float]:
+        """Go through the content-addressed embedding cache when enabled"""
+        if settings.EMBEDDING_CACHE_ENABLED:
+            return await self.cache.get_or_compute(text, task_type, compute)
+        return await compute()
+
     async def chat_with_rag(
         self, 
         question: str, 
-        context_flashcards: List[Dict[str, Any]]
+        context_flashcards: List[Dict[str, Any]],
+        query_embedding: Optional[List[float]] = None
     ) -> Dict[str, Any]:
         """
         RAG-enabled chat using retrieved flashcard context.
         
+        With the question's embedding, near-duplicate questions answered from
+        the same flashcards are served from the semantic answer cache.
+        
         Args:
             question: User's question
             context_flashcards: List of relevant flashcards from vector search
+            query_embedding: Embedding of the question (enables the answer cache)
             
         Returns:
-            Dict with response text and source flashcards
+            Dict with response text, source flashcards and whether it was cached
         """
         if not self.llm:
             return {
-                "response": "AI service chưa được cấu hình. 🔧",
+                "response": RAG_NOT_CONFIGURED_MESSAGE,
                 "sources": []
             }
         
-        # Build context string from flashcards
-        if context_flashcards:
-            context_parts = []
-            for i, fc in enumerate(context_flashcards, 1):
-                word = fc.get('word', 'N/A')
-                definition = fc.get('definition', '')
-                translation = fc.get('translation', {})
-                vi_trans = translation.get('vi', '')
-                en_trans = translation.get('en', word)
-                
-                context_parts.append(
-                    f"{i}. Từ vựng: {word}\n"
-                    f"   - Tiếng Anh: {en_trans}\n"
-                    f"   - Tiếng Việt: {vi_trans}\n"
-                    f"   - Mô tả: {definition}"
-                )
-            context = "\n".join(context_parts)
-        else:
-            context = "Không tìm thấy flashcard liên quan."
-        
-        # Build prompt with system instructions
-        prompt = ChatPromptTemplate.from_messages([
-            ("system", self.RAG_SYSTEM_PROMPT),
-            ("human", "{question}")
-        ])
+        sources = self.rag_sources(context_flashcards)
+        cached = self.cached_rag_answer(query_embedding, context_flashcards)
+        if cached:
+            return {"response": cached.response, "sources": sources, "cached": True}
         
         try:
-            chain = prompt | self.llm | self.output_parser
-            response = await chain.ainvoke({
-                "context": context,
+            response = await self.rag_chain.ainvoke({
+                "context": self.build_rag_context(context_flashcards),
                 "question": question
             })
-            
-            # Extract source info for response
-            sources = [
-                {
-                    "word": fc.get('word'),
-                    "score": fc.get('score', 0)
-                }
-                for fc in context_flashcards
-            ]
+            await self.remember_rag_answer(question, query_embedding, context_flashcards, response)
             
             return {
                 "response": response,
-                "sources": sources
+                "sources": sources,
+                "cached": False
             }
         except Exception as e:
             logger.error(f"[AI] RAG chat failed: {e}")
             return {
-                "response": "Xin lỗi, có lỗi xảy ra. Bạn thử lại nhé! 🙏",
+                "response": RAG_ERROR_MESSAGE,
                 "sources": []
             }
 
+    async def stream_rag(
+        self,
+        question: str,
+        context_flashcards: List[Dict[str, Any]]
+    ) -> AsyncIterator[str]:
+        """
+        RAG chat streamed as text chunks (chain.astream), for SSE.
+        
+        Closing the iterator (client disconnect) closes the upstream stream.
+        
+        Raises:
+            Exception: Errors of the LLM call propagate (the caller reports them)
+        """
+        if not self.llm:
+            yield RAG_NOT_CONFIGURED_MESSAGE
+            return
+        
+        stream = self.rag_chain.astream({
+            "context": self.build_rag_context(context_flashcards),
+            "question": question
+        })
+        try:
+            async for chunk in stream:
+                if chunk:
+                    yield chunk
+        finally:
+            await stream.aclose()
+
+    def cached_rag_answer(
+        self,
+        query_embedding: Optional[List[float]],
+        context_flashcards: List[Dict[str, Any]]
+    ) -> Optional[CachedAnswer]:
+        """Semantic answer cache lookup (None when disabled or missed)"""
+        if not settings.RAG_ANSWER_CACHE_ENABLED or not query_embedding:
+            return None
+        return self.answers.lookup(query_embedding, context_flashcards)
+
+    async def remember_rag_answer(
+        self,
+        question: str,
+        query_embedding: Optional[List[float]],
+        context_flashcards: List[Dict[str, Any]],
+        response: str
+    ) -> None:
+        """Store a generated RAG answer in the semantic answer cache"""
+        if settings.RAG_ANSWER_CACHE_ENABLED and query_embedding:
+            await self.answers.store(
+                question, query_embedding, context_flashcards, response,
+                self.rag_sources(context_flashcards)
+            )
+
+    @staticmethod
+    def build_rag_context(context_flashcards: List[Dict[str, Any]]) -> str:
+        """Context block of the RAG prompt from the retrieved flashcards"""
+        if not context_flashcards:
+            return "Không tìm thấy flashcard liên quan."
+        
+        context_parts = []
+        for i, fc in enumerate(context_flashcards, 1):
+            word = fc.get('word', 'N/A')
+            definition = fc.get('definition', '')
+            translation = fc.get('translation', {})
+            vi_trans = translation.get('vi', '')
+            en_trans = translation.get('en', word)
+            
+            context_parts.append(
+                f"{i}. Từ vựng: {word}\n"
+                f"   - Tiếng Anh: {en_trans}\n"
+                f"   - Tiếng Việt: {vi_trans}\n"
+                f"   - Mô tả: {definition}"
+            )
+        return "\n".join(context_parts)
+
+    @staticmethod
+    def rag_sources(context_flashcards: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Source info returned alongside a RAG answer"""
+        return [
+            {
+                "word": fc.get('word'),
+                "score": fc.get('score', 0)
+            }
+            for fc in context_flashcards
+        ]
+
     async def chat(self, message: str, context: str = "") -> str:
         """Original chat method (backward compatibility)"""
         if not self.llm:
@@ -185,15 +305,13 @@ Hãy trả lời câu hỏi của bé dựa trên context trên."""
         
         # Fetch active config or use default
         config = await self.repo.get_active_config()
-        system_prompt = config.system_prompt if config else "You are a helpful AI tutor for children learning languages."
+        system_prompt = config.system_prompt if config else self.DEFAULT_CHAT_SYSTEM_PROMPT
 
-        prompt = ChatPromptTemplate.from_messages([
-            ("system", system_prompt),
-            ("human", "Context: {context}\n\nKid: {question}")
-        ])
-        
-        chain = prompt | self.llm | self.output_parser
-        response = await chain.ainvoke({"context": context, "question": message})
+        response = await self.chat_chain.ainvoke({
+            "system_prompt": system_prompt,
+            "context": context,
+            "question": message
+        })
         return response
 
     async def analyze_pronunciation(self, text: str, audio_transcription: str) -> Dict[str, Any]:
@@ -204,16 +322,23 @@ Hãy trả lời câu hỏi của bé dựa trên context trên."""
         if not self.llm:
             return {"score": 0, "feedback": "AI not configured"}
 
-        prompt = ChatPromptTemplate.from_messages([
-            ("system", "You are a pronunciation coach for children. Be encouraging and helpful."),
-            ("human", "Compare the target sentence '{target}' with the spoken sentence '{actual}'. Rate the pronunciation accuracy from 0-100 and provide simple feedback for a child.")
-        ])
-        
-        chain = prompt | self.llm | self.output_parser
-        response = await chain.ainvoke({"target": text, "actual": audio_transcription})
+        response = await self.pronunciation_chain.ainvoke({"target": text, "actual": audio_transcription})
         return {"feedback": response}
 
 
+# ========== Singleton Instance ==========
+_ai_service: Optional[AIService] = None
+
+
+def init_ai_service() -> AIService:
+    """Create this worker's AIService (called from main.lifespan, after fork)"""
+    global _ai_service
+    if _ai_service is None:
+        _ai_service = AIService()
+    return _ai_service
+
+
 def get_ai_service() -> AIService:
-    return AIService()
+    """Dependency: the worker's AIService (created on first use outside the app, e.g. scripts)"""
+    return _ai_service or init_ai_service()
 
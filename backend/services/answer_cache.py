@@ -0,0 +1,312 @@
+"""
+Semantic Answer Cache - skips the LLM for near-duplicate RAG questions
+
+"con thỏ tiếng anh là gì" and "thỏ tiếng Anh là gì?" embed to nearly the same
+vector and retrieve the same flashcards, so they can share one answer.
+A cached answer is served when:
+
+1. the retrieved flashcard qr_ids are exactly the same set, and
+2. the cosine similarity of the question embeddings is >= the threshold.
+
+Entries are grouped by their qr_id set, so a lookup only compares against
+the few questions answered from the same flashcards. Vectors are kept
+normalized as float32 arrays (the backend does not depend on numpy), which
+turns cosine similarity into a dot product.
+
+Entries expire after a TTL, the per-worker size is capped (LRU), every hit
+is counted, and any change to a source flashcard drops the entries answered
+from it. Entries are persisted in the rag_answer_cache collection and
+reloaded at startup.
+"""
+import asyncio
+import math
+import time
+import uuid
+from array import array
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from operator import mul
+from typing import Any, Dict, FrozenSet, List, Optional, Set
+import logging
+
+from pymongo.errors import PyMongoError
+
+from settings import settings
+from utils.invalidation import InvalidationEvent, invalidation_bus
+from utils.metrics import metrics_registry
+from repositories.answer_cache_repository import (
+    AnswerCacheRepository,
+    get_answer_cache_repository,
+)
+from repositories.embedding_cache_repository import unpack_vector
+from repositories.flashcard_repository import touches_served_fields
+
+logger = logging.getLogger(__name__)
+
+SourceKey = FrozenSet[str]
+
+
+def _normalized(vector: List[float]) -> Optional[array]:
+    norm = math.sqrt(sum(x * x for x in vector))
+    if not norm:
+        return None
+    return array("f", (x / norm for x in vector))
+
+
+@dataclass
+class CachedAnswer:
+    """One cached RAG answer"""
+    entry_id: str
+    question: str
+    vector: array  # Normalized query embedding
+    source_key: SourceKey
+    response: str
+    sources: List[Dict[str, Any]]
+    expires_at: float  # time.time()
+    hits: int = 0
+
+
+class SemanticAnswerCache:
+    """
+    Per-worker semantic cache of RAG answers
+
+    Usage:
+        hit = answer_cache.lookup(query_vector, context_flashcards)
+        if hit is None:
+            ...call the LLM...
+            await answer_cache.store(question, query_vector, context_flashcards, response, sources)
+    """
+
+    def __init__(
+        self,
+        model: str,
+        threshold: float = 0.95,
+        max_size: int = 2000,
+        ttl_seconds: float = 86400.0
+    ):
+        self.model = model
+        self.threshold = threshold
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, CachedAnswer]" = OrderedDict()  # LRU order
+        self._groups: Dict[SourceKey, Set[str]] = {}
+        self._repo: Optional[AnswerCacheRepository] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self.lookups = 0
+        self.hits = 0
+        self.stores = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self.store_errors = 0
+
+    @property
+    def repo(self) -> AnswerCacheRepository:
+        # Created on first use, after the worker's client exists
+        if self._repo is None:
+            self._repo = get_answer_cache_repository()
+        return self._repo
+
+    @staticmethod
+    def source_key(context_flashcards: List[Dict[str, Any]]) -> SourceKey:
+        return frozenset(fc["qr_id"] for fc in context_flashcards if fc.get("qr_id"))
+
+    # ========== Lookup / store ==========
+
+    def lookup(
+        self,
+        query_vector: List[float],
+        context_flashcards: List[Dict[str, Any]]
+    ) -> Optional[CachedAnswer]:
+        """Best cached answer for the same flashcards above the threshold, or None"""
+        key = self.source_key(context_flashcards)
+        if not key:
+            return None
+        self.lookups += 1
+        candidates = self._groups.get(key)
+        if not candidates:
+            return None
+        query = _normalized(query_vector)
+        if query is None:
+            return None
+
+        now = time.time()
+        best: Optional[CachedAnswer] = None
+        best_score = self.threshold
+        for entry_id in list(candidates):
+            entry = self._entries[entry_id]
+            if entry.expires_at <= now:
+                self._remove(entry_id)
+                self.expirations += 1
+                continue
+            score = sum(map(mul, query, entry.vector))
+            if score >= best_score:
+                best, best_score = entry, score
+        if best is None:
+            return None
+
+        best.hits += 1
+        self.hits += 1
+        self._entries.move_to_end(best.entry_id)
+        self._background(self.repo.increment_hits(best.entry_id))
+        logger.info(f"💬 [AnswerCache] Hit ({best_score:.3f}) for: {best.question[:50]}")
+        return best
+
+    async def store(
+        self,
+        question: str,
+        query_vector: List[float],
+        context_flashcards: List[Dict[str, Any]],
+        response: str,
+        sources: List[Dict[str, Any]]
+    ) -> None:
+        """Cache a freshly generated answer (memory now, MongoDB best effort)"""
+        key = self.source_key(context_flashcards)
+        vector = _normalized(query_vector)
+        if not key or vector is None or not response:
+            return
+        entry = CachedAnswer(
+            entry_id=uuid.uuid4().hex,
+            question=question,
+            vector=vector,
+            source_key=key,
+            response=response,
+            sources=sources,
+            expires_at=time.time() + self.ttl_seconds,
+        )
+        self._add(entry)
+        self.stores += 1
+        try:
+            await self.repo.save_entry(
+                entry.entry_id, self.model, question, vector.tolist(), sorted(key),
+                response, sources, datetime.utcnow() + timedelta(seconds=self.ttl_seconds)
+            )
+        except PyMongoError as e:
+            self.store_errors += 1
+            logger.warning(f"[AnswerCache] Store failed: {e}")
+
+    def _add(self, entry: CachedAnswer) -> None:
+        self._entries[entry.entry_id] = entry
+        self._groups.setdefault(entry.source_key, set()).add(entry.entry_id)
+        while len(self._entries) > self.max_size:
+            oldest_id = next(iter(self._entries))
+            self._remove(oldest_id)
+            self.evictions += 1
+
+    def _remove(self, entry_id: str) -> None:
+        entry = self._entries.pop(entry_id, None)
+        if entry is None:
+            return
+        group = self._groups.get(entry.source_key)
+        if group is not None:
+            group.discard(entry_id)
+            if not group:
+                del self._groups[entry.source_key]
+
+    # ========== Invalidation ==========
+
+    def invalidate(self, qr_id: Optional[str] = None) -> int:
+        """Drop entries answered from a flashcard (None = everything), here and in MongoDB"""
+        if qr_id is None:
+            removed = len(self._entries)
+            self._entries.clear()
+            self._groups.clear()
+        else:
+            doomed = [eid for key, ids in self._groups.items() if qr_id in key for eid in ids]
+            for entry_id in doomed:
+                self._remove(entry_id)
+            removed = len(doomed)
+        self.invalidations += removed
+        # Every worker receives the event; the delete is idempotent
+        self._background(self.repo.delete_by_sources(None if qr_id is None else [qr_id]))
+        return removed
+
+    def on_flashcard_change(self, event: InvalidationEvent) -> None:
+        """
+        Invalidation bus handler
+
+        Inserts and deletes change which flashcards are retrieved, so they
+        can never produce a stale hit; updates of answer content can.
+        """
+        if event.operation == "reset":
+            self.invalidate()
+            return
+        if event.operation in ("insert", "delete") or not touches_served_fields(event.updated_fields):
+            return
+        self.invalidate(event.keys.get("qr_id"))
+
+    # ========== Persistence ==========
+
+    async def load(self) -> int:
+        """Fill this worker's cache from MongoDB (startup)"""
+        docs = await self.repo.load_entries(self.model, self.max_size)
+        now = time.time()
+        utc_now = datetime.utcnow()
+        # Oldest first, so the newest end up most recently used
+        for doc in reversed(docs):
+            self._add(CachedAnswer(
+                entry_id=doc["_id"],
+                question=doc["question"],
+                vector=unpack_vector(doc["vector"]),
+                source_key=frozenset(doc["source_ids"]),
+                response=doc["response"],
+                sources=doc.get("sources", []),
+                expires_at=now + (doc["expires_at"] - utc_now).total_seconds(),
+                hits=doc.get("hits", 0),
+            ))
+        if docs:
+            logger.info(f"💬 [AnswerCache] Loaded {len(docs)} cached answers")
+        return len(docs)
+
+    def _background(self, coroutine) -> None:
+        """Run a best-effort MongoDB write without delaying the request"""
+        try:
+            task = asyncio.get_running_loop().create_task(self._guard(coroutine))
+        except RuntimeError:
+            coroutine.close()  # No running loop (scripts/tests)
+            return
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _guard(self, coroutine) -> None:
+        try:
+            await coroutine
+        except PyMongoError as e:
+            self.store_errors += 1
+            logger.warning(f"[AnswerCache] Background write failed: {e}")
+
+    def snapshot(self) -> Dict[str, Any]:
+        top = sorted(self._entries.values(), key=lambda e: e.hits, reverse=True)[:5]
+        return {
+            "threshold": self.threshold,
+            "entries": len(self._entries),
+            "source_groups": len(self._groups),
+            "max_size": self.max_size,
+            "lookups": self.lookups,
+            "hits": self.hits,
+            "hit_ratio": round(self.hits / self.lookups, 4) if self.lookups else 0.0,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+            "store_errors": self.store_errors,
+            # /metrics is public: entry ids (the rag_answer_cache _id) and
+            # flashcard qr_ids only, never the children's question text
+            "top": [
+                {"entry_id": e.entry_id, "qr_ids": sorted(e.source_key), "hits": e.hits}
+                for e in top if e.hits
+            ],
+        }
+
+
+# ========== Singleton Instance ==========
+answer_cache = SemanticAnswerCache(
+    model=settings.EMBEDDING_MODEL,
+    threshold=settings.RAG_ANSWER_CACHE_THRESHOLD,
+    max_size=settings.RAG_ANSWER_CACHE_MAX_SIZE,
+    ttl_seconds=settings.RAG_ANSWER_CACHE_TTL_SECONDS
+)
+metrics_registry.register("rag_answer_cache", answer_cache.snapshot)
+if settings.RAG_ANSWER_CACHE_ENABLED:
+    invalidation_bus.subscribe(["flashcards"], answer_cache.on_flashcard_change)
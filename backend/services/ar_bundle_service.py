@@ -0,0 +1,332 @@
+"""
+AR Bundle Service - Maintains the materialized ar_experience_bundles collection
+
+Each bundle is the live $lookup join (FlashcardRepository.get_ar_experience_bundle)
+stored under the flashcard's qr_id, so ARService can serve a scan with one
+_id lookup. Bundles are rebuilt incrementally from invalidation events on
+flashcards, ar_objects and ar_combinations; scripts/rebuild_ar_bundles.py does
+full rebuilds and consistency checks.
+
+Only one worker builds: the holder of the "ar_bundle_builder" lease (renewed
+every AR_BUNDLE_LEASE_SECONDS / 3). The other workers only drop their caches
+(ARService), which they do for every bundle write anyway. With the change
+watcher running, the builder acts on watcher events only, so the worker that
+made a write does not rebuild once for its own event and again for the
+watcher's. Changes seen while no worker holds the lease (e.g. during a
+takeover after a crash) are repaired by scripts/rebuild_ar_bundles.py --check --fix.
+"""
+import asyncio
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Set
+import logging
+
+from pymongo.errors import PyMongoError
+
+from settings import settings
+from utils.invalidation import InvalidationEvent, invalidation_bus
+from utils.metrics import metrics_registry
+from repositories.flashcard_repository import (
+    FlashcardRepository,
+    get_flashcard_repository,
+    touches_served_fields,
+)
+from repositories.ar_bundle_repository import ARBundleRepository, get_ar_bundle_repository
+from repositories.job_repository import worker_id
+from repositories.lease_repository import LeaseRepository, get_lease_repository
+
+logger = logging.getLogger(__name__)
+
+BUNDLE_COLLECTION = "ar_experience_bundles"
+SOURCE_COLLECTIONS = ["flashcards", "ar_objects", "ar_combinations"]
+LEASE_NAME = "ar_bundle_builder"
+
+
+def _normalize(bundle: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Order-independent form of a bundle (combos sorted by _id) for comparisons"""
+    if bundle is None:
+        return None
+    return {
+        "flashcard": bundle.get("flashcard"),
+        "target": bundle.get("target"),
+        "related_combos": sorted(bundle.get("related_combos") or [], key=lambda c: str(c.get("_id"))),
+    }
+
+
+class ARBundleBuilder:
+    """
+    Rebuilds materialized AR bundles
+
+    Repositories are created on first use, after the worker's client exists.
+    """
+
+    def __init__(
+        self,
+        concurrency: int = 8,
+        lease_seconds: float = 30.0,
+        watcher_events_only: bool = True
+    ):
+        self.concurrency = concurrency
+        self.lease_seconds = lease_seconds
+        self.watcher_events_only = watcher_events_only
+        self._flashcard_repo: Optional[FlashcardRepository] = None
+        self._bundle_repo: Optional[ARBundleRepository] = None
+        self._lease_repo: Optional[LeaseRepository] = None
+        self._pending: Set[str] = set()
+        self._pending_events: List[InvalidationEvent] = []
+        self._task: Optional[asyncio.Task] = None
+        self._lease_task: Optional[asyncio.Task] = None
+        self.is_leader = False
+        self.skipped_events = 0
+        self.rebuilt = 0
+        self.deleted = 0
+        self.errors = 0
+        self.last_built_at: Optional[datetime] = None
+
+    @property
+    def flashcard_repo(self) -> FlashcardRepository:
+        if self._flashcard_repo is None:
+            self._flashcard_repo = get_flashcard_repository()
+        return self._flashcard_repo
+
+    @property
+    def bundle_repo(self) -> ARBundleRepository:
+        if self._bundle_repo is None:
+            self._bundle_repo = get_ar_bundle_repository()
+        return self._bundle_repo
+
+    @property
+    def lease_repo(self) -> LeaseRepository:
+        if self._lease_repo is None:
+            self._lease_repo = get_lease_repository()
+        return self._lease_repo
+
+    # ========== Builder lease ==========
+
+    def start(self) -> None:
+        """Compete for the builder lease in the background (lifespan startup)"""
+        if self._lease_task is None or self._lease_task.done():
+            self._lease_task = asyncio.create_task(self._hold_lease_forever(), name="ar-bundle-lease")
+
+    async def _hold_lease_forever(self) -> None:
+        holder = worker_id()
+        while True:
+            try:
+                leader = await self.lease_repo.try_acquire(LEASE_NAME, holder, self.lease_seconds)
+            except PyMongoError as e:
+                # Cannot tell whether the lease is still ours: stop building
+                logger.warning(f"[Bundles] Lease renewal failed: {e}")
+                leader = False
+            if leader != self.is_leader:
+                logger.info(f"🧱 [Bundles] {holder} {'is now' if leader else 'is no longer'} the bundle builder")
+            self.is_leader = leader
+            await asyncio.sleep(self.lease_seconds / 3)
+
+    # ========== Single bundle ==========
+
+    async def rebuild(self, qr_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Rebuild one bundle from the live join (deletes it if the card is gone)
+
+        Returns:
+            The fresh bundle, or None if the flashcard no longer exists
+        """
+        bundle = await self.flashcard_repo.get_ar_experience_bundle(qr_id)
+        if bundle is None:
+            if await self.bundle_repo.delete_bundle(qr_id):
+                self.deleted += 1
+        else:
+            await self.bundle_repo.save_bundle(qr_id, bundle)
+            self.rebuilt += 1
+        self.last_built_at = datetime.utcnow()
+
+        # This worker's cache drops it now; other workers see the bundle write
+        invalidation_bus.publish(InvalidationEvent(
+            collection=BUNDLE_COLLECTION,
+            operation="delete" if bundle is None else "replace",
+            keys={"_id": qr_id}
+        ))
+        return bundle
+
+    async def rebuild_many(self, qr_ids: Iterable[str]) -> int:
+        """Rebuild several bundles with bounded concurrency; returns the failure count"""
+        semaphore = asyncio.Semaphore(self.concurrency)
+        failures = 0
+
+        async def _one(qr_id: str) -> None:
+            nonlocal failures
+            async with semaphore:
+                try:
+                    await self.rebuild(qr_id)
+                except Exception as e:
+                    failures += 1
+                    self.errors += 1
+                    logger.error(f"❌ [Bundles] Rebuild failed for {qr_id}: {e}")
+
+        await asyncio.gather(*(_one(qr_id) for qr_id in set(qr_ids)))
+        return failures
+
+    # ========== Incremental rebuilds ==========
+
+    async def affected_qr_ids(self, event: InvalidationEvent) -> Set[str]:
+        """
+        Bundles that may change because of one source-document change
+
+        Looks both forward (cards matching the new ar_tag / required_tags) and
+        backward (bundles that embedded the changed document), so moves and
+        deletes are covered too.
+        """
+        keys = event.keys
+        doc_id = str(keys["_id"]) if keys.get("_id") is not None else None
+        qr_ids: Set[str] = set()
+
+        if event.collection == "flashcards":
+            if not touches_served_fields(event.updated_fields):
+                return qr_ids  # Embedding writes (e.g. a backfill) are not part of bundles
+            if keys.get("qr_id"):
+                qr_ids.add(keys["qr_id"])
+            if doc_id:
+                qr_ids.update(await self.bundle_repo.find_qr_ids({"flashcard_id": doc_id}))
+        elif event.collection == "ar_objects":
+            if keys.get("ar_tag"):
+                qr_ids.update(await self.flashcard_repo.get_qr_ids_by_ar_tags([keys["ar_tag"]]))
+            if doc_id:
+                qr_ids.update(await self.bundle_repo.find_qr_ids({"target_id": doc_id}))
+        elif event.collection == "ar_combinations":
+            tags = keys.get("required_tags") or []
+            qr_ids.update(await self.flashcard_repo.get_qr_ids_by_ar_tags(list(tags)))
+            if doc_id:
+                qr_ids.update(await self.bundle_repo.find_qr_ids({"combo_ids": doc_id}))
+        return qr_ids
+
+    def on_source_change(self, event: InvalidationEvent) -> None:
+        """Invalidation bus handler: queue the change and drain it in the background"""
+        if not self.is_leader or (self.watcher_events_only and not event.from_watcher):
+            self.skipped_events += 1
+            return
+        if event.operation == "reset":
+            logger.warning(f"[Bundles] {event.collection} reset; bundles need a full rebuild "
+                           f"(python -m scripts.rebuild_ar_bundles)")
+            return
+        self._pending_events.append(event)
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._drain(), name="ar-bundle-builder")
+
+    def enqueue(self, qr_id: str) -> None:
+        """Schedule a rebuild of one bundle (e.g. after a miss on the scan path)"""
+        if not self.is_leader:
+            return
+        self._pending.add(qr_id)
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._drain(), name="ar-bundle-builder")
+
+    async def _drain(self) -> None:
+        """Resolve queued events to qr_ids and rebuild them, until nothing is left"""
+        while self._pending_events or self._pending:
+            events, self._pending_events = self._pending_events, []
+            for event in events:
+                try:
+                    self._pending.update(await self.affected_qr_ids(event))
+                except Exception as e:
+                    self.errors += 1
+                    logger.error(f"❌ [Bundles] Could not resolve {event.collection} change: {e}")
+            qr_ids, self._pending = self._pending, set()
+            if qr_ids:
+                await self.rebuild_many(qr_ids)
+                logger.info(f"🧱 [Bundles] Rebuilt {len(qr_ids)} bundle(s)")
+
+    async def stop(self) -> None:
+        """Finish queued rebuilds and hand the lease over (lifespan shutdown)"""
+        if self._lease_task:
+            self._lease_task.cancel()
+            try:
+                await self._lease_task
+            except asyncio.CancelledError:
+                pass
+            self._lease_task = None
+        if self._task and not self._task.done():
+            await self._task
+        if self.is_leader:
+            self.is_leader = False
+            try:
+                await self.lease_repo.release(LEASE_NAME, worker_id())
+            except PyMongoError as e:
+                logger.warning(f"[Bundles] Lease release failed (expires on its own): {e}")
+
+    # ========== Full rebuild / consistency ==========
+
+    async def rebuild_all(self, batch_size: int = 500) -> Dict[str, Any]:
+        """
+        Rebuild every bundle and delete bundles whose flashcard is gone
+
+        Returns:
+            {"rebuilt", "failed", "orphans_deleted"}
+        """
+        started = datetime.utcnow()
+        total = 0
+        failed = 0
+        batch: List[str] = []
+        async for qr_id in self.flashcard_repo.iter_qr_ids(batch_size):
+            batch.append(qr_id)
+            if len(batch) >= batch_size:
+                failed += await self.rebuild_many(batch)
+                total += len(batch)
+                logger.info(f"🧱 [Bundles] {total} rebuilt")
+                batch = []
+        if batch:
+            failed += await self.rebuild_many(batch)
+            total += len(batch)
+
+        # Anything not rewritten during this run has no flashcard any more
+        orphans = 0
+        if not failed:
+            orphans = await self.bundle_repo.delete_many({"built_at": {"$lt": started}})
+        return {"rebuilt": total - failed, "failed": failed, "orphans_deleted": orphans}
+
+    async def check_consistency(self) -> Dict[str, Any]:
+        """
+        Diff every stored bundle against the live join
+
+        Returns:
+            {"checked": int, "missing": [qr_id], "stale": [qr_id], "orphaned": [qr_id]}
+        """
+        report: Dict[str, Any] = {"checked": 0, "missing": [], "stale": [], "orphaned": []}
+        seen: Set[str] = set()
+
+        async for qr_id in self.flashcard_repo.iter_qr_ids():
+            seen.add(qr_id)
+            report["checked"] += 1
+            live, stored = await asyncio.gather(
+                self.flashcard_repo.get_ar_experience_bundle(qr_id),
+                self.bundle_repo.get_bundle(qr_id)
+            )
+            if stored is None:
+                report["missing"].append(qr_id)
+            elif _normalize(stored) != _normalize(live):
+                report["stale"].append(qr_id)
+
+        async for qr_id in self.bundle_repo.iter_qr_ids():
+            if qr_id not in seen:
+                report["orphaned"].append(qr_id)
+        return report
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "leader": self.is_leader,
+            "skipped_events": self.skipped_events,
+            "rebuilt": self.rebuilt,
+            "deleted": self.deleted,
+            "errors": self.errors,
+            "pending": len(self._pending) + len(self._pending_events),
+            "last_built_at": self.last_built_at.isoformat() if self.last_built_at else None,
+        }
+
+
+# ========== Singleton Instance ==========
+ar_bundle_builder = ARBundleBuilder(
+    lease_seconds=settings.AR_BUNDLE_LEASE_SECONDS,
+    watcher_events_only=settings.CACHE_INVALIDATION_ENABLED
+)
+metrics_registry.register("ar_bundles", ar_bundle_builder.snapshot)
+
+if settings.AR_EXPERIENCE_MODE == "bundle" and settings.AR_BUNDLE_BUILDER_ENABLED:
+    invalidation_bus.subscribe(SOURCE_COLLECTIONS, ar_bundle_builder.on_source_change)
@@ -1,30 +1,109 @@
 """
 AR Service - Business logic for AR experience orchestration
 """
+import asyncio
 from typing import Optional, Dict, Any
+import logging
 
-from repositories.flashcard_repository import FlashcardRepository, get_flashcard_repository
+from settings import settings
+from utils.metrics import LatencyStats, metrics_registry
+from utils.cache import TTLCache
+from utils.invalidation import InvalidationEvent, invalidation_bus
+from core.conditional import ETagRegistry
+from repositories.flashcard_repository import (
+    FlashcardRepository,
+    get_flashcard_repository,
+    touches_served_fields,
+)
 from repositories.ar_object_repository import ARObjectRepository, get_ar_object_repository
 from repositories.ar_combination_repository import ARCombinationRepository, get_ar_combination_repository
+from repositories.ar_bundle_repository import ARBundleRepository, get_ar_bundle_repository
+from services.ar_bundle_service import BUNDLE_COLLECTION, ar_bundle_builder
+
+logger = logging.getLogger(__name__)
+
+# Per-stage timings, named "<mode>.<stage>", shared by all ARService instances
+ar_experience_timings = LatencyStats()
+metrics_registry.register("ar_experience", ar_experience_timings.snapshot)
+
+# Per-worker bundle cache keyed by qr_id (catalog data changes a few times a week)
+ar_experience_cache = TTLCache(
+    name="ar_experience",
+    max_size=settings.AR_CACHE_MAX_SIZE,
+    ttl_seconds=settings.AR_CACHE_TTL_SECONDS
+)
+metrics_registry.register("ar_experience_cache", ar_experience_cache.snapshot)
+
+# Version stamps answering If-None-Match on GET /flashcard/{qr_id} without a read
+ar_experience_etags = ETagRegistry(
+    name="ar_experience",
+    max_size=settings.ETAG_REGISTRY_MAX_SIZE,
+    ttl_seconds=settings.ETAG_REGISTRY_TTL_SECONDS
+)
+metrics_registry.register("ar_experience_etags", ar_experience_etags.snapshot)
+
+
+def invalidate_ar_experience(qr_id: Optional[str] = None) -> None:
+    """Drop one cached AR bundle and its ETag, or all of them when qr_id is None"""
+    if qr_id is None:
+        ar_experience_cache.clear()
+    else:
+        ar_experience_cache.invalidate(qr_id)
+    ar_experience_etags.invalidate(qr_id)
+
+
+def _on_catalog_change(event: InvalidationEvent) -> None:
+    """
+    Invalidate bundles affected by a catalog change (from any worker)
+    
+    A flashcard change maps to one qr_id unless its qr_id/ar_tag moved or is
+    unknown (deletes). AR objects and combos are shared by many cards, so
+    their changes drop the whole cache. A rewritten materialized bundle maps
+    to its _id (the qr_id). Embedding-only updates change nothing served.
+    """
+    if event.collection == "flashcards" and not touches_served_fields(event.updated_fields):
+        return
+    if event.collection == BUNDLE_COLLECTION and event.keys.get("_id") and event.operation != "reset":
+        invalidate_ar_experience(event.keys["_id"])
+        return
+    qr_id = event.keys.get("qr_id")
+    key_moved = bool(event.updated_fields and {"qr_id", "ar_tag"} & set(event.updated_fields))
+    if event.collection == "flashcards" and qr_id and not key_moved and event.operation != "reset":
+        invalidate_ar_experience(qr_id)
+    else:
+        invalidate_ar_experience()
+
+
+invalidation_bus.subscribe(["flashcards", "ar_objects", "ar_combinations", BUNDLE_COLLECTION], _on_catalog_change)
 
 
 class ARService:
     """Service handling AR experience orchestration"""
     
+    MODES = ("aggregate", "concurrent", "bundle")
+    
     def __init__(
         self,
         flashcard_repo: FlashcardRepository,
         ar_object_repo: ARObjectRepository,
-        ar_combination_repo: ARCombinationRepository
+        ar_combination_repo: ARCombinationRepository,
+        mode: Optional[str] = None,
+        bundle_repo: Optional[ARBundleRepository] = None
     ):
         self.flashcard_repo = flashcard_repo
         self.ar_object_repo = ar_object_repo
         self.ar_combination_repo = ar_combination_repo
+        self.bundle_repo = bundle_repo or get_ar_bundle_repository()
+        self.mode = mode or settings.AR_EXPERIENCE_MODE
+        if self.mode not in self.MODES:
+            logger.warning(f"[AR] Unknown AR_EXPERIENCE_MODE '{self.mode}', using 'aggregate'")
+            self.mode = "aggregate"
     
     async def get_ar_experience(self, qr_id: str) -> Optional[Dict[str, Any]]:
         """
         Get complete AR experience data by QR ID
-        Orchestrates data from flashcard, AR object, and combinations
+        Orchestrates data from flashcard, AR object, and combinations.
+        Served from the per-worker TTL cache; concurrent misses share one read.
         
         Returns ARExperienceResponseSchema format:
         {
@@ -33,21 +112,53 @@ class ARService:
             "related_combos": List[ArCombinationSchema]
         }
         """
+        if settings.AR_CACHE_ENABLED:
+            return await ar_experience_cache.get_or_load(
+                qr_id, lambda: self._load_ar_experience(qr_id)
+            )
+        return await self._load_ar_experience(qr_id)
+    
+    async def _load_ar_experience(self, qr_id: str) -> Optional[Dict[str, Any]]:
+        """Read the AR bundle from MongoDB using the configured mode"""
+        with ar_experience_timings.time(f"{self.mode}.total"):
+            if self.mode == "bundle":
+                return await self._get_ar_experience_bundle(qr_id)
+            if self.mode == "aggregate":
+                with ar_experience_timings.time("aggregate.lookup"):
+                    return await self.flashcard_repo.get_ar_experience_bundle(qr_id)
+            return await self._get_ar_experience_concurrent(qr_id)
+    
+    async def _get_ar_experience_bundle(self, qr_id: str) -> Optional[Dict[str, Any]]:
+        """One _id lookup in ar_experience_bundles; live join (and a rebuild) on a miss"""
+        with ar_experience_timings.time("bundle.find_one"):
+            bundle = await self.bundle_repo.get_bundle(qr_id)
+        if bundle is not None:
+            return bundle
+        
+        with ar_experience_timings.time("bundle.fallback_lookup"):
+            bundle = await self.flashcard_repo.get_ar_experience_bundle(qr_id)
+        if bundle is not None:
+            ar_bundle_builder.enqueue(qr_id)
+        return bundle
+    
+    async def _get_ar_experience_concurrent(self, qr_id: str) -> Optional[Dict[str, Any]]:
+        """Two round trips: flashcard, then AR target and combos in parallel"""
         # Get flashcard by QR ID
-        flashcard = await self.flashcard_repo.get_by_qr_id(qr_id)
+        with ar_experience_timings.time("concurrent.flashcard"):
+            flashcard = await self.flashcard_repo.get_by_qr_id(qr_id)
         if not flashcard:
             return None
         
-        # Get AR target image (marker)
+        # Get AR target image (marker) and combinations for this tag
         ar_tag = flashcard.get("ar_tag")
         ar_object = None
-        if ar_tag:
-            ar_object = await self.ar_object_repo.get_by_tag(ar_tag)
-        
-        # Get AR combinations for this tag
         related_combos = []
         if ar_tag:
-            related_combos = await self.ar_combination_repo.find_by_tag(ar_tag)
+            with ar_experience_timings.time("concurrent.target_and_combos"):
+                ar_object, related_combos = await asyncio.gather(
+                    self.ar_object_repo.get_by_tag(ar_tag),
+                    self.ar_combination_repo.find_by_tag(ar_tag)
+                )
         
         # Build complete AR experience response (must match ARExperienceResponseSchema)
         return {
@@ -62,4 +173,5 @@ def get_ar_service() -> ARService:
     flashcard_repo = get_flashcard_repository()
     ar_object_repo = get_ar_object_repository()
     ar_combination_repo = get_ar_combination_repository()
-    return ARService(flashcard_repo, ar_object_repo, ar_combination_repo)
+    bundle_repo = get_ar_bundle_repository()
+    return ARService(flashcard_repo, ar_object_repo, ar_combination_repo, bundle_repo=bundle_repo)
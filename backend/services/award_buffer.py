@@ -0,0 +1,245 @@
+"""
+Point Award Buffer - write-coalescing for GamificationService.award_points
+
+During a game round every correct answer awards points, and each award used
+to be its own find_one_and_update. Awards are now accumulated per user in
+memory and written as one unordered bulk_write of $inc updates:
+
+- Flushed every AWARD_FLUSH_INTERVAL_MS, or as soon as AWARD_FLUSH_MAX_EVENTS
+  awards are buffered, whichever comes first.
+- Every flush carries a batch id recorded on each updated document. Writes
+  reported as failed are merged back into the buffer; a flush whose outcome
+  is unknown (network error, timeout) is re-sent as-is under the same id, so
+  it is applied exactly once.
+- Durable on graceful shutdown: stop() (lifespan) drains the buffer.
+  A crashed worker loses at most one interval of awards.
+- Read-your-writes: pending_points() exposes deltas not yet in MongoDB, and
+  wait_idle() / version let a reader avoid racing an in-progress flush
+  (see GamificationService.get_user_stats).
+- The leaderboard receives the new totals of every flushed user (one $in read
+  per flush).
+"""
+import asyncio
+import time
+from datetime import datetime
+from typing import Any, Collection, Dict, Optional, Set, Tuple
+import logging
+
+from bson import ObjectId
+from pymongo.errors import PyMongoError
+
+from settings import settings
+from repositories.gamification_repository import GamificationRepository, get_gamification_repository
+from services.leaderboard import leaderboard
+from utils.metrics import Histogram, LatencyStats, metrics_registry
+
+logger = logging.getLogger(__name__)
+
+
+class PointAwardBuffer:
+    """
+    Per-worker buffer of pending point increments
+
+    Usage:
+        award_buffer.add(user_id, 10)              # returns immediately
+        award_buffer.pending_points(user_id)        # not yet written
+        await award_buffer.stop()                   # lifespan: final flush
+    """
+
+    def __init__(self, flush_interval_ms: float = 200.0, max_events: int = 500):
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_events = max_events
+        self._pending: Dict[str, int] = {}
+        self._pending_events = 0
+        self._in_flight: Dict[str, int] = {}  # Batch being written
+        # (flush id, batch, activity) of a flush that may or may not have been applied
+        self._unconfirmed: Optional[Tuple[str, Dict[str, int], Optional[datetime]]] = None
+        self._last_activity: Optional[datetime] = None
+        self._repo: Optional[GamificationRepository] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stopping = False
+        self._wake = asyncio.Event()
+        self._idle = asyncio.Event()
+        self._idle.set()
+        self._flush_lock = asyncio.Lock()
+        self.version = 0  # Bumped when a flush starts and when it ends
+        self.timings = LatencyStats()
+        self.batch_sizes = Histogram([1, 10, 50, 100, 500, 1000, 5000])
+        self.events = 0
+        self.flushes = 0
+        self.writes = 0
+        self.requeued = 0
+        self.resent = 0
+        self.errors = 0
+
+    @property
+    def repo(self) -> GamificationRepository:
+        # Created on first use, after the worker's client exists
+        if self._repo is None:
+            self._repo = get_gamification_repository()
+        return self._repo
+
+    # ========== Producer side ==========
+
+    def add(self, user_id: str, points: int) -> int:
+        """
+        Buffer an award
+
+        Returns:
+            Points of this user still waiting to be written
+        """
+        self._pending[user_id] = self._pending.get(user_id, 0) + points
+        self._pending_events += 1
+        self._last_activity = datetime.utcnow()
+        self.events += 1
+        self._ensure_task()
+        if self._pending_events >= self.max_events:
+            self._wake.set()
+        return self._pending[user_id]
+
+    def pending_points(self, user_id: str, applied_flushes: Collection[str] = ()) -> int:
+        """
+        Buffered points of a user that are not in MongoDB yet
+
+        Args:
+            applied_flushes: applied_flushes of the user's points document;
+                an unconfirmed flush listed there is already in the total
+        """
+        unconfirmed = 0
+        if self._unconfirmed and self._unconfirmed[0] not in applied_flushes:
+            unconfirmed = self._unconfirmed[1].get(user_id, 0)
+        return self._pending.get(user_id, 0) + self._in_flight.get(user_id, 0) + unconfirmed
+
+    async def wait_idle(self) -> None:
+        """Wait until no flush is being written"""
+        await self._idle.wait()
+
+    # ========== Flushing ==========
+
+    def _ensure_task(self) -> None:
+        if self._stopping:
+            return  # stop() drains whatever arrives from now on
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(
+                self._flush_forever(), name="award-buffer-flush"
+            )
+
+    async def _flush_forever(self) -> None:
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self.flush()
+
+    async def flush(self) -> int:
+        """Write every buffered award now; returns the number of users written"""
+        async with self._flush_lock:
+            if self._unconfirmed is not None:
+                # Same id: users it already reached are skipped by the repository
+                # (stays unconfirmed, not in flight, until the write returns)
+                flush_id, batch, activity_at = self._unconfirmed
+                events = 0
+                self.resent += 1
+            elif self._pending:
+                flush_id = str(ObjectId())
+                batch, self._pending = self._pending, {}
+                events, self._pending_events = self._pending_events, 0
+                activity_at = self._last_activity
+                self._in_flight = batch
+            else:
+                return 0
+            self._idle.clear()
+            self.version += 1
+            started = time.perf_counter()
+            try:
+                failed = await self.repo.bulk_increment_points(batch, activity_at, flush_id)
+                self._unconfirmed = None
+            except PyMongoError as e:
+                # Never re-sent as a fresh $inc: it may already have been applied
+                logger.error(f"[Awards] Flush {flush_id} of {len(batch)} users has unknown outcome, re-sending: {e}")
+                self._unconfirmed = (flush_id, batch, activity_at)
+                self.errors += 1
+                return 0
+            finally:
+                self._in_flight = {}
+                self.version += 1
+                self._idle.set()
+
+            if failed:
+                # Reported as not applied: safe to merge into the next flush
+                self.errors += 1
+                self.requeued += len(failed)
+                for user_id in failed:
+                    self._pending[user_id] = self._pending.get(user_id, 0) + batch[user_id]
+                # Exact count is lost for partial failures; one event per user is enough to retry
+                self._pending_events += len(failed)
+            written = set(batch) - set(failed)
+            self.flushes += 1
+            self.writes += len(written)
+            self.batch_sizes.record(len(batch))
+            self.timings.record("flush", (time.perf_counter() - started) * 1000)
+            logger.debug(f"[Awards] Flushed {events} awards as {len(written)} writes")
+
+        if written:
+            await self._refresh_leaderboard(written)
+        return len(written)
+
+    async def _refresh_leaderboard(self, user_ids: Set[str]) -> None:
+        """Hand the new absolute totals to this worker's leaderboard"""
+        try:
+            for doc in await self.repo.get_by_user_ids(list(user_ids)):
+                leaderboard.apply(doc)
+        except PyMongoError as e:
+            # The next periodic resync catches up
+            logger.warning(f"[Awards] Leaderboard refresh failed: {e}")
+
+    async def stop(self) -> None:
+        """Stop the timer and drain the buffer (lifespan shutdown)"""
+        # Not cancelled: a cancelled bulk_write may or may not have been applied
+        self._stopping = True
+        self._wake.set()
+        if self._task:
+            try:
+                await self._task
+            except Exception as e:
+                logger.error(f"[Awards] Flush task failed: {e}")
+            self._task = None
+        # A few attempts: writes that keep failing are logged, not silently dropped
+        for _ in range(3):
+            await self.flush()
+            if not self._pending and self._unconfirmed is None:
+                return
+        if self._unconfirmed is not None:
+            flush_id, batch, _ = self._unconfirmed
+            logger.error(f"❌ [Awards] Flush {flush_id} may not have been written: {batch}")
+        if self._pending:
+            logger.error(f"❌ [Awards] {len(self._pending)} users' points could not be written: {self._pending}")
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "pending_users": len(self._pending),
+            "pending_events": self._pending_events,
+            "in_flight_users": len(self._in_flight),
+            "unconfirmed_users": len(self._unconfirmed[1]) if self._unconfirmed else 0,
+            "flush_interval_ms": round(self.flush_interval * 1000),
+            "max_events": self.max_events,
+            "events": self.events,
+            "flushes": self.flushes,
+            "writes": self.writes,
+            "events_per_write": round(self.events / self.writes, 2) if self.writes else 0.0,
+            "requeued": self.requeued,
+            "resent": self.resent,
+            "errors": self.errors,
+            "batch_users": self.batch_sizes.snapshot(),
+            "latency": self.timings.snapshot(),
+        }
+
+
+# ========== Singleton Instance ==========
+award_buffer = PointAwardBuffer(
+    flush_interval_ms=settings.AWARD_FLUSH_INTERVAL_MS,
+    max_events=settings.AWARD_FLUSH_MAX_EVENTS
+)
+metrics_registry.register("point_awards", award_buffer.snapshot)
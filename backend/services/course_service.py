@@ -1,5 +1,6 @@
 from typing import List, Dict, Any, Optional
 from repositories.course_repository import get_course_repository
+from core.pagination import Page
 from models.course_model import CourseSchema, LessonSchema
 import logging
 
@@ -9,11 +10,16 @@ class CourseService:
     def __init__(self):
         self.repo = get_course_repository()
 
-    async def get_courses(self, skip: int = 0, limit: int = 20) -> List[Dict[str, Any]]:
-        return await self.repo.get_all_published(skip, limit)
+    async def get_courses(
+        self,
+        skip: int = 0,
+        limit: int = 20,
+        after: Optional[str] = None
+    ) -> Page:
+        return await self.repo.get_all_published(skip, limit, after)
 
     async def get_course_by_id(self, course_id: str) -> Optional[Dict[str, Any]]:
-        return await self.repo.get_by_id(course_id)
+        return await self.repo.find_by_id(course_id)
 
     async def complete_lesson(self, user_id: str, course_id: str, lesson_id: str) -> bool:
         # Logic to mark lesson as complete for user
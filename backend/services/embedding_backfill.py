@@ -0,0 +1,335 @@
+"""
+Embedding Backfill - streaming, resumable embedding generation
+
+Two modes:
+- "missing": only cards without a vector
+- "stale" (reconciler): scans every card and re-embeds only those whose
+  embedding text (word/translation/definition) or model changed, compared
+  via the embedding_hash / embedding_model stored next to the vector
+
+Pipeline per page of flashcards (keyset cursor on _id):
+
+    fetch page ──► skip current cards ──► chunks of texts ──► embedding cache lookup
+      (next page                                              (one query per chunk)
+       prefetched)
+                    ──► batch embed_content calls for the misses ──► store in cache
+                        (bounded concurrency, token-bucket rate limit,
+                         per-card retry when a chunk is rejected)
+                    ──► one unordered bulk_write ──► checkpoint(cursor)
+
+Vectors go through the shared embedding cache (services.embedding_cache) with
+task_type "retrieval_document", so cards sharing a text, re-runs after a
+flashcard_embedding reset and the per-card embedding path reuse each other's
+work. The cache is only used when its model matches the client's.
+
+The checkpoint is saved only after a page is written, so a crashed run resumes
+at the first page that was not fully stored. Memory stays at two pages, so the
+catalog size does not matter.
+"""
+import asyncio
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+import logging
+
+from pymongo.errors import PyMongoError
+
+from database.connection import db_manager
+from core.pagination import Page, encode_cursor
+from utils.rate_limit import TokenBucket
+from repositories.flashcard_repository import FlashcardRepository
+from services.embedding_client import (
+    EmbeddingClient,
+    EmbeddingInvalidInputError,
+    EmbeddingUnavailableError,
+)
+from services.embedding_cache import EmbeddingCache
+from services.embedding_text import build_embedding_text, embedding_content_hash, embedding_is_current
+
+logger = logging.getLogger(__name__)
+
+CHECKPOINT_COLLECTION = "backfill_checkpoints"
+
+# Backfill modes
+MISSING = "missing"
+STALE = "stale"
+
+# Task type of card vectors (the cache key includes it)
+TASK_TYPE = "retrieval_document"
+
+
+@dataclass
+class BackfillStats:
+    """Progress of one backfill run (processed = cards scanned)"""
+    total: int = 0
+    processed: int = 0
+    skipped: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    api_calls: int = 0
+    cache_hits: int = 0
+    started_at: float = field(default_factory=time.monotonic)
+    failed_qr_ids: List[str] = field(default_factory=list)
+
+    @property
+    def rate(self) -> float:
+        """Cards per second since the start"""
+        elapsed = time.monotonic() - self.started_at
+        return self.processed / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def eta_seconds(self) -> Optional[float]:
+        remaining = max(self.total - self.processed, 0)
+        return remaining / self.rate if self.rate else None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "total": self.total,
+            "processed": self.processed,
+            "skipped": self.skipped,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "api_calls": self.api_calls,
+            "cache_hits": self.cache_hits,
+            "cards_per_second": round(self.rate, 2),
+            "eta_seconds": round(self.eta_seconds) if self.eta_seconds is not None else None,
+        }
+
+
+class EmbeddingBackfill:
+    """
+    Generates missing (or stale) flashcard embeddings at a controlled rate
+
+    Args:
+        flashcard_repo: Source and destination of the cards
+        client: Embedding client (its pool should allow `concurrency` threads)
+        mode: MISSING or STALE
+        page_size: Cards per page / per bulk_write
+        chunk_size: Texts per embed_content call
+        concurrency: Embedding calls in flight
+        requests_per_second: Token-bucket rate of embedding calls
+        checkpoint_name: Checkpoint document id (None disables checkpoints)
+        on_progress: Awaited after every page with the current stats
+        max_failed_ids: Failed qr_ids kept in stats (counting continues beyond)
+        cache: Embedding cache to read and fill (None disables it)
+    """
+
+    def __init__(
+        self,
+        flashcard_repo: FlashcardRepository,
+        client: EmbeddingClient,
+        mode: str = MISSING,
+        page_size: int = 200,
+        chunk_size: int = 20,
+        concurrency: int = 4,
+        requests_per_second: float = 10.0,
+        checkpoint_name: Optional[str] = "flashcard_embeddings",
+        on_progress: Optional[Callable[[BackfillStats], Awaitable[None]]] = None,
+        max_failed_ids: int = 1000,
+        cache: Optional[EmbeddingCache] = None
+    ):
+        if mode not in (MISSING, STALE):
+            raise ValueError(f"Unknown backfill mode: {mode}")
+        self.flashcard_repo = flashcard_repo
+        self.client = client
+        self.mode = mode
+        self.model = client.model
+        self.page_size = page_size
+        self.chunk_size = chunk_size
+        self.requests_per_second = requests_per_second
+        self.checkpoint_name = checkpoint_name
+        self.on_progress = on_progress
+        self.max_failed_ids = max_failed_ids
+        if cache is not None and cache.model != self.model:
+            logger.warning(f"[Backfill] Cache model {cache.model} != {self.model}; not using the cache")
+            cache = None
+        self.cache = cache
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._bucket = TokenBucket(rate=requests_per_second, capacity=max(1.0, requests_per_second))
+        self.stats = BackfillStats()
+
+    # ========== Checkpoint ==========
+
+    async def load_checkpoint(self) -> Optional[str]:
+        if not self.checkpoint_name:
+            return None
+        doc = await db_manager.get_collection(CHECKPOINT_COLLECTION).find_one({"_id": self.checkpoint_name})
+        return doc.get("cursor") if doc else None
+
+    async def save_checkpoint(self, cursor: Optional[str]) -> None:
+        if not self.checkpoint_name:
+            return
+        try:
+            await db_manager.get_collection(CHECKPOINT_COLLECTION).update_one(
+                {"_id": self.checkpoint_name},
+                {"$set": {"cursor": cursor, "stats": self.stats.to_dict(), "updated_at": datetime.utcnow()}},
+                upsert=True
+            )
+        except PyMongoError as e:
+            logger.warning(f"[Backfill] Could not save checkpoint: {e}")
+
+    async def clear_checkpoint(self) -> None:
+        if self.checkpoint_name:
+            await db_manager.get_collection(CHECKPOINT_COLLECTION).delete_one({"_id": self.checkpoint_name})
+
+    # ========== Embedding ==========
+
+    async def _call(self, content: Any) -> Any:
+        await self._bucket.acquire()
+        async with self._semaphore:
+            self.stats.api_calls += 1
+            return await self.client.embed(content, task_type=TASK_TYPE)
+
+    async def _embed_chunk(self, cards: List[Dict[str, Any]], texts: List[str]) -> Dict[str, List[float]]:
+        """Embed one chunk, serving what it can from the cache and storing the rest"""
+        if self.cache is None:
+            return await self._embed_uncached(cards, texts)
+
+        cached = await self.cache.get_many(texts, TASK_TYPE)
+        results = {card["qr_id"]: cached[text] for card, text in zip(cards, texts) if text in cached}
+        self.stats.cache_hits += len(results)
+        # Identical texts are embedded once, through their first card
+        misses: Dict[str, List[Dict[str, Any]]] = {}
+        for card, text in zip(cards, texts):
+            if text not in cached:
+                misses.setdefault(text, []).append(card)
+        if not misses:
+            return results
+
+        computed = await self._embed_uncached([group[0] for group in misses.values()], list(misses))
+        vectors: Dict[str, List[float]] = {}
+        for text, group in misses.items():
+            vector = computed.get(group[0]["qr_id"])
+            if vector is None:
+                self._record_failures([card["qr_id"] for card in group[1:]])
+                continue
+            vectors[text] = vector
+            results.update((card["qr_id"], vector) for card in group)
+        await self.cache.store_many(vectors, TASK_TYPE)
+        return results
+
+    async def _embed_uncached(self, cards: List[Dict[str, Any]], texts: List[str]) -> Dict[str, List[float]]:
+        """Embed one chunk; if the API rejects its input, retry its cards one by one"""
+        try:
+            vectors = await self._call(texts)
+            return {card["qr_id"]: vector for card, vector in zip(cards, vectors) if vector}
+        except EmbeddingInvalidInputError as e:
+            if len(cards) == 1:
+                self._record_failures([cards[0]["qr_id"]], e)
+                return {}
+            logger.warning(f"[Backfill] Chunk of {len(cards)} rejected ({e}); retrying cards one by one")
+        except EmbeddingUnavailableError as e:
+            # Overload, timeout or upstream error: retrying card by card would
+            # only add load; a resumed run picks them up
+            self._record_failures([card["qr_id"] for card in cards], e)
+            return {}
+
+        results: Dict[str, List[float]] = {}
+
+        async def _single(card: Dict[str, Any], text: str) -> None:
+            try:
+                vector = await self._call(text)
+                if vector:
+                    results[card["qr_id"]] = vector
+            except EmbeddingUnavailableError as e:
+                self._record_failures([card["qr_id"]], e)
+
+        await asyncio.gather(*(_single(card, text) for card, text in zip(cards, texts)))
+        return results
+
+    def _record_failures(self, qr_ids: List[str], error: Any = None) -> None:
+        self.stats.failed += len(qr_ids)
+        room = self.max_failed_ids - len(self.stats.failed_qr_ids)
+        self.stats.failed_qr_ids.extend(qr_ids[:max(room, 0)])
+        if error is not None:
+            logger.warning(f"[Backfill] {len(qr_ids)} card(s) failed: {error}")
+
+    async def _process_page(self, cards: List[Dict[str, Any]]) -> None:
+        scanned = len(cards)
+        cards = [card for card in cards if card.get("qr_id")]
+        if self.mode == STALE:
+            cards = [card for card in cards if not embedding_is_current(card, self.model)]
+            self.stats.skipped += scanned - len(cards)
+        texts = {card["qr_id"]: build_embedding_text(card) for card in cards}
+
+        chunks = [cards[i:i + self.chunk_size] for i in range(0, len(cards), self.chunk_size)]
+        embeddings: Dict[str, Tuple[List[float], str]] = {}
+        results = await asyncio.gather(*(
+            self._embed_chunk(chunk, [texts[card["qr_id"]] for card in chunk]) for chunk in chunks
+        ))
+        for result in results:
+            for qr_id, vector in result.items():
+                embeddings[qr_id] = (vector, embedding_content_hash(texts[qr_id]))
+
+        modified, write_failures = await self.flashcard_repo.bulk_update_embeddings(embeddings, self.model)
+        if write_failures:
+            self._record_failures(write_failures, "bulk write error")
+        self.stats.succeeded += len(embeddings) - len(write_failures)
+        self.stats.processed += scanned
+
+    async def _fetch_page(self, after: Optional[str]) -> Page:
+        if self.mode == STALE:
+            return await self.flashcard_repo.get_embedding_sources_page(self.page_size, after)
+        return await self.flashcard_repo.get_flashcards_without_embedding_page(self.page_size, after)
+
+    async def _count(self) -> int:
+        if self.mode == STALE:
+            return await self.flashcard_repo.count({})
+        return await self.flashcard_repo.count_without_embedding()
+
+    # ========== Run ==========
+
+    async def run(self, resume: bool = True, limit: Optional[int] = None) -> BackfillStats:
+        """
+        Embed every card lacking an (up-to-date) embedding
+
+        `limit` caps the cards scanned (in STALE mode most are skipped).
+
+        Args:
+            resume: Continue from the stored checkpoint (False starts over)
+            limit: Stop after this many cards
+        """
+        cursor = await self.load_checkpoint() if resume else None
+        if not resume:
+            await self.clear_checkpoint()
+        total = await self._count()
+        self.stats = BackfillStats(total=min(total, limit) if limit else total)
+        logger.info(f"🚀 [Backfill] {self.mode}: {total} cards to scan (resume={'yes' if cursor else 'no'})")
+
+        exhausted = False  # Reached the end of the collection
+        page_task = asyncio.create_task(self._fetch_page(cursor))
+        try:
+            while True:
+                page = await page_task
+                items = page.items
+                if limit is not None:
+                    items = items[:max(limit - self.stats.processed, 0)]
+                if not items:
+                    exhausted = not page.items
+                    break
+
+                if len(items) < len(page.items):
+                    # Cut short by limit: resume right after the last processed card
+                    next_cursor = encode_cursor(items[-1]["_id"], items[-1]["_id"])
+                else:
+                    next_cursor = page.next_cursor
+                more = next_cursor is not None and (limit is None or self.stats.processed + len(items) < limit)
+                # Prefetch the next page while this one is embedded
+                if more:
+                    page_task = asyncio.create_task(self._fetch_page(next_cursor))
+                await self._process_page(items)
+                await self.save_checkpoint(next_cursor)
+                if self.on_progress:
+                    await self.on_progress(self.stats)
+                if next_cursor is None:
+                    exhausted = True
+                if not more:
+                    break
+        finally:
+            if not page_task.done():
+                page_task.cancel()
+
+        if self.stats.failed == 0 and exhausted:
+            await self.clear_checkpoint()  # Complete: the next run starts from the beginning
+        return self.stats
@@ -0,0 +1,168 @@
+"""
+Embedding Batcher - micro-batching of concurrent embedding requests
+
+When a class uses the chatbot at the same time, each /chat/rag request needs a
+query embedding. The batcher holds requests for a few milliseconds (or until
+the batch is full), sends them as one batch embed_content call, and hands each
+waiting coroutine its own vector. Identical texts in a window share one input.
+
+If the API rejects the batch as an invalid argument, every input is retried
+alone, so one bad input only fails its own caller. Any other error (overload,
+timeout, 5xx) is not retried and fails the whole batch.
+"""
+import asyncio
+from typing import Any, Dict, List, Optional, Set, Tuple
+import logging
+
+from settings import settings
+from utils.metrics import Histogram, metrics_registry
+from services.embedding_client import (
+    EmbeddingClient,
+    EmbeddingInvalidInputError,
+    EmbeddingUnavailableError,
+    embedding_client,
+)
+
+logger = logging.getLogger(__name__)
+
+_SIZE_BUCKETS = [1, 2, 4, 8, 16, 32, 64, 100]
+
+
+class EmbeddingBatcher:
+    """
+    Collects embed() calls for one task type into batched client calls
+
+    Usage:
+        vector = await query_batcher.embed("con mèo tiếng Anh là gì?")
+    """
+
+    def __init__(
+        self,
+        client: EmbeddingClient,
+        task_type: str,
+        window_ms: float = 5.0,
+        max_batch_size: int = 32
+    ):
+        self.client = client
+        self.task_type = task_type
+        self.window_seconds = window_ms / 1000
+        self.max_batch_size = max_batch_size
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._tasks: Set[asyncio.Task] = set()
+        self.queue_depth = Histogram(_SIZE_BUCKETS)
+        self.batch_sizes = Histogram(_SIZE_BUCKETS)
+        self.requests = 0
+        self.batches = 0
+        self.deduplicated = 0
+        self.split_batches = 0
+        self.failed_inputs = 0
+
+    async def embed(self, text: str) -> List[float]:
+        """
+        Embed one text as part of the current batch
+
+        Raises:
+            EmbeddingUnavailableError: The call for this input failed
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((text, future))
+        self.requests += 1
+        self.queue_depth.record(len(self._pending))
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.window_seconds, self._flush)
+        return await future
+
+    def _flush(self) -> None:
+        """Send everything pending as one batch (timer or full batch)"""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        task = asyncio.get_running_loop().create_task(self._run_batch(batch))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run_batch(self, batch: List[Tuple[str, asyncio.Future]]) -> None:
+        # Callers cancelled while waiting need no vector; equal texts share one input
+        waiters: Dict[str, List[asyncio.Future]] = {}
+        for text, future in batch:
+            if not future.done():
+                waiters.setdefault(text, []).append(future)
+        if not waiters:
+            return
+        texts = list(waiters)
+        self.deduplicated += sum(len(f) for f in waiters.values()) - len(texts)
+        self.batches += 1
+        self.batch_sizes.record(len(texts))
+
+        try:
+            vectors = await self.client.embed(texts, task_type=self.task_type)
+        except EmbeddingInvalidInputError as e:
+            if len(texts) == 1:
+                self._fail(waiters[texts[0]], e)
+                return
+            # Isolate the failing input(s): retry each one on its own
+            self.split_batches += 1
+            logger.warning(f"[Embedding] Batch of {len(texts)} rejected ({e}); retrying inputs one by one")
+            await asyncio.gather(*(self._run_single(text, waiters[text]) for text in texts))
+            return
+        except EmbeddingUnavailableError as e:
+            # Overload, timeout or upstream error: per-input retries would only add load
+            for futures in waiters.values():
+                self._fail(futures, e)
+            return
+
+        for text, vector in zip(texts, vectors):
+            self._resolve(waiters[text], vector)
+
+    async def _run_single(self, text: str, futures: List[asyncio.Future]) -> None:
+        try:
+            vector = await self.client.embed(text, task_type=self.task_type)
+        except EmbeddingUnavailableError as e:
+            self._fail(futures, e)
+        else:
+            self._resolve(futures, vector)
+
+    @staticmethod
+    def _resolve(futures: List[asyncio.Future], vector: Any) -> None:
+        for future in futures:
+            if not future.done():
+                future.set_result(vector)
+
+    def _fail(self, futures: List[asyncio.Future], error: Exception) -> None:
+        for future in futures:
+            if not future.done():
+                self.failed_inputs += 1
+                future.set_exception(error)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "task_type": self.task_type,
+            "window_ms": self.window_seconds * 1000,
+            "max_batch_size": self.max_batch_size,
+            "requests": self.requests,
+            "batches": self.batches,
+            "calls_saved": self.requests - self.batches,
+            "deduplicated": self.deduplicated,
+            "split_batches": self.split_batches,
+            "failed_inputs": self.failed_inputs,
+            "queue_depth": self.queue_depth.snapshot(),
+            "batch_size": self.batch_sizes.snapshot(),
+        }
+
+
+# ========== Singleton Instance ==========
+query_embedding_batcher = EmbeddingBatcher(
+    embedding_client,
+    task_type="retrieval_query",
+    window_ms=settings.EMBEDDING_BATCH_WINDOW_MS,
+    max_batch_size=settings.EMBEDDING_BATCH_MAX_SIZE
+)
+metrics_registry.register("query_embedding_batcher", query_embedding_batcher.snapshot)
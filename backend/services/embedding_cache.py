@@ -0,0 +1,235 @@
+"""
+Embedding Cache - content-addressed, two tiers
+
+Embeddings are a pure function of (model, task_type, text), so they are cached
+under a hash of those three, with the text normalized (Unicode NFC, case-folded,
+whitespace collapsed):
+
+1. Per-worker LRU (utils.cache.TTLCache) holding float32 arrays; concurrent
+   misses for the same key share one lookup.
+2. MongoDB `embedding_cache` collection shared by all workers and scripts,
+   bounded by a TTL and by a document cap (the oldest entries are pruned at
+   startup and after every PRUNE_EVERY stored vectors).
+
+Bulk callers (the embedding backfill) use get_many() / store_many(): one
+MongoDB round trip per chunk of texts, and they do not fill the per-worker LRU
+so a catalog scan cannot evict the hot query vectors.
+
+Changing EMBEDDING_MODEL changes every key, so stale vectors are never served;
+purge_other_models() (run at startup) deletes them from MongoDB.
+"""
+import hashlib
+import re
+import unicodedata
+from array import array
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+import logging
+
+from pymongo.errors import PyMongoError
+
+from settings import settings
+from utils.cache import TTLCache
+from utils.metrics import metrics_registry
+from repositories.embedding_cache_repository import (
+    EmbeddingCacheRepository,
+    get_embedding_cache_repository,
+)
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r"\s+")
+
+# Stored vectors between two prunes of the MongoDB tier (per process)
+PRUNE_EVERY = 1000
+
+
+def normalize_text(text: str) -> str:
+    """Canonical form used for cache keys"""
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFC", text)).strip().casefold()
+
+
+def embedding_cache_key(model: str, task_type: str, text: str) -> str:
+    payload = "\x1f".join([model, task_type, normalize_text(text)])
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=20).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    Two-tier embedding cache
+
+    Usage:
+        vector = await embedding_cache.get_or_compute(
+            text, "retrieval_query", lambda: client.embed(text, "retrieval_query")
+        )
+    """
+
+    def __init__(
+        self,
+        model: str,
+        max_size: int = 5000,
+        ttl_seconds: float = 86400.0,
+        store_max_size: int = 0
+    ):
+        self.model = model
+        self.store_max_size = store_max_size
+        self._stored_since_prune = 0
+        self.memory = TTLCache(name="embeddings", max_size=max_size, ttl_seconds=ttl_seconds)
+        self._repo: Optional[EmbeddingCacheRepository] = None
+        self.store_hits = 0
+        self.store_misses = 0
+        self.store_errors = 0
+        self.computed = 0
+        self.pruned = 0
+
+    @property
+    def repo(self) -> EmbeddingCacheRepository:
+        # Created on first use, after the worker's client exists
+        if self._repo is None:
+            self._repo = get_embedding_cache_repository()
+        return self._repo
+
+    async def get_or_compute(
+        self,
+        text: str,
+        task_type: str,
+        compute: Callable[[], Awaitable[List[float]]]
+    ) -> List[float]:
+        """
+        Return the cached vector for text, computing (and storing) it on a miss
+
+        Errors of `compute` propagate and nothing is cached.
+        """
+        key = embedding_cache_key(self.model, task_type, text)
+        vector = await self.memory.get_or_load(
+            key, lambda: self._load(key, task_type, compute)
+        )
+        return vector.tolist() if vector is not None else []
+
+    async def _load(
+        self,
+        key: str,
+        task_type: str,
+        compute: Callable[[], Awaitable[List[float]]]
+    ) -> Optional[array]:
+        try:
+            stored = await self.repo.get_vector(key)
+        except PyMongoError as e:
+            self.store_errors += 1
+            logger.warning(f"[EmbeddingCache] Lookup failed: {e}")
+            stored = None
+        if stored is not None:
+            self.store_hits += 1
+            return stored
+
+        self.store_misses += 1
+        vector = await compute()
+        self.computed += 1
+        if not vector:
+            return None
+        try:
+            await self.repo.save_vector(key, self.model, task_type, vector)
+            await self._stored(1)
+        except PyMongoError as e:
+            self.store_errors += 1
+            logger.warning(f"[EmbeddingCache] Store failed: {e}")
+        return array("f", vector)
+
+    async def get_many(self, texts: List[str], task_type: str) -> Dict[str, List[float]]:
+        """
+        Cached vectors for many texts (memory tier, then one MongoDB query)
+
+        Texts without a cached vector are absent from the result; a failed
+        lookup counts as a miss for all of them.
+        """
+        found: Dict[str, List[float]] = {}
+        pending: Dict[str, List[str]] = {}
+        for text in texts:
+            if text in found:
+                continue
+            key = embedding_cache_key(self.model, task_type, text)
+            vector = self.memory.get(key)
+            if vector is not None:
+                found[text] = vector.tolist()
+            else:
+                pending.setdefault(key, []).append(text)
+        if not pending:
+            return found
+
+        try:
+            stored = await self.repo.get_vectors(pending.keys())
+        except PyMongoError as e:
+            self.store_errors += 1
+            logger.warning(f"[EmbeddingCache] Bulk lookup failed: {e}")
+            stored = {}
+        self.store_hits += len(stored)
+        self.store_misses += len(pending) - len(stored)
+        for key, vector in stored.items():
+            for text in pending[key]:
+                found[text] = vector.tolist()
+        return found
+
+    async def store_many(self, vectors: Dict[str, List[float]], task_type: str) -> None:
+        """Store freshly computed vectors by text (errors are logged, never raised)"""
+        by_key = {
+            embedding_cache_key(self.model, task_type, text): vector
+            for text, vector in vectors.items() if vector
+        }
+        self.computed += len(by_key)
+        try:
+            await self.repo.save_vectors(self.model, task_type, by_key)
+            await self._stored(len(by_key))
+        except PyMongoError as e:
+            self.store_errors += 1
+            logger.warning(f"[EmbeddingCache] Bulk store failed: {e}")
+
+    async def _stored(self, count: int) -> None:
+        self._stored_since_prune += count
+        if self._stored_since_prune >= PRUNE_EVERY:
+            self._stored_since_prune = 0
+            try:
+                await self.prune()
+            except PyMongoError as e:
+                self.store_errors += 1
+                logger.warning(f"[EmbeddingCache] Prune failed: {e}")
+
+    async def prune(self) -> int:
+        """Delete the oldest stored vectors beyond store_max_size (0 = no cap)"""
+        if not self.store_max_size:
+            return 0
+        deleted = await self.repo.prune_oldest(self.store_max_size)
+        if deleted:
+            self.pruned += deleted
+            logger.info(f"🧹 [EmbeddingCache] Pruned {deleted} oldest vectors (cap {self.store_max_size})")
+        return deleted
+
+    async def purge_other_models(self) -> int:
+        """Delete stored vectors of previous embedding models (startup)"""
+        deleted = await self.repo.delete_other_models(self.model)
+        if deleted:
+            logger.info(f"🧹 [EmbeddingCache] Removed {deleted} vectors of other models")
+        return deleted
+
+    def snapshot(self) -> Dict[str, Any]:
+        memory = self.memory.snapshot()
+        lookups = memory["hits"] + memory["misses"]
+        hits = memory["hits"] + self.store_hits
+        return {
+            "model": self.model,
+            "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+            "memory": memory,
+            "store_hits": self.store_hits,
+            "store_misses": self.store_misses,
+            "store_errors": self.store_errors,
+            "computed": self.computed,
+            "pruned": self.pruned,
+        }
+
+
+# ========== Singleton Instance ==========
+embedding_cache = EmbeddingCache(
+    model=settings.EMBEDDING_MODEL,
+    max_size=settings.EMBEDDING_CACHE_MAX_SIZE,
+    ttl_seconds=settings.EMBEDDING_CACHE_MEMORY_TTL_SECONDS,
+    store_max_size=settings.EMBEDDING_CACHE_MONGO_MAX_SIZE
+)
+metrics_registry.register("embedding_cache", embedding_cache.snapshot)
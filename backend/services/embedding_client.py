@@ -0,0 +1,214 @@
+"""
+Embedding Client - Gemini embeddings off the event loop
+
+google.generativeai only offers a blocking embed_content(). Calls run on a
+small dedicated thread pool, so a slow Gemini response only occupies a pool
+thread and never the worker's event loop (AR scans keep being served).
+
+- Bounded: at most EMBEDDING_MAX_PENDING calls queued or running; beyond that
+  callers fail fast instead of piling up behind a slow upstream. A call
+  counts until its pool thread is done, even if its caller stopped waiting.
+- Timeouts: the HTTP request carries EMBEDDING_TIMEOUT_SECONDS, and the caller
+  stops waiting after the same time plus a small grace period.
+- Errors are classified: 429 / 5xx / deadline errors raise
+  EmbeddingOverloadedError, an invalid argument raises
+  EmbeddingInvalidInputError; only the latter is worth retrying per input.
+- Cancellation: a cancelled caller returns immediately; a call that has not
+  started yet is dropped from the pool queue, a running one finishes in its
+  thread and its result is discarded.
+"""
+import asyncio
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional
+import logging
+
+import google.generativeai as genai
+from google.api_core import exceptions as google_exceptions
+
+from settings import settings
+from utils.metrics import LatencyStats, metrics_registry
+
+logger = logging.getLogger(__name__)
+
+# Extra wait on top of the HTTP timeout before the caller gives up
+_TIMEOUT_GRACE_SECONDS = 1.0
+
+
+class EmbeddingUnavailableError(RuntimeError):
+    """Raised when an embedding call is rejected, times out or fails"""
+
+
+class EmbeddingOverloadedError(EmbeddingUnavailableError):
+    """Rejected or timed out: upstream is slow, retrying right away won't help"""
+
+
+class EmbeddingInvalidInputError(EmbeddingUnavailableError):
+    """The API rejected the input (invalid argument): other inputs may still succeed"""
+
+
+# Upstream rate limits, server errors and deadlines
+_OVERLOAD_ERRORS = (
+    google_exceptions.TooManyRequests,
+    google_exceptions.ResourceExhausted,
+    google_exceptions.ServerError,
+    google_exceptions.DeadlineExceeded,
+    google_exceptions.RetryError,
+    TimeoutError,
+)
+_INVALID_INPUT_ERRORS = (
+    google_exceptions.InvalidArgument,
+    google_exceptions.BadRequest,
+)
+
+
+def _classify_error(error: Exception) -> EmbeddingUnavailableError:
+    """Map an exception raised by embed_content to the client's error types"""
+    if isinstance(error, _OVERLOAD_ERRORS):
+        return EmbeddingOverloadedError(str(error))
+    if isinstance(error, _INVALID_INPUT_ERRORS):
+        return EmbeddingInvalidInputError(str(error))
+    return EmbeddingUnavailableError(str(error))
+
+
+class EmbeddingClient:
+    """
+    Async facade over genai.embed_content with a bounded thread pool
+
+    The pool is created on first use, so nothing is started before gunicorn forks.
+    """
+
+    def __init__(
+        self,
+        model: str,
+        max_workers: int = 4,
+        max_pending: int = 64,
+        timeout_seconds: float = 10.0
+    ):
+        self.model = model
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.timeout_seconds = timeout_seconds
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self.timings = LatencyStats()
+        self._in_flight_lock = threading.Lock()  # Released from pool threads
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.calls = 0
+        self.rejected = 0
+        self.timeouts = 0
+        self.cancelled = 0
+        self.errors = 0
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.max_workers,
+                thread_name_prefix="embedding"
+            )
+        return self._executor
+
+    def _embed_blocking(self, content: Any, task_type: str, timeout: float) -> Any:
+        """Runs in a pool thread"""
+        result = genai.embed_content(
+            model=self.model,
+            content=content,
+            task_type=task_type,
+            request_options={"timeout": timeout}
+        )
+        return result["embedding"]
+
+    def _release(self, _: Future) -> None:
+        """Done callback of a pool call (runs in the pool thread, or on cancel)"""
+        with self._in_flight_lock:
+            self.in_flight -= 1
+
+    async def embed(
+        self,
+        content: Any,
+        task_type: str,
+        timeout: Optional[float] = None
+    ) -> Any:
+        """
+        Embed a text (or a list of texts) without blocking the event loop
+
+        Args:
+            content: Text, or list of texts (returns one vector per text)
+            task_type: Gemini task type (retrieval_document, retrieval_query, ...)
+            timeout: Per-call timeout in seconds (default EMBEDDING_TIMEOUT_SECONDS)
+
+        Returns:
+            The embedding vector (or list of vectors)
+
+        Raises:
+            EmbeddingOverloadedError: Pool saturated, timeout, 429 or 5xx
+            EmbeddingInvalidInputError: The API rejected the input
+            EmbeddingUnavailableError: Any other API error
+        """
+        if self.in_flight >= self.max_pending:
+            self.rejected += 1
+            raise EmbeddingOverloadedError(f"{self.in_flight} embedding calls pending")
+
+        timeout = timeout or self.timeout_seconds
+        loop = asyncio.get_running_loop()
+        self.calls += 1
+        with self._in_flight_lock:
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        started = time.perf_counter()
+        # A timed-out or cancelled caller returns before a running call ends:
+        # the slot is released when the pool is actually done with it
+        try:
+            call = self.executor.submit(self._embed_blocking, content, task_type, timeout)
+        except RuntimeError as e:
+            # Pool shut down (lifespan shutdown in progress)
+            with self._in_flight_lock:
+                self.in_flight -= 1
+            raise EmbeddingUnavailableError(str(e)) from e
+        call.add_done_callback(self._release)
+        future = asyncio.wrap_future(call, loop=loop)
+        try:
+            return await asyncio.wait_for(future, timeout + _TIMEOUT_GRACE_SECONDS)
+        except asyncio.TimeoutError:
+            self.timeouts += 1
+            raise EmbeddingOverloadedError(f"embedding timed out after {timeout}s")
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        except Exception as e:
+            self.errors += 1
+            raise _classify_error(e) from e
+        finally:
+            self.timings.record(task_type, (time.perf_counter() - started) * 1000)
+
+    def shutdown(self) -> None:
+        """Drop queued calls and release the pool threads (lifespan shutdown)"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "max_workers": self.max_workers,
+            "max_pending": self.max_pending,
+            "calls": self.calls,
+            "rejected": self.rejected,
+            "timeouts": self.timeouts,
+            "cancelled": self.cancelled,
+            "errors": self.errors,
+            "latency": self.timings.snapshot(),
+        }
+
+
+# ========== Singleton Instance ==========
+embedding_client = EmbeddingClient(
+    model=settings.EMBEDDING_MODEL,
+    max_workers=settings.EMBEDDING_MAX_WORKERS,
+    max_pending=settings.EMBEDDING_MAX_PENDING,
+    timeout_seconds=settings.EMBEDDING_TIMEOUT_SECONDS
+)
+metrics_registry.register("embeddings", embedding_client.snapshot)
@@ -0,0 +1,51 @@
+"""
+Embedding Text - the single definition of what is embedded for a flashcard
+
+Every writer of vector_embedding (card creation, the backfill script, batch
+embed jobs, the reconciler) builds its input here and stores, next to the
+vector:
+
+- embedding_hash: hash of the exact text that was embedded
+- embedding_model: model that produced the vector
+
+A card's embedding is current when both still match; otherwise only the
+word, translation or definition changed (or the model did) and the card
+needs a new vector.
+"""
+import hashlib
+from typing import Any, Dict
+
+# Flashcard fields the embedding text is built from
+EMBEDDING_SOURCE_FIELDS = ("word", "translation", "definition")
+
+
+def build_embedding_text(flashcard: Dict[str, Any]) -> str:
+    """
+    Text embedded for a flashcard: word, translations (sorted by language)
+    and definition, e.g. "Word: apple. EN: apple. VI: quả táo. Definition: ..."
+    """
+    parts = [f"Word: {flashcard.get('word', '')}"]
+
+    translation = flashcard.get("translation") or {}
+    if isinstance(translation, dict):
+        for lang in sorted(translation):
+            if translation[lang]:
+                parts.append(f"{lang.upper()}: {translation[lang]}")
+
+    definition = flashcard.get("definition")
+    if definition:
+        parts.append(f"Definition: {definition}")
+
+    return ". ".join(parts)
+
+
+def embedding_content_hash(text: str) -> str:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def embedding_is_current(flashcard: Dict[str, Any], model: str) -> bool:
+    """True when the stored vector was built by `model` from the card's current text"""
+    return (
+        flashcard.get("embedding_model") == model
+        and flashcard.get("embedding_hash") == embedding_content_hash(build_embedding_text(flashcard))
+    )
@@ -6,11 +6,24 @@ Includes AI-powered auto-embedding generation
 from typing import Optional, List, Dict, Any
 import logging
 
-from repositories.flashcard_repository import FlashcardRepository, get_flashcard_repository
+from settings import settings
+from core.pagination import Page
+from repositories.flashcard_repository import (
+    FlashcardRepository,
+    get_flashcard_repository,
+    EMBEDDING_SOURCE_PROJECTION,
+)
 from services.ai_service import AIService, get_ai_service
+from services.embedding_backfill import MISSING, STALE, BackfillStats, EmbeddingBackfill
+from services.embedding_client import EmbeddingUnavailableError
+from services.embedding_text import build_embedding_text, embedding_content_hash
+from services.job_runner import ProgressReporter, job_runner
+from utils.invalidation import InvalidationEvent, invalidation_bus
 
 logger = logging.getLogger(__name__)
 
+BATCH_EMBED_JOB = "batch_embed"
+
 
 class FlashcardService:
     """Service handling flashcard business logic with AI embedding"""
@@ -21,40 +34,49 @@ class FlashcardService:
         ai_service: Optional[AIService] = None
     ):
         self.flashcard_repo = flashcard_repo
-        self.ai_service = ai_service
+        self._ai_service = ai_service
+    
+    @property
+    def ai_service(self) -> AIService:
+        """Resolved on first use: read-only routes never touch the AI client"""
+        if self._ai_service is None:
+            self._ai_service = get_ai_service()
+        return self._ai_service
     
     async def get_by_qr_id(self, qr_id: str) -> Optional[Dict[str, Any]]:
         """Get flashcard by QR ID"""
         return await self.flashcard_repo.get_by_qr_id(qr_id)
     
-    async def get_by_category(self, category: str) -> List[Dict[str, Any]]:
-        """Get flashcards by category"""
-        return await self.flashcard_repo.get_by_category(category)
+    async def get_by_category(
+        self,
+        category: str,
+        skip: int = 0,
+        limit: int = 50,
+        after: Optional[str] = None
+    ) -> Page:
+        """Get flashcards by category (keyset pagination via `after`)"""
+        return await self.flashcard_repo.get_by_category(category, skip, limit, after)
     
     async def search(self, query: str) -> List[Dict[str, Any]]:
         """Search flashcards by word"""
         return await self.flashcard_repo.search_by_word(query)
     
-    def _build_embedding_text(self, flashcard_data: Dict[str, Any]) -> str:
+    def _publish_change(
+        self,
+        operation: str,
+        qr_id: Optional[str],
+        updated_fields: Optional[List[str]] = None
+    ) -> None:
         """
-        Build text for embedding generation from flashcard data.
-        Combines word, translations, and definition for rich semantic context.
+        Invalidate this worker's caches right away; other workers are
+        notified by the change-stream watcher
         """
-        word = flashcard_data.get('word', '')
-        definition = flashcard_data.get('definition', '')
-        translation = flashcard_data.get('translation', {})
-        
-        # Build embedding text
-        parts = [f"Word: {word}"]
-        
-        if translation:
-            for lang, trans in translation.items():
-                parts.append(f"{lang.upper()}: {trans}")
-        
-        if definition:
-            parts.append(f"Definition: {definition}")
-        
-        return ". ".join(parts)
+        invalidation_bus.publish(InvalidationEvent(
+            collection="flashcards",
+            operation=operation,
+            keys={"qr_id": qr_id} if qr_id else {},
+            updated_fields=updated_fields
+        ))
     
     async def create_with_embedding(
         self, 
@@ -70,7 +92,7 @@ class FlashcardService:
             Created flashcard with embedding
         """
         # Generate embedding text
-        embedding_text = self._build_embedding_text(flashcard_data)
+        embedding_text = build_embedding_text(flashcard_data)
         logger.info(f"[Flashcard] Generating embedding for: {flashcard_data.get('word')}")
         
         # Generate embedding using AI service
@@ -82,12 +104,15 @@ class FlashcardService:
             except Exception as e:
                 logger.error(f"[Flashcard] Embedding generation failed: {e}")
         
-        # Add embedding to flashcard data
+        # Add embedding to flashcard data (hash + model let the reconciler spot stale vectors)
         if embedding:
             flashcard_data['vector_embedding'] = embedding
+            flashcard_data['embedding_hash'] = embedding_content_hash(embedding_text)
+            flashcard_data['embedding_model'] = settings.EMBEDDING_MODEL
         
         # Insert into database
         result = await self.flashcard_repo.create(flashcard_data)
+        self._publish_change("insert", flashcard_data.get('qr_id'))
         
         return result
     
@@ -101,48 +126,89 @@ class FlashcardService:
         Returns:
             True if successful
         """
-        flashcard = await self.flashcard_repo.get_by_qr_id(qr_id)
+        flashcard = await self.flashcard_repo.get_by_qr_id(
+            qr_id, projection=EMBEDDING_SOURCE_PROJECTION
+        )
         if not flashcard:
             return False
         
-        embedding_text = self._build_embedding_text(flashcard)
+        embedding_text = build_embedding_text(flashcard)
         
         if self.ai_service:
             embedding = await self.ai_service.generate_embedding(embedding_text)
             if embedding:
-                return await self.flashcard_repo.update_embedding(qr_id, embedding)
+                updated = await self.flashcard_repo.update_embedding(
+                    qr_id,
+                    embedding,
+                    embedding_content_hash(embedding_text),
+                    settings.EMBEDDING_MODEL
+                )
+                if updated:
+                    self._publish_change(
+                        "update", qr_id, ["vector_embedding", "embedding_hash", "embedding_model"]
+                    )
+                return updated
         
         return False
     
-    async def generate_embeddings_for_missing(self, limit: int = 10) -> int:
+    async def start_batch_embed_job(
+        self,
+        limit: Optional[int] = None,
+        reconcile: bool = False
+    ) -> Dict[str, Any]:
         """
-        Generate embeddings for flashcards that don't have them.
+        Enqueue a background backfill of missing embeddings
+        
+        Runs in this worker (services.job_runner); progress is stored in the
+        jobs collection. An interrupted job's successor resumes from the
+        backfill checkpoint.
         
         Args:
-            limit: Max flashcards to process per batch
+            limit: Max flashcards to process (None = all)
+            reconcile: Scan every card and re-embed only stale ones (text
+                or model changed) instead of only cards without a vector
             
         Returns:
-            Number of flashcards updated
+            The queued job document
+            
+        Raises:
+            EmbeddingUnavailableError: No embedding API key configured
+            JobAlreadyRunningError: A batch-embed job is already queued/running
         """
-        if not self.ai_service:
-            logger.warning("[Flashcard] AI service not available for batch embedding")
-            return 0
-        
-        missing = await self.flashcard_repo.get_flashcards_without_embedding(limit)
-        updated = 0
-        
-        for fc in missing:
-            qr_id = fc.get('qr_id')
-            if qr_id and await self.update_embedding(qr_id):
-                updated += 1
-                logger.info(f"[Flashcard] Updated embedding for: {qr_id}")
-        
-        return updated
+        if not settings.GOOGLE_API_KEY:
+            raise EmbeddingUnavailableError("GOOGLE_API_KEY not set")
+        embedder = self.ai_service.embedder
+        mode = STALE if reconcile else MISSING
+        
+        async def run(report: ProgressReporter) -> None:
+            async def on_progress(stats: BackfillStats) -> None:
+                await report(stats.to_dict(), stats.failed_qr_ids)
+            
+            backfill = EmbeddingBackfill(
+                flashcard_repo=self.flashcard_repo,
+                client=embedder,
+                mode=mode,
+                page_size=settings.EMBEDDING_BACKFILL_PAGE_SIZE,
+                chunk_size=settings.EMBEDDING_BACKFILL_CHUNK_SIZE,
+                concurrency=settings.BATCH_EMBED_JOB_CONCURRENCY,
+                requests_per_second=settings.EMBEDDING_BACKFILL_RPS,
+                checkpoint_name=f"{BATCH_EMBED_JOB}:{mode}",
+                on_progress=on_progress,
+                cache=self.ai_service.cache if settings.EMBEDDING_CACHE_ENABLED else None
+            )
+            stats = await backfill.run(limit=limit)
+            await on_progress(stats)
+        
+        return await job_runner.submit(BATCH_EMBED_JOB, {"limit": limit, "mode": mode}, run)
+    
+    async def get_batch_embed_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Status of a batch-embed job (answered by any worker)"""
+        job = await job_runner.get_status(job_id)
+        return job if job and job["type"] == BATCH_EMBED_JOB else None
 
 
 def get_flashcard_service() -> FlashcardService:
     """Factory function for dependency injection"""
     flashcard_repo = get_flashcard_repository()
-    ai_service = get_ai_service()
-    return FlashcardService(flashcard_repo, ai_service)
+    return FlashcardService(flashcard_repo)
 
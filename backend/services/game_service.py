@@ -3,8 +3,30 @@ Game Service - Business logic for game operations
 """
 from typing import Optional, List, Dict, Any
 
+from settings import settings
+from core.conditional import ETagRegistry
+from utils.invalidation import InvalidationEvent, invalidation_bus
+from utils.metrics import metrics_registry
 from repositories.game_repository import GameRepository, get_game_repository
 
+# Version stamps answering If-None-Match on GET /game/{qr_id} without a read.
+# Keyed by qr_id; each game_type/difficulty filter combination is a variant.
+game_etags = ETagRegistry(
+    name="game",
+    max_size=settings.ETAG_REGISTRY_MAX_SIZE,
+    ttl_seconds=settings.ETAG_REGISTRY_TTL_SECONDS
+)
+metrics_registry.register("game_etags", game_etags.snapshot)
+
+
+def _on_game_change(event: InvalidationEvent) -> None:
+    """Drop the game ETags of the affected flashcard (all of them if unknown)"""
+    moved = bool(event.updated_fields and "flashcard_qr_id" in event.updated_fields)
+    game_etags.invalidate(None if moved else event.keys.get("flashcard_qr_id"))
+
+
+invalidation_bus.subscribe(["mini_game_bank"], _on_game_change)
+
 
 class GameService:
     """Service handling game business logic"""
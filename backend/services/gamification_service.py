@@ -1,5 +1,9 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from repositories.gamification_repository import get_gamification_repository
+from services.leaderboard import leaderboard
+from services.award_buffer import award_buffer
+from settings import settings
+from core.pagination import Page
 import logging
 
 logger = logging.getLogger(__name__)
@@ -7,19 +11,61 @@ logger = logging.getLogger(__name__)
 class GamificationService:
     def __init__(self):
         self.repo = get_gamification_repository()
+        self.leaderboard = leaderboard
+        self.awards = award_buffer if settings.AWARD_BUFFER_ENABLED else None
 
     async def award_points(self, user_id: str, points: int, reason: str) -> Dict[str, Any]:
-        logger.info(f"Awarding {points} points to {user_id} for {reason}")
-        return await self.repo.update_points(user_id, points)
+        """
+        Award points to a user
+        
+        Buffered: the award is written with the next flush (within
+        AWARD_FLUSH_INTERVAL_MS) and get_user_stats already includes it.
+        
+        Returns:
+            {"user_id", "points", "pending_points"} when buffered, otherwise
+            the updated user_points document
+        """
+        logger.debug(f"Awarding {points} points to {user_id} for {reason}")
+        if self.awards is None:
+            stats = await self.repo.update_points(user_id, points)
+            self.leaderboard.apply(stats)
+            return stats
+        pending = self.awards.add(user_id, points)
+        return {"user_id": user_id, "points": points, "pending_points": pending}
 
     async def get_user_stats(self, user_id: str) -> Dict[str, Any]:
-        stats = await self.repo.get_by_user_id(user_id)
+        stats = await self._read_stats(user_id)
+        applied = stats.pop("applied_flushes", []) if stats else []
+        pending = self.awards.pending_points(user_id, applied) if self.awards else 0
         if not stats:
-            return {"total_points": 0, "level": 1, "badges": []}
+            stats = {"user_id": user_id, "total_points": 0, "level": 1, "badges": []}
+        if pending:
+            # Read-your-writes: awards still waiting in the buffer
+            stats = {**stats, "total_points": stats.get("total_points", 0) + pending}
         return stats
 
-    async def get_leaderboard(self) -> List[Dict[str, Any]]:
-        return await self.repo.get_leaderboard()
+    async def _read_stats(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Read user_points without racing a flush
+
+        A flush being written may or may not be visible to the read, so the
+        read is retried if one started or finished meanwhile.
+        """
+        if self.awards is None:
+            return await self.repo.get_by_user_id(user_id)
+        for _ in range(3):
+            await self.awards.wait_idle()
+            version = self.awards.version
+            stats = await self.repo.get_by_user_id(user_id, with_flushes=True)
+            if self.awards.version == version:
+                return stats
+        return stats
+
+    async def get_leaderboard(self, limit: int = 10, after: Optional[str] = None) -> Page:
+        return await self.leaderboard.page(limit, after)
+
+    async def get_user_rank(self, user_id: str, window: int = 3) -> Dict[str, Any]:
+        return await self.leaderboard.around(user_id, window)
 
 def get_gamification_service() -> GamificationService:
     return GamificationService()
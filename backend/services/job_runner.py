@@ -0,0 +1,216 @@
+"""
+Job Runner - worker-local executor for background jobs
+
+Long operations (e.g. embedding backfills) run as asyncio tasks in the worker
+that accepted the request; the HTTP call returns a job id right away. State
+and progress are stored in the `jobs` collection, so a status request can be
+answered by any worker.
+
+- At most JOBS_MAX_CONCURRENT jobs run per worker; others wait as "queued".
+- Exclusive jobs are enforced by a unique index (see JobRepository), not by
+  a check-then-insert, so concurrent submits on different workers are safe.
+- The owning worker refreshes each job's heartbeat; a queued/running job
+  whose heartbeat is older than JOBS_STALE_SECONDS is reported as
+  "interrupted" (its worker restarted or died).
+- At shutdown running jobs are cancelled and marked "interrupted".
+"""
+import asyncio
+from datetime import datetime, timedelta
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+import logging
+
+from pymongo.errors import DuplicateKeyError
+
+from settings import settings
+from utils.metrics import metrics_registry
+from repositories.job_repository import (
+    ACTIVE_STATUSES,
+    COMPLETED,
+    FAILED,
+    INTERRUPTED,
+    JobRepository,
+    get_job_repository,
+)
+
+logger = logging.getLogger(__name__)
+
+# Awaited by a job to store its progress: report(progress, failed_ids=None)
+ProgressReporter = Callable[..., Awaitable[None]]
+JobFunction = Callable[[ProgressReporter], Awaitable[None]]
+
+
+class JobAlreadyRunningError(RuntimeError):
+    """Raised when a job of the same type is already queued or running"""
+
+    def __init__(self, job: Dict[str, Any]):
+        super().__init__(f"{job['type']} job {job['_id']} is already {job['status']}")
+        self.job = job
+
+
+class JobRunner:
+    """
+    Runs background jobs in this worker's event loop
+
+    Usage:
+        job = await job_runner.submit("batch_embed", {"limit": 1000}, run_backfill)
+        status = await job_runner.get_status(job["_id"])
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = 1,
+        heartbeat_seconds: float = 15.0,
+        stale_seconds: float = 120.0
+    ):
+        self.max_concurrent = max_concurrent
+        self.heartbeat_seconds = heartbeat_seconds
+        self.stale_seconds = stale_seconds
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._heartbeat_task: Optional[asyncio.Task] = None
+        self._repo: Optional[JobRepository] = None
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.interrupted = 0
+
+    @property
+    def repo(self) -> JobRepository:
+        # Created on first use, after the worker's client exists
+        if self._repo is None:
+            self._repo = get_job_repository()
+        return self._repo
+
+    async def submit(
+        self,
+        job_type: str,
+        params: Dict[str, Any],
+        run: JobFunction,
+        exclusive: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Record a queued job and start it in the background
+
+        Args:
+            job_type: Job kind (e.g. "batch_embed")
+            params: Stored with the job for status reporting
+            run: Coroutine function doing the work; receives a progress reporter
+            exclusive: Refuse when a live job of this type exists on any worker
+
+        Raises:
+            JobAlreadyRunningError: exclusive and a live job exists
+        """
+        job = await self._create(job_type, params, exclusive)
+        job_id = job["_id"]
+        task = asyncio.get_running_loop().create_task(self._run(job_id, run), name=f"job-{job_id}")
+        self._tasks[job_id] = task
+        task.add_done_callback(lambda _: self._tasks.pop(job_id, None))
+        self.submitted += 1
+        self._ensure_heartbeat()
+        logger.info(f"📥 [Jobs] Queued {job_type} job {job_id}")
+        return job
+
+    async def _create(self, job_type: str, params: Dict[str, Any], exclusive: bool) -> Dict[str, Any]:
+        if not exclusive:
+            return await self.repo.create_job(job_type, params)
+        # A crashed worker's job would otherwise block its type forever
+        released = await self.repo.release_stale(job_type, self.stale_seconds)
+        if released:
+            logger.warning(f"[Jobs] Released {released} stale {job_type} job(s)")
+        for _ in range(3):
+            try:
+                return await self.repo.create_job(job_type, params, exclusive=True)
+            except DuplicateKeyError:
+                active = await self.repo.find_exclusive(job_type)
+                if active:
+                    raise JobAlreadyRunningError(active)
+                # Finished between the insert and the lookup: try again
+        raise JobAlreadyRunningError({"_id": "?", "type": job_type, "status": "starting"})
+
+    async def _run(self, job_id: str, run: JobFunction) -> None:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+
+        async def report(progress: Dict[str, Any], failed_ids: Optional[List[str]] = None) -> None:
+            try:
+                await self.repo.update_progress(job_id, progress, failed_ids)
+            except Exception as e:
+                logger.warning(f"[Jobs] Could not store progress of {job_id}: {e}")
+
+        try:
+            async with self._semaphore:
+                await self.repo.mark_running(job_id)
+                await run(report)
+        except asyncio.CancelledError:
+            self.interrupted += 1
+            await self._finish(job_id, INTERRUPTED, "Worker shut down before the job finished")
+            raise
+        except Exception as e:
+            self.failed += 1
+            logger.error(f"❌ [Jobs] Job {job_id} failed: {e}")
+            await self._finish(job_id, FAILED, str(e))
+        else:
+            self.completed += 1
+            await self._finish(job_id, COMPLETED)
+            logger.info(f"✅ [Jobs] Job {job_id} completed")
+
+    async def _finish(self, job_id: str, status: str, error: Optional[str] = None) -> None:
+        try:
+            await self.repo.finish(job_id, status, error)
+        except Exception as e:
+            logger.error(f"❌ [Jobs] Could not store final status of {job_id}: {e}")
+
+    def _ensure_heartbeat(self) -> None:
+        if self._heartbeat_task is None or self._heartbeat_task.done():
+            self._heartbeat_task = asyncio.get_running_loop().create_task(
+                self._heartbeat(), name="job-heartbeat"
+            )
+
+    async def _heartbeat(self) -> None:
+        """Refresh heartbeats of this worker's jobs until none are left"""
+        while self._tasks:
+            await asyncio.sleep(self.heartbeat_seconds)
+            try:
+                await self.repo.touch(list(self._tasks))
+            except Exception as e:
+                logger.warning(f"[Jobs] Heartbeat failed: {e}")
+
+    async def get_status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Job document from the jobs collection (any worker's job)"""
+        job = await self.repo.get_job(job_id)
+        if job and job["status"] in ACTIVE_STATUSES:
+            stale_before = datetime.utcnow() - timedelta(seconds=self.stale_seconds)
+            if job.get("heartbeat_at") and job["heartbeat_at"] < stale_before:
+                job["status"] = INTERRUPTED
+                job["error"] = job.get("error") or f"Worker {job.get('worker')} stopped responding"
+        return job
+
+    async def stop(self) -> None:
+        """Cancel this worker's jobs and record them as interrupted (lifespan shutdown)"""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        if self._heartbeat_task:
+            self._heartbeat_task.cancel()
+            tasks.append(self._heartbeat_task)
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "max_concurrent": self.max_concurrent,
+            "active": len(self._tasks),
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "interrupted": self.interrupted,
+        }
+
+
+# ========== Singleton Instance ==========
+job_runner = JobRunner(
+    max_concurrent=settings.JOBS_MAX_CONCURRENT,
+    heartbeat_seconds=settings.JOBS_HEARTBEAT_SECONDS,
+    stale_seconds=settings.JOBS_STALE_SECONDS
+)
+metrics_registry.register("jobs", job_runner.snapshot)
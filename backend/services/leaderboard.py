@@ -0,0 +1,244 @@
+"""
+Leaderboard - Per-worker ranked view of user_points
+
+The leaderboard used to sort user_points on every call and could not answer
+"what rank am I?" without scanning. Each worker now keeps every user's
+points in an order-statistic skip list (utils.ranked_set), so top-N pages,
+a user's rank and the neighbours around them all cost O(log n).
+
+- Order matches the MongoDB listing: total_points desc, then _id desc, so
+  the existing keyset cursors keep working.
+- Ranks are competition ranks: users with equal points share a rank.
+- Seeded from MongoDB on first use, updated by every award_points on this
+  worker, and fully resynced every LEADERBOARD_RESYNC_SECONDS (awards made
+  by other workers become visible then).
+- Usernames and avatars are joined from the users collection with one $in
+  query for the uncached ids of a page, and cached per user.
+"""
+import asyncio
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+
+from pymongo.errors import PyMongoError
+
+from settings import settings
+from core.pagination import Page, decode_cursor, encode_cursor
+from repositories.gamification_repository import get_gamification_repository
+from repositories.user_repository import get_user_repository
+from utils.cache import TTLCache
+from utils.invalidation import InvalidationEvent, invalidation_bus
+from utils.metrics import metrics_registry
+from utils.ranked_set import RankedSet
+
+logger = logging.getLogger(__name__)
+
+# Sort key: ascending order of (-total_points, -_id) is the listing order
+RankKey = Tuple[int, int]
+
+
+def rank_key(total_points: int, points_id: Any) -> RankKey:
+    return (-int(total_points), -int(str(points_id), 16))
+
+
+def _points_id(key: RankKey) -> str:
+    return format(-key[1], "024x")
+
+
+class Leaderboard:
+    """
+    In-memory leaderboard of one worker
+
+    Usage:
+        await leaderboard.page(limit=10)
+        await leaderboard.around(user_id, window=3)
+        leaderboard.apply(points_doc)  # after find_one_and_update
+    """
+
+    def __init__(self, resync_seconds: float = 300.0, profile_ttl_seconds: float = 300.0):
+        self.resync_seconds = resync_seconds
+        self.profiles = TTLCache(name="leaderboard_profiles", max_size=20000, ttl_seconds=profile_ttl_seconds)
+        self._ranked = RankedSet()
+        self._ready = False
+        self._seed_lock = asyncio.Lock()
+        self._seeding: Optional[Dict[str, Dict[str, Any]]] = None  # Updates seen during a seed
+        self._task: Optional[asyncio.Task] = None
+        self.seeds = 0
+        self.seed_errors = 0
+        self.last_seed_ms = 0.0
+        self.last_seed_at: Optional[datetime] = None
+        self.updates = 0
+
+    # ========== Lifecycle ==========
+
+    def start(self) -> None:
+        """Start the periodic resync (first seed included) without delaying startup"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._resync_forever(), name="leaderboard-resync")
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _resync_forever(self) -> None:
+        while True:
+            try:
+                await self.seed()
+            except PyMongoError as e:
+                self.seed_errors += 1
+                logger.error(f"[Leaderboard] Resync failed: {e}")
+            await asyncio.sleep(self.resync_seconds)
+
+    # ========== Source of truth ==========
+
+    async def seed(self) -> int:
+        """Rebuild the ranking from user_points and swap it in"""
+        async with self._seed_lock:
+            return await self._seed()
+
+    async def ensure_ready(self) -> None:
+        """Seed on first use (concurrent first requests share one seed)"""
+        if self._ready:
+            return
+        async with self._seed_lock:
+            if not self._ready:
+                await self._seed()
+
+    async def _seed(self) -> int:
+        started = time.perf_counter()
+        self._seeding = {}
+        try:
+            ranked = RankedSet()
+            async for doc in get_gamification_repository().iter_points():
+                if doc.get("user_id"):
+                    ranked.add(doc["user_id"], rank_key(doc.get("total_points", 0), doc["_id"]))
+            # Awards applied while reading may be missing from the snapshot
+            for doc in self._seeding.values():
+                ranked.add(doc["user_id"], rank_key(doc.get("total_points", 0), doc["_id"]))
+        finally:
+            self._seeding = None
+        self._ranked = ranked
+        self._ready = True
+        self.seeds += 1
+        self.last_seed_ms = (time.perf_counter() - started) * 1000
+        self.last_seed_at = datetime.utcnow()
+        logger.info(f"🏆 [Leaderboard] Seeded {len(ranked)} users in {self.last_seed_ms:.0f}ms")
+        return len(ranked)
+
+    def apply(self, points_doc: Optional[Dict[str, Any]]) -> None:
+        """Record a user_points document returned by an award (absolute total)"""
+        if not points_doc or not points_doc.get("user_id"):
+            return
+        self.updates += 1
+        if self._seeding is not None:
+            self._seeding[points_doc["user_id"]] = points_doc
+        self._ranked.add(
+            points_doc["user_id"],
+            rank_key(points_doc.get("total_points", 0), points_doc["_id"])
+        )
+
+    # ========== Queries ==========
+
+    def _competition_rank(self, key: RankKey) -> int:
+        """1 + number of users with strictly more points"""
+        return self._ranked.count_less((key[0], float("-inf"))) + 1
+
+    def _rows(self, items: List[Tuple[str, RankKey]]) -> List[Dict[str, Any]]:
+        rows: List[Dict[str, Any]] = []
+        for user_id, key in items:
+            if rows and rows[-1]["points"] == -key[0]:
+                rank = rows[-1]["rank"]
+            else:
+                rank = self._competition_rank(key)
+            rows.append({"user_id": user_id, "points": -key[0], "rank": rank})
+        return rows
+
+    async def page(self, limit: int = 10, after: Optional[str] = None) -> Page:
+        """
+        Highest points first, keyset-paginated like the MongoDB listing
+
+        Raises:
+            InvalidCursorError: If the cursor token cannot be decoded
+            ValueError: If limit is smaller than 1
+        """
+        if limit < 1:
+            raise ValueError(f"Page limit must be at least 1, got {limit}")
+        await self.ensure_ready()
+        start = 0
+        if after:
+            points, last_id = decode_cursor(after)
+            key = rank_key(points, last_id)
+            # Everything up to and including the cursor position
+            start = self._ranked.count_less((key[0], key[1] + 1))
+        items = self._ranked.slice(start, limit + 1)
+        next_cursor = None
+        if len(items) > limit:
+            items = items[:limit]
+            last_key = items[-1][1]
+            next_cursor = encode_cursor(-last_key[0], _points_id(last_key))
+        return Page(items=await self._with_profiles(self._rows(items)), next_cursor=next_cursor)
+
+    async def around(self, user_id: str, window: int = 3) -> Dict[str, Any]:
+        """A user's entry and up to `window` users above and below"""
+        await self.ensure_ready()
+        position = self._ranked.rank(user_id)
+        if position is None:
+            return {"entry": None, "neighbours": [], "total_players": len(self._ranked)}
+        start = max(0, position - window)
+        rows = await self._with_profiles(
+            self._rows(self._ranked.slice(start, position - start + window + 1))
+        )
+        return {
+            "entry": rows[position - start],
+            "neighbours": rows,
+            "total_players": len(self._ranked),
+        }
+
+    # ========== Profiles ==========
+
+    async def _with_profiles(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Join username / avatar_url: one query for every uncached user of the page"""
+        profiles = {row["user_id"]: self.profiles.get(row["user_id"]) for row in rows}
+        missing = [user_id for user_id, profile in profiles.items() if profile is None]
+        if missing:
+            loaded = await get_user_repository().get_profiles(missing)
+            for user_id in missing:
+                # Points of a deleted or external account: show the id
+                profile = loaded.get(user_id) or {"username": user_id, "avatar_url": None}
+                self.profiles.set(user_id, profile)
+                profiles[user_id] = profile
+        return [{**row, **profiles[row["user_id"]]} for row in rows]
+
+    def on_user_change(self, event: InvalidationEvent) -> None:
+        """Invalidation bus handler: renamed users / new avatars"""
+        if event.operation == "reset":
+            self.profiles.clear()
+        elif event.keys.get("_id") is not None:
+            self.profiles.invalidate(str(event.keys["_id"]))
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "ready": self._ready,
+            "users": len(self._ranked),
+            "seeds": self.seeds,
+            "seed_errors": self.seed_errors,
+            "last_seed_ms": round(self.last_seed_ms, 1),
+            "last_seed_at": self.last_seed_at.isoformat() if self.last_seed_at else None,
+            "updates": self.updates,
+            "profiles": self.profiles.snapshot(),
+        }
+
+
+# ========== Singleton Instance ==========
+leaderboard = Leaderboard(
+    resync_seconds=settings.LEADERBOARD_RESYNC_SECONDS,
+    profile_ttl_seconds=settings.LEADERBOARD_PROFILE_TTL_SECONDS
+)
+metrics_registry.register("leaderboard", leaderboard.snapshot)
+invalidation_bus.subscribe(["users"], leaderboard.on_user_change)
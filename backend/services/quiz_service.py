@@ -3,8 +3,29 @@ Quiz Service - Business logic for quiz operations
 """
 from typing import Optional, List, Dict, Any
 
+from settings import settings
+from core.conditional import ETagRegistry
+from utils.invalidation import InvalidationEvent, invalidation_bus
+from utils.metrics import metrics_registry
 from repositories.quiz_repository import QuizRepository, get_quiz_repository
 
+# Version stamps answering If-None-Match on GET /quiz/{qr_id} without a read
+quiz_etags = ETagRegistry(
+    name="quiz",
+    max_size=settings.ETAG_REGISTRY_MAX_SIZE,
+    ttl_seconds=settings.ETAG_REGISTRY_TTL_SECONDS
+)
+metrics_registry.register("quiz_etags", quiz_etags.snapshot)
+
+
+def _on_quiz_change(event: InvalidationEvent) -> None:
+    """Drop the quiz ETag of the affected flashcard (all of them if unknown)"""
+    moved = bool(event.updated_fields and "flashcard_qr_id" in event.updated_fields)
+    quiz_etags.invalidate(None if moved else event.keys.get("flashcard_qr_id"))
+
+
+invalidation_bus.subscribe(["quiz_questions"], _on_quiz_change)
+
 
 class QuizService:
     """Service handling quiz business logic"""
@@ -0,0 +1,272 @@
+"""
+User Import Service - Bulk student account creation from class lists
+
+Rows are streamed from a CSV (header: email,username,password[,full_name])
+or NDJSON upload and handled in batches:
+
+1. Validate every row with the UserCreate schema, reject duplicates within
+   the file
+2. One $in query per batch for emails / usernames already taken
+3. Hash the remaining passwords in parallel on the bulk process pool (a row
+   whose hash fails is reported as an error)
+4. One unordered insert_many per batch; rows that still collide (e.g. a
+   concurrent registration) are caught by the unique indexes
+
+Every row ends up in the report, created or with the reason it was not.
+CSV records must be on one line each (no quoted newlines).
+"""
+import asyncio
+import codecs
+import csv
+import json
+import time
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+import logging
+
+from pydantic import ValidationError
+
+from settings import settings
+from core.password_hasher import PasswordHasher, bulk_password_hasher
+from models.user_mongo import UserCreate
+from repositories.user_repository import UserRepository, get_user_repository
+
+logger = logging.getLogger(__name__)
+
+CSV = "csv"
+NDJSON = "ndjson"
+FORMATS = (CSV, NDJSON)
+
+# (line number, parsed record or None, parse error or None)
+ParsedRow = Tuple[int, Optional[Dict[str, Any]], Optional[str]]
+
+# One batch at a time per worker: a batch fills the bulk hashing pool. Held
+# per batch, not per import, so a slow upload does not block other imports.
+_import_lock = asyncio.Lock()
+
+
+async def _iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[Tuple[int, str]]:
+    """Split a byte stream into numbered, non-blank text lines (UTF-8, BOM tolerated)"""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    buffer = ""
+    line_no = 0
+    async for chunk in chunks:
+        buffer += decoder.decode(chunk)
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            line_no += 1
+            if line.strip():
+                yield line_no, line.rstrip("\r")
+    buffer += decoder.decode(b"", final=True)
+    if buffer.strip():
+        yield line_no + 1, buffer.rstrip("\r")
+
+
+async def _csv_rows(lines: AsyncIterator[Tuple[int, str]]) -> AsyncIterator[ParsedRow]:
+    header: Optional[List[str]] = None
+    async for line_no, line in lines:
+        values = next(csv.reader([line]))
+        if header is None:
+            header = [name.strip().lower() for name in values]
+            continue
+        if len(values) != len(header):
+            yield line_no, None, f"expected {len(header)} columns, got {len(values)}"
+            continue
+        # Empty cells are missing values (e.g. no full_name)
+        yield line_no, {k: v.strip() for k, v in zip(header, values) if v.strip()}, None
+
+
+async def _ndjson_rows(lines: AsyncIterator[Tuple[int, str]]) -> AsyncIterator[ParsedRow]:
+    async for line_no, line in lines:
+        try:
+            record = json.loads(line)
+        except ValueError as e:
+            yield line_no, None, f"invalid JSON: {e}"
+            continue
+        if not isinstance(record, dict):
+            yield line_no, None, "expected a JSON object"
+            continue
+        yield line_no, record, None
+
+
+def _validation_message(error: ValidationError) -> str:
+    first = error.errors()[0]
+    field = ".".join(str(part) for part in first.get("loc", ())) or "row"
+    return f"{field}: {first.get('msg', 'invalid')}"
+
+
+class UserImportService:
+    """Service for bulk user imports"""
+
+    def __init__(
+        self,
+        user_repo: UserRepository,
+        hasher: PasswordHasher,
+        batch_size: int = 500,
+        max_rows: int = 5000
+    ):
+        self.user_repo = user_repo
+        self.hasher = hasher
+        self.batch_size = batch_size
+        self.max_rows = max_rows
+
+    async def import_users(self, chunks: AsyncIterator[bytes], fmt: str) -> Dict[str, Any]:
+        """
+        Create user accounts from an uploaded class list
+
+        Args:
+            chunks: Raw upload body (e.g. request.stream())
+            fmt: "csv" or "ndjson"
+
+        Returns:
+            Report dict (UserImportReport): totals and one result per row
+        """
+        started = time.perf_counter()
+        parse = _csv_rows if fmt == CSV else _ndjson_rows
+        results: List[Dict[str, Any]] = []
+        seen_emails: Set[str] = set()
+        seen_usernames: Set[str] = set()
+        batch: List[ParsedRow] = []
+        total = 0
+        truncated = False
+
+        async for row in parse(_iter_lines(chunks)):
+            if total >= self.max_rows:
+                truncated = True
+                break
+            total += 1
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                async with _import_lock:
+                    results.extend(await self._import_batch(batch, seen_emails, seen_usernames))
+                batch = []
+        if batch:
+            async with _import_lock:
+                results.extend(await self._import_batch(batch, seen_emails, seen_usernames))
+
+        created = sum(1 for r in results if r["status"] == "created")
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        logger.info(
+            f"👥 [UserImport] {created}/{total} users created in {elapsed_ms:.0f}ms"
+            f"{' (truncated)' if truncated else ''}"
+        )
+        return {
+            "total": total,
+            "created": created,
+            "failed": total - created,
+            "truncated": truncated,
+            "elapsed_ms": round(elapsed_ms, 1),
+            "rows": sorted(results, key=lambda r: r["row"]),
+        }
+
+    async def _import_batch(
+        self,
+        batch: List[ParsedRow],
+        seen_emails: Set[str],
+        seen_usernames: Set[str]
+    ) -> List[Dict[str, Any]]:
+        results: List[Dict[str, Any]] = []
+        candidates: List[Tuple[int, UserCreate]] = []
+
+        def failed(line_no: int, record: Optional[Dict[str, Any]], error: str) -> None:
+            record = record or {}
+            results.append({
+                "row": line_no,
+                "email": record.get("email"),
+                "username": record.get("username"),
+                "status": "error",
+                "error": error,
+            })
+
+        # 1. Validation and duplicates within the file
+        for line_no, record, error in batch:
+            if error:
+                failed(line_no, record, error)
+                continue
+            try:
+                user = UserCreate.model_validate(record)
+            except ValidationError as e:
+                failed(line_no, record, _validation_message(e))
+                continue
+            if user.email in seen_emails:
+                failed(line_no, record, "duplicate email in file")
+                continue
+            if user.username in seen_usernames:
+                failed(line_no, record, "duplicate username in file")
+                continue
+            seen_emails.add(user.email)
+            seen_usernames.add(user.username)
+            candidates.append((line_no, user))
+
+        # 2. Already registered (one query for the whole batch)
+        taken_emails, taken_usernames = await self.user_repo.find_existing(
+            [user.email for _, user in candidates],
+            [user.username for _, user in candidates]
+        )
+        new_users: List[Tuple[int, UserCreate]] = []
+        for line_no, user in candidates:
+            if user.email in taken_emails:
+                failed(line_no, user.model_dump(), "email already exists")
+            elif user.username in taken_usernames:
+                failed(line_no, user.model_dump(), "username already exists")
+            else:
+                new_users.append((line_no, user))
+
+        # 3. Hash in parallel on the process pool; a failed hash (pool busy or
+        # broken) only fails its own row, earlier batches are already stored
+        hashes = await asyncio.gather(
+            *(self.hasher.hash(user.password) for _, user in new_users),
+            return_exceptions=True
+        )
+        hashed_users: List[Tuple[int, UserCreate, str]] = []
+        hash_errors = 0
+        for (line_no, user), hashed in zip(new_users, hashes):
+            if isinstance(hashed, BaseException):
+                hash_errors += 1
+                failed(line_no, user.model_dump(), f"password hashing failed: {type(hashed).__name__}")
+            else:
+                hashed_users.append((line_no, user, hashed))
+        if hash_errors:
+            logger.warning(f"[UserImport] {hash_errors} password hash(es) failed in batch")
+
+        # 4. Unordered insert: one failing row never blocks the others
+        now = datetime.utcnow()
+        documents = [
+            {
+                "email": user.email,
+                "username": user.username,
+                "full_name": user.full_name,
+                "avatar_url": None,
+                "hashed_password": hashed,
+                "is_active": True,
+                "is_verified": False,
+                "is_superuser": False,
+                "created_at": now,
+                "updated_at": None,
+                "last_login": None,
+            }
+            for _, user, hashed in hashed_users
+        ]
+        ids, insert_errors = await self.user_repo.insert_many_unordered(documents)
+        for index, (line_no, user, _) in enumerate(hashed_users):
+            if index in insert_errors:
+                failed(line_no, user.model_dump(), insert_errors[index])
+                continue
+            results.append({
+                "row": line_no,
+                "email": user.email,
+                "username": user.username,
+                "status": "created",
+                "id": ids[index],
+            })
+        return results
+
+
+def get_user_import_service() -> UserImportService:
+    """Factory function for dependency injection"""
+    return UserImportService(
+        get_user_repository(),
+        bulk_password_hasher,
+        batch_size=settings.USER_IMPORT_BATCH_SIZE,
+        max_rows=settings.USER_IMPORT_MAX_ROWS
+    )
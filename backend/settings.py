@@ -21,11 +21,54 @@ class Settings(BaseSettings):
     # ========== MongoDB Configuration ==========
     MONGO_URL: str
     MONGO_DB: str = "eduplatform"
+    MONGO_TLS: bool = True  # Atlas requires TLS; disable for a local replica set
+    MONGO_SYNC_INDEXES_ON_STARTUP: bool = True  # Create missing repository indexes in lifespan
+
+    # ========== MongoDB Connection Pool (per worker process) ==========
+    MONGO_MAX_POOL_SIZE: int = 50  # Workers x this must stay under the Atlas connection limit
+    MONGO_MIN_POOL_SIZE: int = 5  # Connections kept open (and warmed up at startup)
+    MONGO_MAX_IDLE_TIME_MS: int = 60000
+    MONGO_WAIT_QUEUE_TIMEOUT_MS: int = 2000  # Max wait for a free pooled connection
+    MONGO_SERVER_SELECTION_TIMEOUT_MS: int = 5000
+
+    # ========== AR Experience ==========
+    # "aggregate": one $lookup round trip | "concurrent": flashcard, then target+combos in parallel
+    # "bundle": one _id lookup in the materialized ar_experience_bundles collection
+    AR_EXPERIENCE_MODE: str = "aggregate"
+    # Bundle mode: rebuild bundles when catalog documents change (one worker, elected by lease)
+    AR_BUNDLE_BUILDER_ENABLED: bool = True
+    AR_BUNDLE_LEASE_SECONDS: float = 30.0  # Builder lease; a dead builder is replaced after this
+    AR_CACHE_ENABLED: bool = True
+    AR_CACHE_MAX_SIZE: int = 2048  # Bundles kept per worker (LRU beyond this)
+    AR_CACHE_TTL_SECONDS: float = 300.0
+    
+    # ========== Conditional GET (ETag version stamps per worker) ==========
+    ETAG_REGISTRY_MAX_SIZE: int = 4096
+    ETAG_REGISTRY_TTL_SECONDS: float = 600.0
+    
+    # ========== Fast Response Path (hot read-only GETs) ==========
+    # One TypeAdapter validate + dump_json pass instead of response_model handling
+    FAST_RESPONSES_ENABLED: bool = True
+    
+    # ========== Cross-worker Cache Invalidation ==========
+    CACHE_INVALIDATION_ENABLED: bool = True  # Change-stream watcher per worker
+    CACHE_INVALIDATION_POLL_SECONDS: float = 10.0  # Fallback when change streams are unavailable
     
     # ========== Security ==========
     SECRET_KEY: str = "dev-secret-key-change-in-production"
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    PASSWORD_HASH_POOL: str = "thread"  # "thread" (bcrypt releases the GIL) or "process"
+    PASSWORD_HASH_MAX_WORKERS: int = 2  # Concurrent bcrypt hashes per worker
+    PASSWORD_HASH_MAX_PENDING: int = 64  # Queued + running hashes before logins get 503
+    AUTH_USER_CACHE_TTL_SECONDS: float = 30.0  # Max staleness of is_active/is_superuser per worker
+    AUTH_USER_CACHE_MAX_SIZE: int = 10000
+    AUTH_TOKEN_CACHE_MAX_SIZE: int = 10000  # Verified tokens per worker (never past their exp)
+    
+    # ========== Bulk User Import (superuser, CSV / NDJSON) ==========
+    USER_IMPORT_BATCH_SIZE: int = 500  # Rows per uniqueness query + insert_many
+    USER_IMPORT_MAX_ROWS: int = 5000  # Rows read per request; the rest is reported as truncated
+    USER_IMPORT_HASH_PROCESSES: int = 0  # bcrypt processes per worker (0 = one per CPU core)
     
     # ========== Application ==========
     APP_NAME: str = "Eduplatform AR API"
@@ -47,6 +90,51 @@ class Settings(BaseSettings):
     OPENAI_API_KEY: Optional[str] = None
     GOOGLE_API_KEY: Optional[str] = None
     
+    # ========== AI Embeddings ==========
+    EMBEDDING_MODEL: str = "models/embedding-001"
+    EMBEDDING_MAX_WORKERS: int = 4  # Threads per worker running blocking embed calls
+    EMBEDDING_MAX_PENDING: int = 64  # Queued + running calls before new ones fail fast
+    EMBEDDING_TIMEOUT_SECONDS: float = 10.0
+    # Concurrent query embeddings are sent together (one call per window or full batch)
+    EMBEDDING_BATCH_ENABLED: bool = True
+    EMBEDDING_BATCH_WINDOW_MS: float = 5.0
+    EMBEDDING_BATCH_MAX_SIZE: int = 32  # Gemini accepts up to 100 inputs per call
+    # Content-addressed cache: per-worker LRU, then the embedding_cache collection
+    EMBEDDING_CACHE_ENABLED: bool = True
+    EMBEDDING_CACHE_MAX_SIZE: int = 5000  # Vectors per worker (~3 KB each as float32)
+    EMBEDDING_CACHE_MEMORY_TTL_SECONDS: float = 86400.0
+    EMBEDDING_CACHE_TTL_DAYS: int = 90  # MongoDB tier (TTL index)
+    EMBEDDING_CACHE_MONGO_MAX_SIZE: int = 200000  # MongoDB tier cap, oldest pruned first (0 = TTL only)
+    # Backfill of missing flashcard embeddings (scripts/generate_embeddings.py)
+    EMBEDDING_BACKFILL_PAGE_SIZE: int = 200  # Cards per page / bulk_write / checkpoint
+    EMBEDDING_BACKFILL_CHUNK_SIZE: int = 20  # Texts per embed_content call
+    EMBEDDING_BACKFILL_CONCURRENCY: int = 4
+    EMBEDDING_BACKFILL_RPS: float = 10.0  # Embedding calls per second (token bucket)
+    # POST /flashcard/batch-embed jobs share the worker's embedding pool with live queries
+    BATCH_EMBED_JOB_CONCURRENCY: int = 2
+    
+    # ========== RAG Answer Cache (semantic) ==========
+    # Reuse an answer when the same flashcards are retrieved for a near-identical question
+    RAG_ANSWER_CACHE_ENABLED: bool = True
+    RAG_ANSWER_CACHE_THRESHOLD: float = 0.95  # Min cosine similarity of the question embeddings
+    RAG_ANSWER_CACHE_MAX_SIZE: int = 2000  # Answers kept per worker (LRU beyond this)
+    RAG_ANSWER_CACHE_TTL_SECONDS: float = 7 * 86400.0
+    
+    # ========== Leaderboard (in-memory ranking per worker) ==========
+    LEADERBOARD_RESYNC_SECONDS: float = 300.0  # Full reload from user_points (other workers' awards)
+    LEADERBOARD_PROFILE_TTL_SECONDS: float = 300.0  # Cached username / avatar per user
+    
+    # ========== Point Awards (write coalescing per worker) ==========
+    AWARD_BUFFER_ENABLED: bool = True  # False: one find_one_and_update per award
+    AWARD_FLUSH_INTERVAL_MS: float = 200.0  # Max delay before buffered awards are written
+    AWARD_FLUSH_MAX_EVENTS: int = 500  # Flush early once this many awards are buffered
+    
+    # ========== Background Jobs (per worker, state in the jobs collection) ==========
+    JOBS_MAX_CONCURRENT: int = 1  # Jobs running at once per worker; others wait queued
+    JOBS_HEARTBEAT_SECONDS: float = 15.0
+    JOBS_STALE_SECONDS: float = 120.0  # No heartbeat for this long = worker gone (interrupted)
+    JOBS_RETENTION_DAYS: int = 7  # Finished jobs expire after this (TTL index)
+    
     # ========== Pydantic Settings Config ==========
     model_config = SettingsConfigDict(
         # Try to load .env file (will not fail if missing - good for production)
@@ -0,0 +1,143 @@
+# backend/utils/cache.py
+"""
+In-process TTL + LRU Cache
+
+Bounded per-worker cache for read-mostly catalog data. Entries expire after a
+TTL and the least recently used entry is evicted when full. get_or_load()
+coalesces concurrent misses for the same key into a single load, so a
+classroom scanning the same card triggers one database read.
+"""
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+
+class TTLCache:
+    """
+    Bounded LRU cache with per-entry TTL and hit/miss/eviction counters
+
+    Not thread-safe: intended for use from a single event loop.
+    """
+
+    def __init__(self, name: str, max_size: int = 1024, ttl_seconds: float = 300.0):
+        self.name = name
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._data: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+        self.coalesced = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the cached value or None (counts a hit or a miss)"""
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any, ttl_seconds: Optional[float] = None) -> None:
+        """Insert or replace a value, evicting the least recently used entry if full"""
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        self._data[key] = (time.monotonic() + ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    async def get_or_load(
+        self,
+        key: Hashable,
+        loader: Callable[[], Awaitable[Any]],
+        cache_none: bool = False
+    ) -> Any:
+        """
+        Return the cached value, or load it once for all concurrent callers
+
+        Args:
+            key: Cache key
+            loader: Coroutine factory producing the value on a miss
+            cache_none: Also cache None results (default: no)
+        """
+        while True:
+            value = self.get(key)
+            if value is not None:
+                return value
+
+            pending = self._inflight.get(key)
+            if pending is None:
+                break
+            self.coalesced += 1
+            try:
+                return await asyncio.shield(pending)
+            except asyncio.CancelledError:
+                if pending.cancelled():
+                    continue  # The loading caller was cancelled: retry ourselves
+                raise
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        try:
+            value = await loader()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            future.exception()  # Mark retrieved: no "never retrieved" warning without waiters
+            raise
+        else:
+            # Skip caching if the key was invalidated while loading
+            if self._inflight.get(key) is future and (value is not None or cache_none):
+                self.set(key, value)
+            future.set_result(value)
+            return value
+        finally:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    def invalidate(self, key: Hashable) -> bool:
+        """Drop one key; returns True if it was cached"""
+        self._inflight.pop(key, None)
+        removed = self._data.pop(key, None) is not None
+        if removed:
+            self.invalidations += 1
+        return removed
+
+    def clear(self) -> None:
+        """Drop every entry"""
+        self.invalidations += len(self._data)
+        self._data.clear()
+        self._inflight.clear()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return counters for the metrics endpoint"""
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "coalesced": self.coalesced,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
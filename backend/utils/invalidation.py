@@ -0,0 +1,85 @@
+# backend/utils/invalidation.py
+"""
+In-process Cache Invalidation Bus
+
+In-process caches register a handler for the collections their data comes
+from. The change watcher (database/change_watcher.py) publishes one event per
+source-document change, so every worker drops stale entries no matter which
+worker (or which tool) made the write.
+"""
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class InvalidationEvent:
+    """
+    One change to a source document
+
+    Attributes:
+        collection: Source collection name
+        operation: insert | update | replace | delete | reset
+            ("reset" means changes may have been missed: drop everything)
+        keys: Identifying fields known for the document (_id, qr_id, ar_tag, ...)
+        updated_fields: Field names changed by an update, if known
+        from_watcher: Published by the change watcher (the write as seen in
+            MongoDB) rather than by the worker that made it
+    """
+    collection: str
+    operation: str
+    keys: Dict[str, Any] = field(default_factory=dict)
+    updated_fields: Optional[List[str]] = None
+    from_watcher: bool = False
+
+
+InvalidationHandler = Callable[[InvalidationEvent], None]
+
+
+class InvalidationBus:
+    """Fan-out of invalidation events to the registered in-process caches"""
+
+    def __init__(self):
+        self._handlers: Dict[str, List[InvalidationHandler]] = {}
+        self.published = 0
+        self.handler_errors = 0
+
+    def subscribe(self, collections: Iterable[str], handler: InvalidationHandler) -> None:
+        """Call handler for every event on any of the given collections"""
+        for name in collections:
+            handlers = self._handlers.setdefault(name, [])
+            if handler not in handlers:
+                handlers.append(handler)
+
+    @property
+    def collections(self) -> List[str]:
+        """Collections that at least one cache depends on"""
+        return sorted(self._handlers)
+
+    def publish(self, event: InvalidationEvent) -> None:
+        """Deliver an event; a failing handler never affects the others"""
+        self.published += 1
+        for handler in self._handlers.get(event.collection, []):
+            try:
+                handler(event)
+            except Exception as e:
+                self.handler_errors += 1
+                logger.error(f"[Invalidation] Handler failed for {event.collection}: {e}")
+
+    def reset_all(self) -> None:
+        """Tell every cache to drop everything (e.g. after a lost resume token)"""
+        for name in self.collections:
+            self.publish(InvalidationEvent(collection=name, operation="reset"))
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "collections": self.collections,
+            "published": self.published,
+            "handler_errors": self.handler_errors,
+        }
+
+
+# ========== Singleton Instance ==========
+invalidation_bus = InvalidationBus()
@@ -0,0 +1,126 @@
+# backend/utils/metrics.py
+"""
+In-process Metrics Registry
+Components register a provider that returns a snapshot dict of their counters.
+Snapshots are per worker process and exposed through GET /metrics.
+"""
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+MetricsProvider = Callable[[], Dict[str, Any]]
+
+
+class MetricsRegistry:
+    """
+    Registry of named metrics providers
+
+    Usage:
+        metrics_registry.register("mongo_pool", pool_metrics.snapshot)
+        metrics_registry.snapshot()  # {"mongo_pool": {...}}
+    """
+
+    def __init__(self):
+        self._providers: Dict[str, MetricsProvider] = {}
+
+    def register(self, name: str, provider: MetricsProvider) -> None:
+        """Register (or replace) a provider under the given name"""
+        self._providers[name] = provider
+
+    def unregister(self, name: str) -> None:
+        """Remove a provider if present"""
+        self._providers.pop(name, None)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Collect a snapshot from every registered provider"""
+        result: Dict[str, Any] = {}
+        for name, provider in list(self._providers.items()):
+            try:
+                result[name] = provider()
+            except Exception as e:
+                logger.warning(f"[Metrics] Provider '{name}' failed: {e}")
+                result[name] = {"error": str(e)}
+        return result
+
+
+class LatencyStats:
+    """
+    Per-name latency aggregates (count / avg / max, milliseconds)
+
+    Usage:
+        stats = LatencyStats()
+        with stats.time("flashcard"):
+            ...
+        metrics_registry.register("ar_experience", stats.snapshot)
+    """
+
+    def __init__(self):
+        self._stats: Dict[str, Dict[str, float]] = {}
+
+    def record(self, name: str, elapsed_ms: float) -> None:
+        """Record one observation"""
+        entry = self._stats.setdefault(name, {"count": 0, "total_ms": 0.0, "max_ms": 0.0})
+        entry["count"] += 1
+        entry["total_ms"] += elapsed_ms
+        entry["max_ms"] = max(entry["max_ms"], elapsed_ms)
+
+    @contextmanager
+    def time(self, name: str) -> Iterator[None]:
+        """Context manager recording the wall time of its block"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, (time.perf_counter() - start) * 1000)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return aggregates per name"""
+        return {
+            name: {
+                "count": int(entry["count"]),
+                "avg_ms": round(entry["total_ms"] / entry["count"], 3) if entry["count"] else 0.0,
+                "max_ms": round(entry["max_ms"], 3),
+            }
+            for name, entry in self._stats.items()
+        }
+
+class Histogram:
+    """
+    Fixed-bucket histogram (count per upper bound, plus count / avg / max)
+
+    Usage:
+        sizes = Histogram([1, 2, 4, 8, 16, 32])
+        sizes.record(5)          # counted in the "<=8" bucket
+    """
+
+    def __init__(self, bounds: Iterable[float]):
+        self.bounds = sorted(bounds)
+        self._counts = [0] * (len(self.bounds) + 1)  # Last bucket: above every bound
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, value: float) -> None:
+        """Record one observation"""
+        self._counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def snapshot(self) -> Dict[str, Any]:
+        buckets = {f"<={bound:g}": n for bound, n in zip(self.bounds, self._counts)}
+        buckets[f">{self.bounds[-1]:g}"] = self._counts[-1]
+        return {
+            "count": self.count,
+            "avg": round(self.total / self.count, 3) if self.count else 0.0,
+            "max": self.max,
+            "buckets": buckets,
+        }
+
+
+# ========== Singleton Instance ==========
+metrics_registry = MetricsRegistry()
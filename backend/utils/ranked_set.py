@@ -0,0 +1,169 @@
+# backend/utils/ranked_set.py
+"""
+Order-statistic Skip List
+
+A sorted set of members keyed by comparable keys that also answers "how many
+keys are smaller than this one?" and "which member is at position i?" in
+O(log n). Every forward link stores its span (how many positions it skips),
+as in Redis sorted sets, so ranks are summed along the search path instead
+of counted by walking the list.
+
+Keys must be unique (include a tie-breaker, e.g. (-points, id)).
+"""
+import random
+from typing import Any, Dict, Hashable, Iterator, List, Optional, Tuple
+
+_MAX_LEVEL = 32
+_P = 0.25
+
+
+class _Node:
+    __slots__ = ("key", "member", "forward", "span")
+
+    def __init__(self, key: Any, member: Optional[Hashable], level: int):
+        self.key = key
+        self.member = member
+        self.forward: List[Optional["_Node"]] = [None] * level
+        self.span: List[int] = [0] * level
+
+
+class RankedSet:
+    """
+    Sorted set with O(log n) insert, remove, rank and positional access
+
+    Usage:
+        ranked = RankedSet()
+        ranked.add("u1", (-120, "u1"))
+        ranked.rank("u1")                 # 0-based position in key order
+        ranked.slice(0, 10)               # [(member, key), ...] first 10
+    """
+
+    def __init__(self):
+        self._head = _Node(None, None, _MAX_LEVEL)
+        self._level = 1
+        self._keys: Dict[Hashable, Any] = {}
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, member: Hashable) -> bool:
+        return member in self._keys
+
+    def key_of(self, member: Hashable) -> Optional[Any]:
+        return self._keys.get(member)
+
+    @staticmethod
+    def _random_level() -> int:
+        level = 1
+        while level < _MAX_LEVEL and random.random() < _P:
+            level += 1
+        return level
+
+    # ========== Updates ==========
+
+    def add(self, member: Hashable, key: Any) -> None:
+        """Insert a member, or move it if it is already present"""
+        current = self._keys.get(member)
+        if current is not None:
+            if current == key:
+                return
+            self.discard(member)
+
+        update: List[_Node] = [self._head] * _MAX_LEVEL
+        rank = [0] * _MAX_LEVEL
+        x = self._head
+        for i in reversed(range(self._level)):
+            rank[i] = 0 if i == self._level - 1 else rank[i + 1]
+            while x.forward[i] is not None and x.forward[i].key < key:
+                rank[i] += x.span[i]
+                x = x.forward[i]
+            update[i] = x
+
+        level = self._random_level()
+        if level > self._level:
+            for i in range(self._level, level):
+                rank[i] = 0
+                update[i] = self._head
+                self._head.span[i] = len(self._keys)
+            self._level = level
+
+        node = _Node(key, member, level)
+        for i in range(level):
+            node.forward[i] = update[i].forward[i]
+            update[i].forward[i] = node
+            node.span[i] = update[i].span[i] - (rank[0] - rank[i])
+            update[i].span[i] = rank[0] - rank[i] + 1
+        for i in range(level, self._level):
+            update[i].span[i] += 1
+        self._keys[member] = key
+
+    def discard(self, member: Hashable) -> bool:
+        """Remove a member; returns False if it was not present"""
+        key = self._keys.pop(member, None)
+        if key is None:
+            return False
+
+        update: List[_Node] = [self._head] * _MAX_LEVEL
+        x = self._head
+        for i in reversed(range(self._level)):
+            while x.forward[i] is not None and x.forward[i].key < key:
+                x = x.forward[i]
+            update[i] = x
+
+        target = update[0].forward[0]
+        for i in range(self._level):
+            if update[i].forward[i] is target:
+                update[i].span[i] += target.span[i] - 1
+                update[i].forward[i] = target.forward[i]
+            else:
+                update[i].span[i] -= 1
+        while self._level > 1 and self._head.forward[self._level - 1] is None:
+            self._level -= 1
+        return True
+
+    # ========== Queries ==========
+
+    def count_less(self, key: Any) -> int:
+        """Number of members whose key is strictly smaller than `key`"""
+        x = self._head
+        count = 0
+        for i in reversed(range(self._level)):
+            while x.forward[i] is not None and x.forward[i].key < key:
+                count += x.span[i]
+                x = x.forward[i]
+        return count
+
+    def rank(self, member: Hashable) -> Optional[int]:
+        """0-based position of a member in key order, None if absent"""
+        key = self._keys.get(member)
+        return None if key is None else self.count_less(key)
+
+    def _node_at(self, position: int) -> Optional[_Node]:
+        """Node at a 0-based position"""
+        if position < 0 or position >= len(self._keys):
+            return None
+        target = position + 1  # Spans count the head as position 0
+        x = self._head
+        traversed = 0
+        for i in reversed(range(self._level)):
+            while x.forward[i] is not None and traversed + x.span[i] <= target:
+                traversed += x.span[i]
+                x = x.forward[i]
+            if traversed == target:
+                return x
+        return None
+
+    def slice(self, start: int, count: int) -> List[Tuple[Hashable, Any]]:
+        """Up to `count` (member, key) pairs from a 0-based position"""
+        node = self._node_at(max(start, 0))
+        items: List[Tuple[Hashable, Any]] = []
+        while node is not None and len(items) < count:
+            items.append((node.member, node.key))
+            node = node.forward[0]
+        return items
+
+    def __iter__(self) -> Iterator[Tuple[Hashable, Any]]:
+        node = self._head.forward[0]
+        while node is not None:
+            yield node.member, node.key
+            node = node.forward[0]
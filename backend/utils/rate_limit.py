@@ -0,0 +1,59 @@
+# backend/utils/rate_limit.py
+"""
+Async Token Bucket
+
+Smooths outbound API calls to a steady rate with a bounded burst. Tokens refill
+continuously at `rate` per second up to `capacity`; acquire() waits until
+enough tokens are available.
+"""
+import asyncio
+import time
+from typing import Any, Dict, Optional
+
+
+class TokenBucket:
+    """
+    Token-bucket rate limiter for a single event loop
+
+    Usage:
+        bucket = TokenBucket(rate=10, capacity=20)   # 10 calls/s, bursts of 20
+        await bucket.acquire()
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+        self.acquired = 0
+        self.waited_seconds = 0.0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    async def acquire(self, tokens: float = 1.0) -> None:
+        """Wait until `tokens` are available and take them (FIFO across callers)"""
+        if tokens > self.capacity:
+            raise ValueError("cannot acquire more tokens than the bucket capacity")
+        async with self._lock:
+            self._refill()
+            while self._tokens < tokens:
+                wait = (tokens - self._tokens) / self.rate
+                self.waited_seconds += wait
+                await asyncio.sleep(wait)
+                self._refill()
+            self._tokens -= tokens
+            self.acquired += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "rate": self.rate,
+            "capacity": self.capacity,
+            "acquired": self.acquired,
+            "waited_seconds": round(self.waited_seconds, 3),
+        }